@@ -0,0 +1,121 @@
+import math
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from fastapi.exceptions import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from m365server.azure_interface.admission import AdmissionController, AdmissionRejected, Reservation
+
+
+class _RequestAdmission:
+    def __init__(self, controller: AdmissionController, max_transfer_bytes: int) -> None:
+        self.controller = controller
+        self.max_transfer_bytes = max_transfer_bytes
+        self.reservations: List[Reservation] = []
+
+
+# Routes whose request body is the transfer, relative to where api_router is mounted; the container is the
+# path segment after the route.
+UPLOAD_ROUTES = ("/blob_storage/upload_blob/",)
+
+# Set only while the admission middleware handles a request; elsewhere admit() does nothing.
+_admission: ContextVar[Optional[_RequestAdmission]] = ContextVar("m365server_admission", default=None)
+
+
+class AdmissionMiddleware:
+    """
+    Lets the endpoints reserve room for their transfers with admit() and releases it once the response is sent.
+
+    Reservations are held until the last byte of a streamed body has been sent, or the client went
+    away, because that is how long the transfer holds its buffers.
+
+    Uploads are admitted here, by their Content-Length, before their body is read: by the time an endpoint
+    runs, FastAPI has already spooled the whole body, so a shed upload would have been received anyway.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, max_transfer_bytes: int = 32 * 1024 * 1024,
+                 upload_routes: Tuple[str, ...] = UPLOAD_ROUTES) -> None:
+        self.app = app
+        self.controller = controller
+        self.max_transfer_bytes = max_transfer_bytes
+        self.upload_routes = upload_routes
+
+    def _upload_container(self, scope: Scope) -> Optional[str]:
+        if scope["method"] not in ("POST", "PUT"):
+            return None
+        path = scope["path"]
+        for route in self.upload_routes:
+            # Matched wherever the router is mounted, e.g. under /api/v1.
+            start = path.find(route)
+            if start >= 0:
+                return path[start + len(route):].split("/", 1)[0] or None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        admission = _RequestAdmission(self.controller, self.max_transfer_bytes)
+        token = _admission.set(admission)
+        try:
+            container_name = self._upload_container(scope)
+            if container_name is not None:
+                content_length = Headers(scope=scope).get("content-length")
+                try:
+                    await admit(container_name, int(content_length) if content_length and content_length.isdigit() else None)
+                except HTTPException as ex:
+                    await JSONResponse({"detail": ex.detail}, status_code=ex.status_code, headers=ex.headers)(scope, receive, send)
+                    return
+            await self.app(scope, receive, send)
+        finally:
+            _admission.reset(token)
+            for reservation in admission.reservations:
+                reservation.release()
+
+
+def _rejected(ex: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=429, detail="The server is busy with other transfers, retry later.",
+                         headers={"Retry-After": str(math.ceil(ex.retry_after))})
+
+
+async def admit(container_name: str, nbytes: Optional[int] = None) -> None:
+    """
+    Waits until the worker has room for a transfer of nbytes to or from container_name, for the rest of the request.
+
+    A transfer holds at most max_transfer_bytes of it in memory at a time, about a block-staged upload or a streamed
+    download, so larger transfers are charged that much; one of unknown size is charged max_transfer_bytes.
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when the transfer was not admitted in time.
+    """
+    admission = _admission.get()
+    if admission is None:
+        return
+    cost = admission.max_transfer_bytes if nbytes is None else min(nbytes, admission.max_transfer_bytes)
+    try:
+        admission.reservations.append(await admission.controller.acquire(container_name, cost))
+    except AdmissionRejected as ex:
+        raise _rejected(ex)
+
+
+async def hold(container_name: str, nbytes: int) -> Optional[Reservation]:
+    """
+    Waits until the worker has room for nbytes more of a transfer admitted with admit() and reserves them.
+
+    For transfers whose memory use varies as they run, such as an archive of many blobs, so they are charged
+    for what they hold rather than a flat amount. The bytes take no further container slot and are held until
+    the returned reservation is released, or at the latest until the response is sent. Since the response may
+    already have started, the bytes are never rejected: this waits for as long as the budget is in use.
+
+    Returns:
+        Optional[Reservation]: The reservation to release once the bytes are freed, or None without admission control.
+    """
+    admission = _admission.get()
+    if admission is None:
+        return None
+    reservation = await admission.controller.acquire(container_name, nbytes, slot=False, bounded=False)
+    admission.reservations.append(reservation)
+    return reservation
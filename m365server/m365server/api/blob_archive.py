@@ -0,0 +1,197 @@
+import asyncio
+import io
+import json
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from loguru import logger
+
+from m365server.api.stream_buffer import StreamBuffer
+
+ARCHIVE_MEDIA_TYPES = {
+    "zip": "application/zip",
+    "tar": "application/x-tar",
+}
+
+ERRORS_ENTRY_NAME = "_batch_errors.json"
+
+
+@dataclass
+class ArchiveMember:
+    """
+    One blob written to an archive, either downloaded whole as data or streamed from chunks of the given size.
+
+    release, when set, is called once the member has been written or dropped, to free what holding it reserved.
+    """
+    name: str
+    data: Optional[bytes] = None
+    last_modified: Optional[datetime] = None
+    chunks: Optional[AsyncIterator[bytes]] = None
+    size: Optional[int] = None
+    release: Optional[Callable[[], None]] = None
+
+    def written(self) -> None:
+        if self.release is not None:
+            self.release()
+            self.release = None
+
+
+class _ArchiveWriter:
+    def __init__(self, archive_format: str) -> None:
+        if archive_format not in ARCHIVE_MEDIA_TYPES:
+            raise ValueError(f"Unsupported archive format '{archive_format}'")
+        self.buffer = StreamBuffer()
+        if archive_format == "zip":
+            # Stored, not deflated: the payloads are mostly already compressed and deflating would block the loop.
+            self._zip = zipfile.ZipFile(self.buffer, mode="w", compression=zipfile.ZIP_STORED)
+            self._tar = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(fileobj=self.buffer, mode="w|")
+        self._entry = None
+        self._entry_size = 0
+
+    @staticmethod
+    def _modified(member: ArchiveMember) -> float:
+        return member.last_modified.timestamp() if member.last_modified else time.time()
+
+    def add(self, member: ArchiveMember) -> bytes:
+        modified = self._modified(member)
+        if self._zip is not None:
+            info = zipfile.ZipInfo(member.name, date_time=time.localtime(max(modified, 315532800))[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            self._zip.writestr(info, member.data)
+        else:
+            info = tarfile.TarInfo(member.name)
+            info.size = len(member.data)
+            info.mtime = int(modified)
+            self._tar.addfile(info, io.BytesIO(member.data))
+        return self.buffer.drain()
+
+    def open_entry(self, member: ArchiveMember) -> bytes:
+        """
+        Starts an entry of member.size bytes whose content is then passed to write() chunk by chunk.
+        """
+        modified = self._modified(member)
+        if self._zip is not None:
+            info = zipfile.ZipInfo(member.name, date_time=time.localtime(max(modified, 315532800))[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            self._entry = self._zip.open(info, mode="w", force_zip64=member.size >= zipfile.ZIP64_LIMIT)
+        else:
+            info = tarfile.TarInfo(member.name)
+            info.size = member.size
+            info.mtime = int(modified)
+            # What TarFile.addfile writes ahead of the content, which it can only take from a file object.
+            header = info.tobuf(self._tar.format, self._tar.encoding, self._tar.errors)
+            self._tar.fileobj.write(header)
+            self._tar.offset += len(header)
+            self._tar.members.append(info)
+            self._entry = info
+        self._entry_size = 0
+        return self.buffer.drain()
+
+    def write(self, chunk: bytes) -> bytes:
+        self._entry_size += len(chunk)
+        if self._zip is not None:
+            self._entry.write(chunk)
+        else:
+            self._tar.fileobj.write(chunk)
+        return self.buffer.drain()
+
+    def close_entry(self) -> bytes:
+        entry, self._entry = self._entry, None
+        if self._zip is not None:
+            entry.close()
+            return self.buffer.drain()
+        if self._entry_size != entry.size:
+            raise IOError(f"Blob '{entry.name}' changed size while it was archived")
+        blocks, remainder = divmod(entry.size, tarfile.BLOCKSIZE)
+        if remainder:
+            self._tar.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+            blocks += 1
+        self._tar.offset += blocks * tarfile.BLOCKSIZE
+        return self.buffer.drain()
+
+    def close(self) -> bytes:
+        (self._zip or self._tar).close()
+        return self.buffer.drain()
+
+
+async def iter_blob_archive(blob_names: List[str], fetch: Callable[[str], Awaitable[ArchiveMember]],
+                            archive_format: str = "zip", max_concurrency: int = 16) -> AsyncIterator[bytes]:
+    """
+    Fetches blobs concurrently and yields them as a single zip or tar archive.
+
+    Entries are written in the order the downloads complete, so the archive finishes shortly after the
+    slowest blob rather than after the sum of all of them. At most max_concurrency blobs are downloading
+    or waiting to be written at a time, since a download's slot is only freed once its blob has been
+    written, which bounds memory use however slowly the client reads. A member
+    fetched as chunks rather than data is streamed into the archive when its turn comes, so large blobs
+    are never held whole. Blobs that fail to download are left out and listed in a trailing
+    _batch_errors.json entry, because the response status has already been sent by then; a streamed
+    blob that fails part way ends the response, since its entry has been started.
+
+    Args:
+        blob_names (List[str]): The blobs to include.
+        fetch (Callable[[str], Awaitable[ArchiveMember]]): Downloads one blob, or opens its stream.
+        archive_format (str): "zip" or "tar".
+        max_concurrency (int): Maximum number of blobs downloaded at the same time.
+
+    Yields:
+        bytes: The next part of the archive.
+    """
+    writer = _ArchiveWriter(archive_format)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # Never holds more than max_concurrency results, one per slot taken.
+    finished: asyncio.Queue = asyncio.Queue()
+
+    async def download(name: str) -> None:
+        await semaphore.acquire()
+        try:
+            result: Tuple[str, object] = (name, await fetch(name))
+        except asyncio.CancelledError:
+            semaphore.release()
+            raise
+        except Exception as ex:
+            result = (name, ex)
+        finished.put_nowait(result)
+
+    tasks = [asyncio.create_task(download(name)) for name in blob_names]
+    errors = []
+    try:
+        for _ in range(len(tasks)):
+            name, result = await finished.get()
+            if isinstance(result, Exception):
+                semaphore.release()
+                logger.warning(f"Leaving blob '{name}' out of archive: {result}")
+                errors.append({"blob_name": name, "error": str(result)})
+                continue
+            try:
+                if result.chunks is None:
+                    yield writer.add(result)
+                    continue
+                yield writer.open_entry(result)
+                async for chunk in result.chunks:
+                    yield writer.write(chunk)
+                yield writer.close_entry()
+            finally:
+                if result.chunks is not None:
+                    await result.chunks.aclose()
+                result.written()
+                semaphore.release()
+        if errors:
+            yield writer.add(ArchiveMember(ERRORS_ENTRY_NAME, json.dumps(errors, indent=2).encode()))
+        yield writer.close()
+        logger.info(f"Archived {len(blob_names) - len(errors)} of {len(blob_names)} blob(s)")
+    finally:
+        # Stops outstanding downloads if the client disconnects mid-stream.
+        for task in tasks:
+            task.cancel()
+        while not finished.empty():
+            _, result = finished.get_nowait()
+            if isinstance(result, ArchiveMember):
+                result.written()
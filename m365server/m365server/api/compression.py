@@ -0,0 +1,157 @@
+import asyncio
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, Optional
+
+import zstandard
+
+from fastapi.responses import Response
+
+from m365server.azure_interface.configuration import CompressionConfig, get_compression_config
+
+# In order of preference when the client accepts several with the same quality.
+ENCODINGS = ("zstd", "gzip")
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "application/x-yaml",
+    "application/yaml",
+    "application/csv",
+    "image/svg+xml",
+}
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """
+    Returns True for text-like content types. Parquet, Office documents, PDFs, archives and images are
+    already compressed, so they and unknown binary types are sent as they are.
+    """
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES or media_type.endswith("+json")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Picks the content coding to use from an Accept-Encoding header.
+
+    Args:
+        accept_encoding (Optional[str]): The raw Accept-Encoding header.
+
+    Returns:
+        Optional[str]: "zstd" or "gzip", or None to send the identity encoding.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    wildcard = qualities.get("*", 0.0)
+    candidates = [(qualities.get(encoding, wildcard), -rank, encoding) for rank, encoding in enumerate(ENCODINGS)]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+def choose_encoding(accept_encoding: Optional[str], content_type: Optional[str], size: Optional[int],
+                    config: CompressionConfig) -> Optional[str]:
+    """
+    Returns the encoding to compress a response with, or None to send it uncompressed.
+
+    Args:
+        accept_encoding (Optional[str]): The raw Accept-Encoding header.
+        content_type (Optional[str]): The content type of the response body.
+        size (Optional[int]): The size of the body, or None if it is streamed and unknown.
+        config (CompressionConfig): Compression settings.
+    """
+    if not config.enabled or not is_compressible(content_type):
+        return None
+    if size is not None and size < config.min_size:
+        return None
+    return negotiate_encoding(accept_encoding)
+
+
+class _Compressor:
+    def __init__(self, encoding: str, config: CompressionConfig) -> None:
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(config.gzip_level, zlib.DEFLATED, 31)
+            self._sync_flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = lambda: self._compressor.flush(zlib.Z_FINISH)
+        elif encoding == "zstd":
+            self._compressor = zstandard.ZstdCompressor(level=config.zstd_level).compressobj()
+            self._sync_flush = lambda: self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self._finish = lambda: self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+        else:
+            raise ValueError(f"Unsupported encoding '{encoding}'")
+
+    def compress(self, data: bytes) -> bytes:
+        # Flushing after every chunk lets the client decode each chunk as soon as it arrives.
+        return self._compressor.compress(data) + self._sync_flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def compress_bytes(data: bytes, encoding: str, config: CompressionConfig) -> bytes:
+    compressor = _Compressor(encoding, config)
+    return compressor.compress(data) + compressor.finish()
+
+
+async def compress_stream(chunks: AsyncIterator[bytes], encoding: str, config: CompressionConfig) -> AsyncIterator[bytes]:
+    """
+    Compresses a streamed body chunk by chunk in a worker thread, keeping the event loop free.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The uncompressed body.
+        encoding (str): "gzip" or "zstd".
+        config (CompressionConfig): Compression settings.
+
+    Yields:
+        bytes: The compressed body.
+    """
+    compressor = _Compressor(encoding, config)
+    async for chunk in chunks:
+        compressed = await asyncio.to_thread(compressor.compress, chunk)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
+
+
+def encoded_headers(headers: Dict[str, str], encoding: Optional[str]) -> Dict[str, str]:
+    """
+    Returns response headers for a body sent with the given content coding.
+
+    A compressed body is a different representation from the blob, so its ETag is made weak: it still
+    satisfies If-None-Match, which uses weak comparison, but never If-Range, which requires a strong match.
+    """
+    if encoding is None:
+        return headers
+    headers = {**headers, "Content-Encoding": encoding}
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+    return headers
+
+
+async def json_response(payload: Any, accept_encoding: Optional[str]) -> Response:
+    """
+    Serializes a JSON payload, compressing it in a worker thread when the client accepts it and it is large enough.
+    """
+    config = get_compression_config()
+    body = json.dumps(payload).encode()
+    encoding = choose_encoding(accept_encoding, "application/json", len(body), config)
+    headers = {"Vary": "Accept-Encoding"} if config.enabled else {}
+    if encoding is not None:
+        body = await asyncio.to_thread(compress_bytes, body, encoding, config)
+    return Response(body, media_type="application/json", headers=encoded_headers(headers, encoding))
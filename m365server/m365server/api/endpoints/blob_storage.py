@@ -1,85 +1,448 @@
-from fastapi import APIRouter, File, UploadFile, Path, Query
-import io
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, Header, UploadFile, Path, Query
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+import asyncio
+from datetime import datetime
+from pydantic import BaseModel, Field
+import json
+import secrets
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.exceptions import HTTPException
-from m365server.azure_interface.azure_blob_storage_manager import AzureBlobStorageManager,  ResourceNotFoundError
-from m365server.azure_interface.configuration import get_default_config
-from m365server.deps import get_cache
+from azure.core.exceptions import ResourceNotFoundError
+import pyarrow as pa
+from m365server.azure_interface.admission import AdmissionController
+from m365server.azure_interface.aio import AzureBlobStorageManager, BlobRangeFile
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+from m365server.azure_interface.blob_operations import BlobDeleteResult
+from m365server.azure_interface.configuration import get_batch_download_config, get_compression_config
+from m365server.azure_interface.derived_parquet import ConversionError, DerivedParquetStore
+from m365server.azure_interface.parquet_metadata import InvalidParquetError, ParquetMetadataReader
+from m365server.azure_interface.profiling import span
+from m365server.deps import (get_admission_controller, get_derived_parquet_store, get_parquet_metadata_reader,
+                             get_storage_manager)
+from m365server.api.admission import admit, hold
+from m365server.api.blob_archive import ARCHIVE_MEDIA_TYPES, ArchiveMember, iter_blob_archive
+from m365server.api.parquet_query import ARROW_STREAM_MEDIA_TYPE, QueryError, iter_arrow_ipc, open_parquet_scan
+from m365server.api.compression import (choose_encoding, compress_bytes, compress_stream, encoded_headers,
+                                         is_compressible, json_response)
+from m365server.api.http_conditional import if_range_matches, is_not_modified, validator_headers
+from m365server.api.http_ranges import (RangeNotSatisfiable, content_range, iter_multipart_byteranges,
+                                        multipart_byteranges_length, parse_range_header)
 
 from loguru import logger
-import tempfile
 
 router = APIRouter()
 
 @router.post("/upload_blob/{container_name}")
-async def upload_blob_bytes(container_name: str, blob_name: str, file: UploadFile = File(...)):
+async def upload_blob_bytes(container_name: str, blob_name: str, file: UploadFile = File(...),
+                            storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
     """
     Uploads a file to a blob in Azure Blob Storage.
+
+    The spooled upload is read and staged block by block rather than copied into memory.
+    AdmissionMiddleware admits the upload by its Content-Length before the body is read, and answers 429
+    when the worker has no room for the transfer.
     """
     logger.info('Upload blob')
-    storage_manager = AzureBlobStorageManager(get_default_config())
-    file_data = io.BytesIO(await file.read())
-    storage_manager.upload_blob(container_name, blob_name, file_data)
+    await file.seek(0)
+    await storage_manager.upload_blob(container_name, blob_name, file)
     return {"message": f"File uploaded to blob '{blob_name}' in container '{container_name}'"}
 
 @router.get("/download_blob/{container_name}")
 async def download_blob(container_name: str = Path(..., description="The name of the container where the blob is located."),
-                         blob_name: str = Query(..., description="The name of the blob to download the data from.")):
+                         blob_name: str = Query(..., description="The name of the blob to download the data from."),
+                         range_header: Optional[str] = Header(None, alias="Range"),
+                         if_range: Optional[str] = Header(None, alias="If-Range"),
+                         if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+                         if_modified_since: Optional[str] = Header(None, alias="If-Modified-Since"),
+                         accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+                         storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
     """
-    Downloads data from a blob and returns it as a stream.
+    Streams a blob, honouring single and multi-range Range headers with 206 responses.
+
+    Responses carry ETag and Last-Modified from the blob properties. If-None-Match and
+    If-Modified-Since are honoured with a bodiless 304 when the blob is unchanged.
+    Full responses of text-like blobs are compressed with zstd or gzip when the client
+    accepts it; range responses are always sent as stored. Other full responses of blobs
+    the disk cache takes are sent from the local copy with FileResponse, or fill it while
+    they stream on a miss.
+
+    Responses with a body wait for admission, and are answered with 429 when the worker has no room.
     """
     logger.info(f"Downloading blob {blob_name} from container {container_name}")
-    storage_manager = AzureBlobStorageManager(get_default_config())
     try:
-        blob_data = storage_manager.download_blob(container_name, blob_name)
+        properties = await storage_manager.get_blob_properties(container_name, blob_name)
     except ResourceNotFoundError:
         raise HTTPException(status_code=404, detail=f"Blob '{blob_name}' not found in container '{container_name}'.")
-    return StreamingResponse(io.BytesIO(blob_data), media_type="application/octet-stream")
-
-
-def delete_blob(self, container_name: str, blob_name: str) -> None:
-        """
-        Deletes a blob from a specified container.
-        
-        Args:
-            container_name (str): The name of the container where the blob is located.
-            blob_name (str): The name of the blob to be deleted.
-        """
-        storage_manager = AzureBlobStorageManager(get_default_config())
-        container_client = self.container_clients.get(container_name)
-        if container_client:
-            logger.info(f'Deleting blob "{blob_name}"')
-            container_client.delete_blob(blob_name)
-            logger.info(f'Successfully deleted blob "{blob_name}"')
+
+    size = properties.size
+    etag = properties.etag
+    content_type = properties.content_settings.content_type or "application/octet-stream"
+    headers = {"Accept-Ranges": "bytes", **validator_headers(etag, properties.last_modified)}
+    compression = get_compression_config()
+    encoding = choose_encoding(accept_encoding, content_type, size, compression)
+    if compression.enabled and is_compressible(content_type):
+        headers["Vary"] = "Accept-Encoding"
+    if is_not_modified(if_none_match, if_modified_since, etag, properties.last_modified):
+        return Response(status_code=304, headers=encoded_headers(headers, encoding))
+
+    if not if_range_matches(if_range, etag, properties.last_modified):
+        range_header = None
+    try:
+        ranges = parse_range_header(range_header, size)
+    except RangeNotSatisfiable:
+        raise HTTPException(status_code=416, detail=f"Range '{range_header}' not satisfiable for blob '{blob_name}'.",
+                            headers={"Content-Range": f"bytes */{size}"})
+    await admit(container_name, sum(end - start + 1 for start, end in ranges) if ranges else size)
+
+    if not ranges and storage_manager.blob_cache is not None and storage_manager.blob_cache.accepts(size):
+        blob_data = await storage_manager.download_blob(container_name, blob_name, properties=properties)
+        if encoding is not None:
+            with span("compress"):
+                blob_data = await asyncio.to_thread(compress_bytes, blob_data, encoding, compression)
+        return Response(blob_data, media_type=content_type, headers=encoded_headers(headers, encoding))
+
+    if not ranges:
+        if encoding is None and storage_manager.disk_cache is not None:
+            path = await storage_manager.local_blob_path(container_name, blob_name, properties)
+            if path is not None:
+                return FileResponse(path, media_type=content_type, headers=headers)
+            body = storage_manager.stream_blob_cached(container_name, blob_name, properties)
         else:
-            logger.error(f"Container '{container_name}' not found")
+            body = storage_manager.stream_blob(container_name, blob_name, etag=etag)
+        if encoding is not None:
+            return StreamingResponse(compress_stream(body, encoding, compression), media_type=content_type,
+                                     headers=encoded_headers(headers, encoding))
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(body, media_type=content_type, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = content_range(ranges[0], size)
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(storage_manager.stream_blob(container_name, blob_name, offset=start, length=end - start + 1, etag=etag),
+                                 status_code=206, media_type=content_type, headers=headers)
+
+    boundary = secrets.token_hex(16)
+    headers["Content-Length"] = str(multipart_byteranges_length(ranges, size, content_type, boundary))
+    body = iter_multipart_byteranges(
+        ranges, size, content_type, boundary,
+        lambda offset, length: storage_manager.stream_blob(container_name, blob_name, offset=offset, length=length, etag=etag)
+    )
+    return StreamingResponse(body, status_code=206, media_type=f"multipart/byteranges; boundary={boundary}", headers=headers)
+
+
+class BatchDownloadRequest(BaseModel):
+    blob_names: Optional[List[str]] = Field(None, description="The blobs to download.")
+    prefix: Optional[str] = Field(None, description="Download every blob whose name starts with this prefix.")
+    archive_format: Literal["zip", "tar"] = Field("zip", description="The archive format of the response.")
+
+@router.post("/download_blobs/{container_name}")
+async def download_blobs(request: BatchDownloadRequest,
+                         container_name: str = Path(..., description="The name of the container where the blobs are located."),
+                         storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Downloads many blobs as a single zip or tar archive.
+
+    Blobs are fetched concurrently and written to the response as they arrive. Blobs larger than the
+    stream threshold are streamed into the archive instead of being downloaded whole, and every member
+    is charged to admission control for the bytes it holds until it has been written.
+    """
+    if not request.blob_names and request.prefix is None:
+        raise HTTPException(status_code=400, detail="Either blob_names or prefix is required.")
+    config = get_batch_download_config()
+
+    entries: Dict[str, BlobEntry] = {}
+    if request.prefix is not None:
+        try:
+            async for page in storage_manager.iter_blob_pages(container_name, prefix=request.prefix, page_size=5000):
+                entries.update((blob.name, blob) for blob in page.blobs)
+                if len(entries) > config.max_blobs:
+                    break
+        except ResourceNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Container '{container_name}' not found.")
+    blob_names = list(dict.fromkeys([*(request.blob_names or []), *entries]))
+    if len(blob_names) > config.max_blobs:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {config.max_blobs} blobs.")
+    # The members are charged as they are fetched; this only takes the request's container slot.
+    await admit(container_name, 0)
+
+    async def fetch(blob_name: str) -> ArchiveMember:
+        entry = entries.get(blob_name)
+        if entry is None:
+            entry = BlobEntry.from_properties(await storage_manager.get_blob_properties(container_name, blob_name))
+        last_modified = datetime.fromisoformat(entry.last_modified) if entry.last_modified else None
+        # A streamed member holds a few chunks at a time, which the threshold bounds.
+        reservation = await hold(container_name, min(entry.size, config.stream_threshold_bytes))
+        release = reservation.release if reservation is not None else None
+        if entry.size > config.stream_threshold_bytes:
+            chunks = storage_manager.stream_blob(container_name, blob_name, etag=entry.etag)
+            return ArchiveMember(blob_name, last_modified=last_modified, chunks=chunks, size=entry.size, release=release)
+        try:
+            # A listing entry carries the size and ETag download_blob needs, so no extra lookup is made.
+            data = await storage_manager.download_blob(container_name, blob_name, properties=entry)
+        except BaseException:
+            if release is not None:
+                release()
+            raise
+        return ArchiveMember(blob_name, data, last_modified, release=release)
+
+    logger.info(f"Archiving {len(blob_names)} blob(s) from container '{container_name}'")
+    body = iter_blob_archive(blob_names, fetch, request.archive_format, config.max_concurrency)
+    filename = f"{container_name}.{request.archive_format}"
+    return StreamingResponse(body, media_type=ARCHIVE_MEDIA_TYPES[request.archive_format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+class ParquetQueryRequest(BaseModel):
+    blob_name: str = Field(..., description="The parquet blob to query.")
+    columns: Optional[List[str]] = Field(None, description="Columns to return; every column if omitted.")
+    filters: List[Tuple[str, str, Any]] = Field(
+        default_factory=list,
+        description="[column, operator, value] conditions combined with AND. Operators: =, !=, <, <=, >, >=, in."
+    )
+
+@router.post("/query_parquet/{container_name}")
+async def query_parquet(request: ParquetQueryRequest,
+                        container_name: str = Path(..., description="The name of the container where the blob is located."),
+                        storage_manager: AzureBlobStorageManager = Depends(get_storage_manager),
+                        derived_store: Optional[DerivedParquetStore] = Depends(get_derived_parquet_store)):
+    """
+    Returns the selected columns of the matching rows of a parquet blob as an Arrow IPC stream.
+
+    Only the footer and the column chunks of row groups that can match the filters are downloaded.
+    CSV, JSON and Excel blobs are queried through their derived parquet copy.
+    """
+    try:
+        properties = await storage_manager.get_blob_properties(container_name, request.blob_name)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Blob '{request.blob_name}' not found in container '{container_name}'.")
+    if derived_store is not None:
+        try:
+            properties = await derived_store.get_parquet_blob(container_name, request.blob_name, properties)
+        except ConversionError as ex:
+            raise HTTPException(status_code=400, detail=str(ex))
+    source = await BlobRangeFile.open(storage_manager, container_name, properties.name, properties)
+    try:
+        scanner = await asyncio.to_thread(open_parquet_scan, source, request.columns, request.filters)
+    except QueryError as ex:
+        source.close()
+        raise HTTPException(status_code=400, detail=str(ex))
+    except pa.ArrowInvalid as ex:
+        source.close()
+        raise HTTPException(status_code=400, detail=f"Blob '{request.blob_name}' is not a readable parquet file: {ex}")
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            async for data in iter_arrow_ipc(scanner):
+                yield data
+        finally:
+            source.close()
+
+    return StreamingResponse(body(), media_type=ARROW_STREAM_MEDIA_TYPE)
+
+@router.get("/parquet_metadata/{container_name}")
+async def parquet_metadata(container_name: str = Path(..., description="The name of the container where the blobs are located."),
+                           blob_name: Optional[str] = Query(None, description="The parquet blob to describe."),
+                           prefix: Optional[str] = Query(None, description="Describe every .parquet blob whose name starts with this prefix."),
+                           limit: int = Query(1000, ge=1, le=10000, description="Maximum number of blobs described for a prefix."),
+                           storage_manager: AzureBlobStorageManager = Depends(get_storage_manager),
+                           reader: ParquetMetadataReader = Depends(get_parquet_metadata_reader)):
+    """
+    Returns the schema, row counts and per row group column statistics and sizes of parquet blobs.
+
+    Only the footer of each blob is read, and parsed footers are cached by ETag.
+    """
+    if (blob_name is None) == (prefix is None):
+        raise HTTPException(status_code=400, detail="Exactly one of blob_name or prefix is required.")
+    if blob_name is not None:
+        try:
+            return await reader.get(container_name, blob_name)
+        except ResourceNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Blob '{blob_name}' not found in container '{container_name}'.")
+        except InvalidParquetError as ex:
+            raise HTTPException(status_code=400, detail=str(ex))
+
+    entries: List[BlobEntry] = []
+    try:
+        async for page in storage_manager.iter_blob_pages(container_name, prefix=prefix, page_size=5000):
+            entries.extend(blob for blob in page.blobs if blob.name.endswith(".parquet"))
+            if len(entries) >= limit:
+                break
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container '{container_name}' not found.")
+    return {"blobs": await reader.get_many(container_name, entries[:limit])}
+
+@router.post("/derive_parquet/{container_name}")
+async def derive_parquet(container_name: str = Path(..., description="The name of the container where the blob is located."),
+                         blob_name: str = Query(..., description="The CSV, JSON or Excel blob to convert."),
+                         derived_store: Optional[DerivedParquetStore] = Depends(get_derived_parquet_store)):
+    """
+    Returns the name of the parquet copy of a tabular blob, creating or refreshing it if the source has changed.
+    """
+    if derived_store is None:
+        raise HTTPException(status_code=404, detail="Derived parquet copies are disabled.")
+    try:
+        properties = await derived_store.get_parquet_blob(container_name, blob_name)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Blob '{blob_name}' not found in container '{container_name}'.")
+    except ConversionError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+    return {"blob_name": blob_name, "parquet_blob_name": properties.name}
+
+@router.delete("/delete_blob/{container_name}")
+async def delete_blob(container_name: str = Path(..., description="The name of the container where the blob is located."),
+                      blob_name: str = Query(..., description="The name of the blob to delete."),
+                      storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Deletes a blob from a specified container.
+    """
+    try:
+        await storage_manager.delete_blob(container_name, blob_name)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Blob '{blob_name}' not found in container '{container_name}'.")
+    return {"message": f"Blob '{blob_name}' deleted from container '{container_name}'"}
+
+class BatchDeleteRequest(BaseModel):
+    blob_names: List[str] = Field(..., description="The blobs to delete.")
+
+@router.post("/delete_blobs/{container_name}")
+async def delete_blobs(request: BatchDeleteRequest,
+                       container_name: str = Path(..., description="The name of the container where the blobs are located."),
+                       storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Deletes many blobs from a specified container using batch requests of up to 256 blobs.
+    """
+    results = await storage_manager.delete_blobs(container_name, list(dict.fromkeys(request.blob_names)))
+    return _delete_summary(results)
+
+@router.delete("/delete_prefix/{container_name}")
+async def delete_prefix(container_name: str = Path(..., description="The name of the container where the blobs are located."),
+                        prefix: str = Query(..., min_length=1, description="Delete every blob whose name starts with this prefix."),
+                        storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Deletes every blob under a prefix, such as a Spark output directory.
+    """
+    try:
+        results = await storage_manager.delete_blobs_by_prefix(container_name, prefix)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container '{container_name}' not found.")
+    return _delete_summary(results)
+
+def _delete_summary(results: List[BlobDeleteResult]) -> dict:
+    deleted = sum(result.deleted for result in results)
+    return {
+        "deleted": deleted,
+        "failed": len(results) - deleted,
+        "results": [result.to_dict() for result in results],
+    }
 
 @router.get("/list_blobs/{container_name}")
-async def list_blobs(container_name: str = Path(..., description="The name of the container to list the blobs from.")):
+async def list_blobs(container_name: str = Path(..., description="The name of the container to list the blobs from."),
+                     prefix: Optional[str] = Query(None, description="Only list blobs whose names start with this prefix."),
+                     delimiter: Optional[str] = Query(None, description="Group blob names into virtual directories on this delimiter, e.g. '/'."),
+                     page_size: Optional[int] = Query(None, ge=1, le=5000, description="Return a single page of at most this many results."),
+                     continuation_token: Optional[str] = Query(None, description="Resume a paginated listing from a previous response."),
+                     details: bool = Query(False, description="Return name, size, etag and last_modified for each blob instead of names."),
+                     stream: bool = Query(False, description="Stream entries as newline-delimited JSON as Azure pages arrive."),
+                     accept_encoding: Optional[str] = Header(None, alias="Accept-Encoding"),
+                     storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
     """
     Lists the blobs in a specified container.
+
+    Filtering is pushed down to Azure. Without page_size or continuation_token every page
+    is returned in one response; otherwise a single page is returned along with the token
+    for the next one.
     """
-    storage_manager = AzureBlobStorageManager(get_default_config())
-    blobs = storage_manager.list_blobs(container_name)
-    blob_names = [blob for blob in blobs]
-    return {"blobs": blob_names}
+    pages = storage_manager.iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token)
+    try:
+        first_page = await anext(pages, None)
+    except ResourceNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container '{container_name}' not found.")
+
+    if stream:
+        compression = get_compression_config()
+        body = _ndjson_listing(first_page, pages)
+        encoding = choose_encoding(accept_encoding, "application/x-ndjson", None, compression)
+        headers = {"Vary": "Accept-Encoding"} if compression.enabled else {}
+        if encoding is not None:
+            body = compress_stream(body, encoding, compression)
+        return StreamingResponse(body, media_type="application/x-ndjson", headers=encoded_headers(headers, encoding))
+
+    listing = first_page or BlobListingPage()
+    if page_size is None and continuation_token is None:
+        listing = BlobListingPage(list(listing.blobs), list(listing.prefixes), listing.continuation_token)
+        async for page in pages:
+            listing.blobs.extend(page.blobs)
+            listing.prefixes.extend(page.prefixes)
+            listing.continuation_token = page.continuation_token
+    else:
+        await pages.aclose()
+
+    logger.info(f'Listed {len(listing.blobs)} blob(s) in container "{container_name}"')
+    return await json_response({
+        "blobs": [blob.to_dict() if details else blob.name for blob in listing.blobs],
+        "prefixes": listing.prefixes,
+        "continuation_token": listing.continuation_token,
+    }, accept_encoding)
+
+async def _ndjson_listing(first_page: Optional[BlobListingPage], pages: AsyncIterator[BlobListingPage]) -> AsyncIterator[bytes]:
+    if first_page is None:
+        return
+    page = first_page
+    while page is not None:
+        lines = [json.dumps({"prefix": prefix}) for prefix in page.prefixes]
+        lines.extend(json.dumps(blob.to_dict()) for blob in page.blobs)
+        if lines:
+            yield ("\n".join(lines) + "\n").encode()
+        page = await anext(pages, None)
 
 @router.get("/list_containers")
-async def list_containers():
+async def list_containers(storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
     """
     Lists all containers in the storage account.
     """
-    storage_manager = AzureBlobStorageManager(get_default_config())
-    containers = storage_manager.list_containers()
+    containers = await storage_manager.list_containers()
     container_names = [container for container in containers]
     logger.info(container_names)
     return {"containers": container_names}
 
 @router.get("/list_container_info")
-async def list_container_info():
+async def list_container_info(refresh: bool = Query(False, description="Rescan every container instead of using cached stats."),
+                              storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Retrieves blob count, total size and modification time range for every container.
+    """
+    stats = await storage_manager.get_container_stats(refresh=refresh)
+    return {"container_info": [container_stats.to_dict() for container_stats in stats]}
+
+@router.get("/container_stats/{container_name}")
+async def container_stats(container_name: str = Path(..., description="The name of the container to describe."),
+                          refresh: bool = Query(False, description="Rescan the container instead of using cached stats."),
+                          storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Retrieves blob count, total size and modification time range for a specified container.
+    """
+    stats = await storage_manager.get_container_stats([container_name], refresh=refresh)
+    if not stats:
+        raise HTTPException(status_code=404, detail=f"Container '{container_name}' not found.")
+    return stats[0].to_dict()
+
+@router.get("/cache_stats")
+async def cache_stats(storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)):
+    """
+    Returns the blob cache hit and miss counters and its current size, and those of the disk cache under "disk".
+    """
+    stats = {"enabled": False}
+    if storage_manager.blob_cache is not None:
+        stats = {"enabled": True, **(await storage_manager.blob_cache.stats())}
+    if storage_manager.disk_cache is not None:
+        stats["disk"] = {"enabled": True, **(await storage_manager.disk_cache.stats())}
+    return stats
+
+@router.get("/admission_stats")
+async def admission_stats(controller: Optional[AdmissionController] = Depends(get_admission_controller)):
     """
-    Retrieves information about a specified container.
+    Returns the bytes and transfers this worker has admitted and queued, and the share of its byte budget in use.
     """
-    storage_manager = AzureBlobStorageManager(get_default_config())
-    container_info = storage_manager.log_container_info()
-    return {"container_info": container_info}
\ No newline at end of file
+    if controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **controller.stats()}
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _to_utc_seconds(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _quoted(etag: str) -> str:
+    return etag if etag.startswith('"') or etag.startswith('W/"') else f'"{etag}"'
+
+
+def validator_headers(etag: Optional[str], last_modified: Optional[datetime]) -> Dict[str, str]:
+    """
+    Returns the ETag and Last-Modified response headers for a representation.
+    """
+    headers = {}
+    if etag:
+        headers["ETag"] = _quoted(etag)
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(_to_utc_seconds(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(if_none_match: Optional[str], if_modified_since: Optional[str],
+                    etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Evaluates If-None-Match and If-Modified-Since for a GET request, as RFC 9110 section 13.2.2 orders them.
+
+    If-Modified-Since is only considered when If-None-Match is absent.
+
+    Args:
+        if_none_match (Optional[str]): The raw If-None-Match header.
+        if_modified_since (Optional[str]): The raw If-Modified-Since header.
+        etag (Optional[str]): The current entity tag of the representation.
+        last_modified (Optional[datetime]): The current modification time of the representation.
+
+    Returns:
+        bool: True if a 304 Not Modified response should be sent.
+    """
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        if not etag:
+            return False
+        current = _opaque_tag(_quoted(etag))
+        # Weak comparison: W/"x" matches "x".
+        return any(_opaque_tag(candidate) == current for candidate in if_none_match.split(","))
+
+    since = _parse_http_date(if_modified_since)
+    if since is None or last_modified is None:
+        return False
+    return _to_utc_seconds(last_modified) <= since
+
+
+def if_range_matches(if_range: Optional[str], etag: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """
+    Returns True if a Range header should be honoured given the request's If-Range validator.
+
+    Entity tags use strong comparison, so weak tags never match.
+    """
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return bool(etag) and not if_range.startswith("W/") and if_range == _quoted(etag)
+    since = _parse_http_date(if_range)
+    return since is not None and last_modified is not None and _to_utc_seconds(last_modified) == since
@@ -0,0 +1,134 @@
+from typing import AsyncIterable, AsyncIterator, Callable, List, Optional, Tuple
+
+ByteRange = Tuple[int, int]
+
+# Each range is fetched from storage on its own, so a request may ask for at most this many after merging.
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(Exception):
+    """
+    Raised when a Range header is well formed but none of its ranges overlap the resource.
+    """
+
+
+def _merge(ranges: List[ByteRange]) -> List[ByteRange]:
+    """
+    Coalesces overlapping and adjacent ranges, returning the ranges in ascending order if any were merged.
+    """
+    merged: List[ByteRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged if len(merged) < len(ranges) else ranges
+
+
+def parse_range_header(range_header: Optional[str], size: int, max_ranges: int = MAX_RANGES) -> Optional[List[ByteRange]]:
+    """
+    Parses an HTTP Range header into inclusive (start, end) byte offsets.
+
+    Syntactically invalid headers and units other than bytes are ignored, as RFC 9110
+    requires, so the caller should serve the full representation when None is returned.
+    Overlapping and adjacent ranges are merged, and a header asking for more than
+    max_ranges ranges after that is ignored too, as RFC 9110 allows.
+
+    Args:
+        range_header (Optional[str]): The raw value of the Range header.
+        size (int): The size of the resource in bytes.
+        max_ranges (int): Most ranges served for one request.
+
+    Returns:
+        Optional[List[ByteRange]]: The satisfiable ranges in request order, in ascending order when some were merged,
+            or None if the header should be ignored.
+
+    Raises:
+        RangeNotSatisfiable: If no requested range overlaps the resource.
+    """
+    if not range_header:
+        return None
+    unit, _, range_set = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not range_set.strip():
+        return None
+
+    ranges: List[ByteRange] = []
+    for spec in range_set.split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        first, dash, last = spec.partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or not (first.isdigit() or first == "") or not (last.isdigit() or last == ""):
+            return None
+        if first == "":
+            if last == "":
+                return None
+            # Suffix range: the final N bytes of the resource.
+            suffix_length = int(last)
+            if suffix_length == 0 or size == 0:
+                continue
+            ranges.append((max(size - suffix_length, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = int(last) if last else size - 1
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable(f"None of the requested ranges are satisfiable for a resource of {size} bytes")
+    ranges = _merge(ranges)
+    return ranges if len(ranges) <= max_ranges else None
+
+
+def content_range(byte_range: ByteRange, size: int) -> str:
+    start, end = byte_range
+    return f"bytes {start}-{end}/{size}"
+
+
+def _part_header(byte_range: ByteRange, size: int, content_type: str, boundary: str) -> bytes:
+    return (
+        f"--{boundary}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Range: {content_range(byte_range, size)}\r\n"
+        "\r\n"
+    ).encode("latin-1")
+
+
+def _closing_delimiter(boundary: str) -> bytes:
+    return f"--{boundary}--\r\n".encode("latin-1")
+
+
+def multipart_byteranges_length(ranges: List[ByteRange], size: int, content_type: str, boundary: str) -> int:
+    """
+    Returns the exact Content-Length of the multipart/byteranges body produced by iter_multipart_byteranges.
+    """
+    length = len(_closing_delimiter(boundary))
+    for byte_range in ranges:
+        start, end = byte_range
+        length += len(_part_header(byte_range, size, content_type, boundary)) + (end - start + 1) + len(b"\r\n")
+    return length
+
+
+async def iter_multipart_byteranges(ranges: List[ByteRange], size: int, content_type: str, boundary: str,
+                                    fetch: Callable[[int, int], AsyncIterable[bytes]]) -> AsyncIterator[bytes]:
+    """
+    Yields a multipart/byteranges body, fetching each part lazily so only one chunk is held at a time.
+
+    Args:
+        ranges (List[ByteRange]): The inclusive byte ranges to send.
+        size (int): The size of the resource in bytes.
+        content_type (str): The content type of the resource, repeated in each part.
+        boundary (str): The multipart boundary.
+        fetch (Callable[[int, int], AsyncIterable[bytes]]): Called with (offset, length) to stream the bytes of one range.
+    """
+    for byte_range in ranges:
+        start, end = byte_range
+        yield _part_header(byte_range, size, content_type, boundary)
+        async for chunk in fetch(start, end - start + 1):
+            yield chunk
+        yield b"\r\n"
+    yield _closing_delimiter(boundary)
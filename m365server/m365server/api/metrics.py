@@ -0,0 +1,124 @@
+import asyncio
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, \
+    generate_latest, multiprocess
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Requests that match no route share one label, so unknown paths cannot grow the number of series.
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_SECONDS = Histogram(
+    "m365server_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response, by route and status.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+REQUESTS_IN_PROGRESS = Gauge(
+    "m365server_requests_in_progress",
+    "Requests currently being handled.",
+    multiprocess_mode="livesum"
+)
+
+HTTP_BYTES = Counter(
+    "m365server_http_bytes_total",
+    "Request body bytes received and response body bytes sent, by route.",
+    ["route", "direction"]
+)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Returns the path template of the route that handled a request, or UNMATCHED_ROUTE.
+    """
+    # FastAPI versions that keep included routers nested hold the full template, prefixes included, in
+    # the effective route context; older versions flatten included routes, so the route's own path is complete.
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def multiprocess_enabled() -> bool:
+    """
+    Returns True when metrics are shared between uvicorn workers through files in PROMETHEUS_MULTIPROC_DIR.
+
+    The variable must be set, and the directory emptied, before the workers start.
+    """
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def collect_metrics() -> bytes:
+    """
+    Renders every metric in the Prometheus text format, aggregated over all workers in multiprocess mode.
+    """
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    # Multiprocess collection reads one file per worker, so it runs off the event loop.
+    return Response(await asyncio.to_thread(collect_metrics), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_worker_stopped() -> None:
+    """
+    Drops this worker's live gauges from the shared metrics. Call when the worker shuts down.
+    """
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    Records latency, in-flight requests and body bytes for every HTTP request.
+
+    A plain ASGI middleware rather than a BaseHTTPMiddleware, so streamed responses pass through
+    untouched and the cost per request is a few counter updates. Requests are labelled with the
+    route template, e.g. /api/v1/blob_storage/container_stats/{container_name}, not the raw path.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        received = 0
+        sent = 0
+
+        async def receive_counted() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+            return message
+
+        async def send_counted(message: Message) -> None:
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive_counted, send_counted)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            route = route_template(scope)
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - start)
+            if received:
+                HTTP_BYTES.labels(route, "received").inc(received)
+            if sent:
+                HTTP_BYTES.labels(route, "sent").inc(sent)
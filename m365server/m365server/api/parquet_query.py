@@ -0,0 +1,138 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, AsyncIterator, BinaryIO, Iterator, List, Optional, Sequence
+
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    # pyarrow.dataset takes over half a second to import, pandas included, so it is imported
+    # by the functions that use it rather than at server startup.
+    import pyarrow.dataset as ds
+
+from m365server.api.stream_buffer import StreamBuffer
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+COMPARISONS = {
+    "=": lambda field, value: field == value,
+    "==": lambda field, value: field == value,
+    "!=": lambda field, value: field != value,
+    "<": lambda field, value: field < value,
+    "<=": lambda field, value: field <= value,
+    ">": lambda field, value: field > value,
+    ">=": lambda field, value: field >= value,
+}
+
+
+class QueryError(ValueError):
+    """
+    Raised when a query names unknown columns or has a malformed filter.
+    """
+
+
+def _cast(value: Any, data_type: pa.DataType) -> pa.Scalar:
+    try:
+        return pa.scalar(value).cast(data_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as ex:
+        raise QueryError(f"Cannot compare {value!r} with a column of type {data_type}: {ex}")
+
+
+def build_filter_expression(filters: Sequence[Sequence[Any]], schema: pa.Schema) -> Optional["ds.Expression"]:
+    """
+    Builds a dataset filter from [column, operator, value] triples, combined with AND.
+
+    Supported operators are =, !=, <, <=, >, >= and in. Values are cast to the column's type,
+    so a timestamp column can be compared with an ISO-8601 string.
+
+    Args:
+        filters (Sequence[Sequence[Any]]): The filter triples.
+        schema (pa.Schema): The schema of the file being filtered.
+
+    Returns:
+        Optional[ds.Expression]: The combined expression, or None if there are no filters.
+    """
+    import pyarrow.dataset as ds
+
+    expression = None
+    for condition in filters:
+        if len(condition) != 3:
+            raise QueryError(f"Filter {condition!r} must be [column, operator, value]")
+        column, operator, value = condition
+        if schema.get_field_index(column) < 0:
+            raise QueryError(f"Unknown filter column '{column}'")
+        data_type = schema.field(column).type
+        if operator == "in":
+            if not isinstance(value, list):
+                raise QueryError(f"The value of an 'in' filter on '{column}' must be a list")
+            term = ds.field(column).isin(pa.array([_cast(item, data_type) for item in value], type=data_type))
+        elif operator in COMPARISONS:
+            term = COMPARISONS[operator](ds.field(column), _cast(value, data_type))
+        else:
+            raise QueryError(f"Unsupported filter operator '{operator}'")
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def open_parquet_scan(source: BinaryIO, columns: Optional[List[str]] = None,
+                      filters: Sequence[Sequence[Any]] = (), batch_size: int = 64 * 1024) -> "ds.Scanner":
+    """
+    Opens a projected, filtered scan over a single parquet file.
+
+    Only the footer is read here. Row groups whose statistics cannot match the filter are skipped,
+    and only the projected column chunks of the remaining row groups are read, with adjacent ranges
+    coalesced into larger reads. Blocks on I/O, so call it from a worker thread.
+
+    Args:
+        source (BinaryIO): A seekable file over the parquet data, typically a BlobRangeFile.
+        columns (Optional[List[str]]): Columns to return, or None for every column.
+        filters (Sequence[Sequence[Any]]): [column, operator, value] triples, combined with AND.
+        batch_size (int): Maximum number of rows per record batch.
+
+    Returns:
+        ds.Scanner: A scanner whose batches hold the matching rows.
+    """
+    import pyarrow.dataset as ds
+
+    parquet_format = ds.ParquetFileFormat(default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True))
+    fragment = parquet_format.make_fragment(source)
+    schema = fragment.physical_schema
+    unknown = [column for column in columns or [] if schema.get_field_index(column) < 0]
+    if unknown:
+        raise QueryError(f"Unknown column(s): {', '.join(unknown)}")
+    return ds.Scanner.from_fragment(
+        fragment,
+        schema=schema,
+        columns=columns,
+        filter=build_filter_expression(filters, schema),
+        batch_size=batch_size
+    )
+
+
+async def iter_arrow_ipc(scanner: "ds.Scanner") -> AsyncIterator[bytes]:
+    """
+    Runs a scan in worker threads and yields it as an Arrow IPC stream, one record batch at a time.
+
+    The next batch is only read once the previous one has been handed to the response, so a slow
+    client holds back the scan instead of letting batches pile up in memory.
+
+    Args:
+        scanner (ds.Scanner): The scan to run.
+
+    Yields:
+        bytes: The next part of the IPC stream.
+    """
+    buffer = StreamBuffer()
+    writer = pa.ipc.new_stream(buffer, scanner.projected_schema)
+    batches: Iterator[pa.RecordBatch] = scanner.to_batches()
+
+    def write_next() -> Optional[bytes]:
+        batch = next(batches, None)
+        if batch is None:
+            return None
+        writer.write_batch(batch)
+        return buffer.drain()
+
+    yield buffer.drain()
+    while (data := await asyncio.to_thread(write_next)) is not None:
+        yield data
+    writer.close()
+    yield buffer.drain()
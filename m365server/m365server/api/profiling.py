@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import secrets
+import time
+from typing import Any, Optional
+
+from loguru import logger
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from m365server.azure_interface.configuration import ProfilingConfig
+from m365server.azure_interface.profiling import SpanRecorder, start_recording, stop_recording
+
+
+class ProfilingMiddleware:
+    """
+    Profiles individual requests that carry the profiling header.
+
+    A profiled request records timed spans for every stage the storage manager and the strategies
+    go through, and a pyinstrument sampling profile of the event loop thread. The spans that have
+    finished when the response starts are returned in a Server-Timing header; the complete spans,
+    including the transfer of a streamed body, are logged and, when a profile directory is set,
+    written next to the sampling profile as <profile id>.json and <profile id>.html. The profile id
+    is returned in the X-Profile-Id header.
+
+    Only installed when profiling is enabled, so unprofiled servers pay nothing for it. When a
+    token is configured the header must carry it; otherwise any true value turns profiling on.
+    """
+
+    def __init__(self, app: ASGIApp, config: ProfilingConfig) -> None:
+        self.app = app
+        self.config = config
+        self._header = config.header.lower().encode("latin-1")
+        # pyinstrument samples one profile per thread at a time; concurrent profiled requests record spans only.
+        self._sampling = False
+
+    def _requested(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self._header:
+                value = value.decode("latin-1").strip()
+                if self.config.token:
+                    return secrets.compare_digest(value, self.config.token)
+                return value.lower() in ("1", "true", "yes")
+        return False
+
+    def _start_profiler(self) -> Optional[Any]:
+        if self._sampling:
+            logger.info("A sampling profile is already running, recording spans only")
+            return None
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=self.config.sample_interval, async_mode="enabled")
+        profiler.start()
+        self._sampling = True
+        return profiler
+
+    def _write_profile(self, profile_id: str, summary: dict, profiler: Optional[Any]) -> None:
+        os.makedirs(self.config.directory, exist_ok=True)
+        path = os.path.join(self.config.directory, profile_id)
+        with open(f"{path}.json", "w") as file:
+            json.dump(summary, file, indent=2)
+        if profiler is not None:
+            with open(f"{path}.html", "w") as file:
+                file.write(profiler.output_html())
+        logger.info(f"Wrote profile '{profile_id}' to {self.config.directory}")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{secrets.token_hex(4)}"
+        status = 500
+        recorder, token = start_recording()
+        profiler = self._start_profiler()
+
+        async def send_profiled(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), *self._response_headers(recorder, profile_id)]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            duration = time.perf_counter() - recorder.origin
+            stop_recording(token)
+            if profiler is not None:
+                profiler.stop()
+                self._sampling = False
+            logger.info(f"Profiled {scope['method']} {scope['path']} ({status}) in {duration * 1000:.1f}ms: "
+                        f"{recorder.server_timing()}")
+            if self.config.directory:
+                summary = {
+                    "profile_id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status,
+                    "duration_ms": round(duration * 1000, 3),
+                    **recorder.to_dict(),
+                }
+                await asyncio.to_thread(self._write_profile, profile_id, summary, profiler)
+
+    def _response_headers(self, recorder: SpanRecorder, profile_id: str) -> list:
+        elapsed = f"total;dur={(time.perf_counter() - recorder.origin) * 1000:.1f}"
+        timing = recorder.server_timing()
+        headers = [(b"server-timing", (f"{timing}, {elapsed}" if timing else elapsed).encode("latin-1"))]
+        if self.config.directory:
+            headers.append((b"x-profile-id", profile_id.encode("latin-1")))
+        return headers
@@ -0,0 +1,26 @@
+import io
+from typing import List
+
+
+class StreamBuffer(io.RawIOBase):
+    """
+    A write-only, non-seekable sink whose contents are handed to a streaming response as they are produced.
+
+    zipfile, tarfile and the Arrow IPC writer all support writing to a file object that cannot seek,
+    so their output can be drained after every entry or batch instead of being built up in memory.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -1,4 +1,17 @@
-from m365server.azure_interface.azure_blob_storage_manager import AzureBlobStorageManager
 from m365server.azure_interface.configuration import  get_default_config
-from m365server.azure_interface.blob_data_loader import BlobDataLoader
-from m365server.azure_interface.endpoints import router
\ No newline at end of file
+
+
+def __getattr__(name):
+    # The router is imported on first access because its module depends on m365server.api,
+    # which in turn imports this package. The synchronous manager and the data loader are
+    # imported on first access too, so that the async server does not load them at startup.
+    if name == "router":
+        from m365server.azure_interface.endpoints import router
+        return router
+    if name == "AzureBlobStorageManager":
+        from m365server.azure_interface.azure_blob_storage_manager import AzureBlobStorageManager
+        return AzureBlobStorageManager
+    if name == "BlobDataLoader":
+        from m365server.azure_interface.blob_data_loader import BlobDataLoader
+        return BlobDataLoader
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
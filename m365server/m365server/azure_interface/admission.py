@@ -0,0 +1,183 @@
+import asyncio
+import collections
+import time
+from typing import Deque, Dict, Optional
+
+from loguru import logger
+
+from m365server.azure_interface.metrics import (ADMISSION_BUDGET_BYTES, ADMISSION_INFLIGHT_BYTES, ADMISSION_QUEUED,
+                                                ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a transfer cannot be admitted within the allowed wait.
+    """
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(f"Transfer not admitted: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Reservation:
+    """
+    Bytes and a container slot held by one admitted transfer until it is released.
+    """
+
+    def __init__(self, controller: "AdmissionController", container_name: str, nbytes: int, slot: bool = True) -> None:
+        self.controller = controller
+        self.container_name = container_name
+        self.nbytes = nbytes
+        self.slot = slot
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.controller._release(self)
+
+
+class _Waiter:
+    def __init__(self, container_name: str, nbytes: int, slot: bool) -> None:
+        self.container_name = container_name
+        self.nbytes = nbytes
+        self.slot = slot
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    """
+    Limits the transfers one worker runs at a time by the bytes they hold and by container.
+
+    Every transfer reserves an estimate of the memory it holds against max_inflight_bytes and one of
+    the max_per_container slots of its container. A transfer that does not fit waits in line for up to
+    max_wait_seconds and is then rejected; so is any transfer arriving while max_queue others wait.
+    Waiting transfers are admitted in arrival order, except that a transfer blocked only by its
+    container's limit does not hold up transfers to other containers.
+
+    A reservation larger than the whole budget is reduced to the budget, so it runs once nothing else does.
+    """
+
+    def __init__(self, max_inflight_bytes: int = 512 * 1024 * 1024, max_per_container: Optional[int] = 32,
+                 max_wait_seconds: float = 5.0, max_queue: int = 256, retry_after_seconds: float = 1.0) -> None:
+        """
+        Initialize the AdmissionController.
+
+        Args:
+            max_inflight_bytes (int): Bytes the admitted transfers may hold together.
+            max_per_container (Optional[int]): Transfers admitted per container at a time, unlimited if None.
+            max_wait_seconds (float): Longest time a transfer waits to be admitted before it is rejected.
+            max_queue (int): Transfers allowed to wait at a time; further ones are rejected immediately.
+            retry_after_seconds (float): Delay suggested to rejected clients.
+        """
+        self.max_inflight_bytes = max_inflight_bytes
+        self.max_per_container = max_per_container
+        self.max_wait_seconds = max_wait_seconds
+        self.max_queue = max_queue
+        self.retry_after_seconds = retry_after_seconds
+        self.inflight_bytes = 0
+        self.active: Dict[str, int] = collections.Counter()
+        self.rejected = 0
+        self._waiters: Deque[_Waiter] = collections.deque()
+        ADMISSION_BUDGET_BYTES.set(max_inflight_bytes)
+
+    def _fits(self, container_name: str, nbytes: int, slot: bool = True) -> bool:
+        return (self.inflight_bytes + nbytes <= self.max_inflight_bytes
+                and (not slot or self.max_per_container is None or self.active[container_name] < self.max_per_container))
+
+    def _grant(self, container_name: str, nbytes: int, slot: bool = True) -> Reservation:
+        self.inflight_bytes += nbytes
+        if slot:
+            self.active[container_name] += 1
+        ADMISSION_INFLIGHT_BYTES.set(self.inflight_bytes)
+        return Reservation(self, container_name, nbytes, slot)
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+        return AdmissionRejected(reason, self.retry_after_seconds)
+
+    async def acquire(self, container_name: str, nbytes: int, slot: bool = True, bounded: bool = True) -> Reservation:
+        """
+        Waits until a transfer of nbytes to or from container_name fits and reserves its share.
+
+        Args:
+            container_name (str): The container transferred to or from.
+            nbytes (int): Bytes the transfer holds in memory.
+            slot (bool): Whether to take one of the container's slots; False for more bytes of a transfer already admitted.
+            bounded (bool): Whether to give up after max_wait_seconds or when the queue is full; False for bytes of a
+                transfer that can no longer be rejected, which then waits as long as it takes.
+
+        Raises:
+            AdmissionRejected: When bounded and the queue is full or the transfer did not fit within max_wait_seconds.
+        """
+        nbytes = max(0, min(nbytes, self.max_inflight_bytes))
+        if not self._waiters and self._fits(container_name, nbytes, slot):
+            ADMISSION_WAIT_SECONDS.observe(0.0)
+            return self._grant(container_name, nbytes, slot)
+        if bounded and len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+
+        waiter = _Waiter(container_name, nbytes, slot)
+        self._waiters.append(waiter)
+        # Waiters blocked by their container's limit may be ahead of this one without holding it back.
+        self._admit_waiters()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait_seconds if bounded else None)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                waiter.future.result().release()
+            else:
+                self._withdraw(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - start)
+        if waiter.future.done():
+            return waiter.future.result()
+        self._withdraw(waiter)
+        logger.warning(f"Rejected a {nbytes} byte transfer for '{container_name}' after waiting {self.max_wait_seconds}s")
+        raise self._reject("timeout")
+
+    def _withdraw(self, waiter: _Waiter) -> None:
+        waiter.future.cancel()
+        self._waiters.remove(waiter)
+        # A transfer that waited at the head may have held back smaller ones behind it.
+        self._admit_waiters()
+
+    def _release(self, reservation: Reservation) -> None:
+        self.inflight_bytes -= reservation.nbytes
+        if reservation.slot:
+            self.active[reservation.container_name] -= 1
+            if not self.active[reservation.container_name]:
+                del self.active[reservation.container_name]
+        ADMISSION_INFLIGHT_BYTES.set(self.inflight_bytes)
+        self._admit_waiters()
+
+    def _admit_waiters(self) -> None:
+        for waiter in list(self._waiters):
+            if self.inflight_bytes + waiter.nbytes > self.max_inflight_bytes:
+                # Later transfers could fit in the remaining bytes, but letting them pass would starve this one.
+                break
+            if self._fits(waiter.container_name, waiter.nbytes, waiter.slot):
+                self._waiters.remove(waiter)
+                waiter.future.set_result(self._grant(waiter.container_name, waiter.nbytes, waiter.slot))
+        ADMISSION_QUEUED.set(len(self._waiters))
+
+    def stats(self) -> dict:
+        """
+        Returns the bytes and transfers admitted and waiting, and the share of the byte budget in use.
+        """
+        return {
+            "inflight_bytes": self.inflight_bytes,
+            "max_inflight_bytes": self.max_inflight_bytes,
+            "utilization": round(self.inflight_bytes / self.max_inflight_bytes, 4) if self.max_inflight_bytes else 0.0,
+            "active_transfers": sum(self.active.values()),
+            "active_by_container": dict(self.active),
+            "max_per_container": self.max_per_container,
+            "queued": len(self._waiters),
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,9 @@
+from m365server.azure_interface.aio.azure_blob_storage_manager import AzureBlobStorageManager
+from m365server.azure_interface.aio.blob_client import BlobServiceClientFactory
+from m365server.azure_interface.aio.container_manager import ContainerManager
+from m365server.azure_interface.aio.blob_range_file import BlobRangeFile
+from m365server.azure_interface.aio.local_storage import (FileSystemContainerManager, InMemoryContainerManager,
+                                                         create_local_storage_manager)
+from m365server.azure_interface.aio.resilience import ResiliencePolicy, ResilientContainerManager
+from m365server.azure_interface.aio.single_flight import SingleFlight
+from m365server.azure_interface.aio.token_provider import AsyncTokenProvider
@@ -0,0 +1,320 @@
+import asyncio
+from io import BytesIO
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Union
+from loguru import logger
+from azure.storage.blob import BlobProperties
+
+from m365server.azure_interface.configuration import AzureBlobStorageConfig
+from m365server.azure_interface.aio.blob_client import BlobServiceClientFactory
+import m365server.azure_interface.blob_operations as BlobOperations
+import m365server.azure_interface.aio.blob_operations as AsyncBlobOperations
+from m365server.azure_interface.aio.container_manager import ContainerManager
+from m365server.azure_interface.aio.single_flight import SingleFlight
+from m365server.azure_interface.blob_cache import BlobCache
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+from m365server.azure_interface.container_stats import ContainerStats, ContainerStatsCache
+from m365server.azure_interface.derived_parquet import DerivedParquetStore
+from m365server.azure_interface.disk_cache import DiskBlobCache
+from m365server.azure_interface.parquet_metadata import ParquetMetadataCache
+from m365server.azure_interface.profiling import span
+
+def _read_file(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+class AzureBlobStorageManager:
+    """
+    A class that manages non-blocking interactions with Azure Blob Storage.
+
+    Mirrors m365server.azure_interface.AzureBlobStorageManager on top of azure.storage.blob.aio,
+    so every storage call is awaited instead of blocking the event loop.
+    """
+
+    def __init__(self, config: AzureBlobStorageConfig, container_manager: Optional[Any] = None) -> None:
+        """
+        Initialize the AzureBlobStorageManager. Must be called from within a running event loop.
+
+        Args:
+            config (AzureBlobStorageConfig): Configuration for Azure Blob Storage.
+            container_manager (Optional[Any]): A container manager for another backend, such as those in
+                m365server.azure_interface.aio.local_storage. No BlobServiceClient is created when one is given.
+        """
+        logger.info("Initializing async AzureBlobStorageManager")
+        self.config = config
+        if container_manager is None:
+            self.blob_service_client = BlobServiceClientFactory.create_client(config)
+            container_manager = ContainerManager(self.blob_service_client, cache_ttl=config.container_cache_ttl)
+        else:
+            self.blob_service_client = None
+        self.container_manager = container_manager
+
+        self.upload_strategy = AsyncBlobOperations.BlobUploadStrategy()
+        self.download_strategy = AsyncBlobOperations.BlobDownloadStrategy()
+        self.delete_strategy = AsyncBlobOperations.BlobDeleteStrategy()
+        self.blob_cache: Optional[BlobCache] = None
+        self.disk_cache: Optional[DiskBlobCache] = None
+        self.single_flight: Optional[SingleFlight] = None
+        self.container_stats: Optional[ContainerStatsCache] = None
+        self.parquet_metadata_cache: Optional[ParquetMetadataCache] = None
+        self.derived_parquet_store: Optional[DerivedParquetStore] = None
+
+    async def upload_blob(self, container_name: str, blob_name: str, file_data: Union[str, BytesIO, BinaryIO, Any],
+                          metadata: Optional[Dict[str, str]] = None):
+        container_client = self.container_manager.get_container_client(container_name)
+        await self.upload_strategy.upload_blob(container_client, blob_name, file_data, metadata)
+        await self._on_blob_changed(container_name, blob_name, deleted=False)
+
+    async def download_blob(self, container_name: str, blob_name: str,
+                            properties: Optional[BlobProperties] = None) -> bytes:
+        """
+        Downloads a blob, reading through the blob cache and then the disk cache when they are set.
+
+        Args:
+            container_name (str): The name of the container where the blob is located.
+            blob_name (str): The name of the blob to download.
+            properties (Optional[BlobProperties]): Properties already fetched by the caller, to skip a second lookup.
+
+        Returns:
+            bytes: The content of the blob.
+        """
+        if self.blob_cache is None and self.disk_cache is None:
+            return await self._download(container_name, blob_name)
+
+        if properties is None:
+            properties = await self.get_blob_properties(container_name, blob_name)
+        blob_cache = self.blob_cache if self.blob_cache is not None and self.blob_cache.accepts(properties.size) else None
+        on_disk = self.disk_cache is not None and self.disk_cache.accepts(properties.size)
+        if blob_cache is None and not on_disk:
+            return await self._download(container_name, blob_name)
+
+        if blob_cache is not None:
+            with span("blob_cache.get"):
+                cached = await blob_cache.get(container_name, blob_name, properties.etag)
+            if cached is not None:
+                logger.info(f"Serving blob '{blob_name}' from cache")
+                return cached
+
+        data = None
+        if on_disk:
+            path = await self.local_blob_path(container_name, blob_name, properties)
+            # The entry may have been evicted since it was looked up.
+            data = None if path is None else await asyncio.to_thread(_read_file, path)
+        if data is None:
+            data = b"".join([chunk async for chunk in self.stream_blob_cached(container_name, blob_name, properties)])
+        if blob_cache is not None:
+            with span("blob_cache.put"):
+                await blob_cache.put(container_name, blob_name, properties.etag, data)
+        return data
+
+    async def local_blob_path(self, container_name: str, blob_name: str, properties: BlobProperties) -> Optional[str]:
+        """
+        Returns the path of the disk cache entry for one version of a blob, so that it can be sent with FileResponse.
+
+        Args:
+            container_name (str): The name of the container where the blob is located.
+            blob_name (str): The name of the blob.
+            properties (BlobProperties): The properties of the version to serve.
+
+        Returns:
+            Optional[str]: The path of the cached file, or None on a miss or when there is no disk cache or it does not take blobs of this size.
+        """
+        if self.disk_cache is None or not self.disk_cache.accepts(properties.size):
+            return None
+        with span("disk_cache.get"):
+            path = await self.disk_cache.get(container_name, blob_name, properties.etag)
+        if path is not None:
+            logger.info(f"Serving blob '{blob_name}' from the disk cache")
+        return path
+
+    async def stream_blob_cached(self, container_name: str, blob_name: str,
+                                 properties: BlobProperties) -> AsyncIterator[bytes]:
+        """
+        Streams one version of a whole blob from storage, filling its disk cache entry as it streams.
+
+        Meant for misses of local_blob_path(). Blobs the disk cache does not take are only streamed.
+
+        Args:
+            container_name (str): The name of the container where the blob is located.
+            blob_name (str): The name of the blob.
+            properties (BlobProperties): The properties of the version to serve.
+
+        Yields:
+            bytes: The next chunk of the blob.
+        """
+        # Pinned to the ETag the entry is cached under.
+        chunks = self.stream_blob(container_name, blob_name, etag=properties.etag)
+        if self.disk_cache is not None and self.disk_cache.accepts(properties.size):
+            chunks = self.disk_cache.tee(container_name, blob_name, properties.etag, chunks)
+        async for chunk in chunks:
+            yield chunk
+
+    async def _download(self, container_name: str, blob_name: str) -> bytes:
+        container_client = self.container_manager.get_container_client(container_name)
+        if self.single_flight is None:
+            return await self.download_strategy.download_blob(container_client, blob_name)
+        return await self.single_flight.call("download", (container_name, blob_name),
+                                             lambda: self.download_strategy.download_blob(container_client, blob_name))
+
+    async def get_blob_properties(self, container_name: str, blob_name: str) -> BlobProperties:
+        """
+        Returns the properties of a blob, sharing the lookup with concurrent callers when single-flight is set.
+        """
+        container_client = self.container_manager.get_container_client(container_name)
+        if self.single_flight is None:
+            return await self.download_strategy.get_blob_properties(container_client, blob_name)
+        return await self.single_flight.call("get_properties", (container_name, blob_name),
+                                             lambda: self.download_strategy.get_blob_properties(container_client, blob_name))
+
+    def stream_blob(self, container_name: str, blob_name: str, offset: Optional[int] = None,
+                    length: Optional[int] = None, etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Streams a blob or a range of it. When single-flight is set, concurrent streams of the same
+        blob, range and ETag share one download.
+        """
+        container_client = self.container_manager.get_container_client(container_name)
+        if self.single_flight is None:
+            return self.download_strategy.stream_blob(container_client, blob_name, offset=offset, length=length, etag=etag)
+        return self.single_flight.stream(
+            "stream", (container_name, blob_name, offset, length, etag),
+            lambda: self.download_strategy.stream_blob(container_client, blob_name, offset=offset, length=length, etag=etag)
+        )
+
+    async def delete_blob(self, container_name: str, blob_name: str):
+        container_client = self.container_manager.get_container_client(container_name)
+        await self.delete_strategy.delete_blob(container_client, blob_name)
+        await self._on_blob_changed(container_name, blob_name, deleted=True)
+        if self.derived_parquet_store is not None:
+            await self.derived_parquet_store.delete_copies(container_name, [blob_name])
+
+    async def delete_blobs(self, container_name: str, blob_names: List[str]) -> List[BlobOperations.BlobDeleteResult]:
+        """
+        Deletes many blobs with batch requests, returning one result per blob.
+        """
+        container_client = self.container_manager.get_container_client(container_name)
+        results = await self.delete_strategy.delete_blobs(container_client, blob_names)
+        await asyncio.gather(*(
+            self._on_blob_changed(container_name, result.blob_name, deleted=True) for result in results if result.deleted
+        ))
+        if self.derived_parquet_store is not None:
+            await self.derived_parquet_store.delete_copies(
+                container_name, [result.blob_name for result in results if result.deleted]
+            )
+        return results
+
+    async def delete_blobs_by_prefix(self, container_name: str, prefix: str) -> List[BlobOperations.BlobDeleteResult]:
+        """
+        Deletes every blob whose name starts with prefix, deleting each listing page while the next one is fetched.
+        """
+        results: List[BlobOperations.BlobDeleteResult] = []
+        pending: Optional[asyncio.Task] = None
+        try:
+            async for page in self.iter_blob_pages(container_name, prefix=prefix, page_size=5000):
+                if pending is not None:
+                    results.extend(await pending)
+                pending = asyncio.create_task(self.delete_blobs(container_name, [blob.name for blob in page.blobs]))
+            if pending is not None:
+                results.extend(await pending)
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+        return results
+
+    async def _on_blob_changed(self, container_name: str, blob_name: str, deleted: bool):
+        """
+        Keeps the blob caches and container stats in step with a write made through this manager.
+        """
+        if self.single_flight is not None:
+            self.single_flight.forget(container_name, blob_name)
+        if self.blob_cache is not None:
+            await self.blob_cache.invalidate(container_name, blob_name)
+        if self.disk_cache is not None:
+            await self.disk_cache.invalidate(container_name, blob_name)
+        if self.container_stats is None or not self.container_stats.is_tracking(container_name):
+            return
+        if deleted:
+            self.container_stats.record_delete(container_name, blob_name)
+            return
+        try:
+            properties = await self.get_blob_properties(container_name, blob_name)
+        except Exception as ex:
+            logger.warning(f"Failed to refresh stats for blob '{blob_name}', rescanning container later: {ex}")
+            self.container_stats.invalidate(container_name)
+            return
+        self.container_stats.record_upload(container_name, BlobEntry.from_properties(properties))
+
+    def set_container_manager(self, container_manager: Any):
+        self.container_manager = container_manager
+
+    def set_upload_strategy(self, new_strategy: BlobOperations.IBlobUploadStrategy):
+        self.upload_strategy = new_strategy
+
+    def set_download_strategy(self, new_strategy: BlobOperations.IBlobDownloadStrategy):
+        self.download_strategy = new_strategy
+
+    def set_delete_strategy(self, new_strategy: BlobOperations.IBlobDeleteStrategy):
+        self.delete_strategy = new_strategy
+
+    def set_blob_cache(self, blob_cache: Optional[BlobCache]):
+        self.blob_cache = blob_cache
+
+    def set_disk_cache(self, disk_cache: Optional[DiskBlobCache]):
+        self.disk_cache = disk_cache
+
+    def set_single_flight(self, single_flight: Optional[SingleFlight]):
+        self.single_flight = single_flight
+
+    def set_container_stats(self, container_stats: Optional[ContainerStatsCache]):
+        self.container_stats = container_stats
+
+    def set_parquet_metadata_cache(self, parquet_metadata_cache: Optional[ParquetMetadataCache]):
+        self.parquet_metadata_cache = parquet_metadata_cache
+
+    def set_derived_parquet_store(self, derived_parquet_store: Optional[DerivedParquetStore]):
+        self.derived_parquet_store = derived_parquet_store
+
+    async def list_blobs(self, container_name: str) -> List[str]:
+        return await self.container_manager.list_blobs(container_name)
+
+    def iter_blob_pages(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                        page_size: Optional[int] = None, continuation_token: Optional[str] = None) -> AsyncIterator[BlobListingPage]:
+        return self.container_manager.iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token)
+
+    async def list_blobs_page(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None, continuation_token: Optional[str] = None) -> BlobListingPage:
+        return await self.container_manager.list_blobs_page(container_name, prefix, delimiter, page_size, continuation_token)
+
+    async def list_containers(self) -> List[str]:
+        return await self.container_manager.list_containers()
+
+    async def get_container_stats(self, container_names: Optional[List[str]] = None,
+                                  refresh: bool = False) -> List[ContainerStats]:
+        """
+        Returns blob count, total size and modification time range for the given containers, or all containers.
+        """
+        if self.container_stats is None:
+            self.container_stats = ContainerStatsCache(self.container_manager.iter_blob_pages)
+        if container_names is None:
+            container_names = await self.list_containers()
+        return await self.container_stats.get(container_names, refresh=refresh)
+
+    async def log_container_info(self) -> None:
+        await self.container_manager.log_container_info()
+
+    async def close(self) -> None:
+        """
+        Closes the underlying BlobServiceClient, its connection pool and credential.
+        """
+        logger.info("Closing async AzureBlobStorageManager")
+        if self.blob_cache is not None:
+            await self.blob_cache.close()
+        if self.parquet_metadata_cache is not None:
+            await self.parquet_metadata_cache.close()
+        if self.blob_service_client is None:
+            return
+        await self.blob_service_client.close()
+        credential = getattr(self.blob_service_client, "credential", None)
+        if credential is not None and hasattr(credential, "close"):
+            await credential.close()
@@ -0,0 +1,66 @@
+import aiohttp
+from azure.storage.blob.aio import BlobServiceClient
+from loguru import logger
+from m365server.azure_interface.aio.token_provider import AsyncTokenProvider
+from m365server.azure_interface.configuration import AzureBlobStorageConfig
+from m365server.azure_interface.token_provider import get_token_provider
+
+
+class BlobServiceClientFactory:
+    """
+    Creates asynchronous BlobServiceClients, mirroring m365server.azure_interface.blob_client.BlobServiceClientFactory.
+
+    Clients must be created from within a running event loop.
+    """
+    @staticmethod
+    def create_client(config: AzureBlobStorageConfig) -> BlobServiceClient:
+        """
+        Creates and returns an asynchronous BlobServiceClient based on the provided configuration.
+
+        Args:
+            config (AzureBlobStorageConfig): The configuration for the Azure Blob Storage.
+
+        Returns:
+            BlobServiceClient: The client to interact with Azure Blob Storage.
+        """
+        if config.service_principal_config:
+            return BlobServiceClientFactory._create_client_with_service_principal(config)
+        else:
+            return BlobServiceClientFactory._create_client_with_connection_string(config)
+
+    @staticmethod
+    def _create_client_with_service_principal(config: AzureBlobStorageConfig) -> BlobServiceClient:
+        logger.info("Creating async client with service principal credentials")
+        provider = get_token_provider(config.service_principal_config)
+        logger.info(f"Using authority host: {provider.authority_host}")
+        credential = AsyncTokenProvider(provider)
+        account_url = f"https://{config.storage_account_name}.{config.storage_account_suffix}"
+        logger.info(f"Using account url: {account_url}")
+        return BlobServiceClient(account_url=account_url, credential=credential, **BlobServiceClientFactory._client_options(config))
+
+    @staticmethod
+    def _create_client_with_connection_string(config: AzureBlobStorageConfig) -> BlobServiceClient:
+        logger.info("Creating async client with user credentials")
+        # An explicit connection string points the client elsewhere, e.g. at the Azurite emulator.
+        connection_string = config.connection_string or f"DefaultEndpointsProtocol=https;AccountName={config.storage_account_name};AccountKey={config.storage_account_key};EndpointSuffix={config.storage_account_suffix}"
+        return BlobServiceClient.from_connection_string(connection_string, **BlobServiceClientFactory._client_options(config))
+
+    @staticmethod
+    def _client_options(config: AzureBlobStorageConfig) -> dict:
+        """
+        Returns the keyword arguments shared by every client the factory creates.
+
+        The aiohttp session allows up to config.connection_pool_size concurrent connections,
+        which is also the number of storage calls a worker can have in flight.
+        """
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=config.connection_pool_size),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            auto_decompress=False,
+            trust_env=True
+        )
+        return {
+            "session": session,
+            "max_single_get_size": config.download_chunk_size,
+            "max_chunk_get_size": config.download_chunk_size,
+        }
@@ -0,0 +1,5 @@
+from m365server.azure_interface.aio.blob_operations.upload import BlobUploadStrategy
+from m365server.azure_interface.aio.blob_operations.block_upload import BlobBlockUploadStrategy
+from m365server.azure_interface.aio.blob_operations.delete import BlobDeleteStrategy
+from m365server.azure_interface.aio.blob_operations.download import BlobDownloadStrategy
+from m365server.azure_interface.aio.blob_operations.resilient import ResilientDownloadStrategy
@@ -0,0 +1,126 @@
+import asyncio
+import base64
+import inspect
+import uuid
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+from io import BytesIO
+
+import azure
+from azure.storage.blob import BlobBlock
+from azure.storage.blob.aio import BlobClient, ContainerClient
+from loguru import logger
+
+from m365server.azure_interface.blob_operations import IBlobUploadStrategy
+from m365server.azure_interface.metrics import BYTES_UPLOADED, azure_call
+
+
+class BlobBlockUploadStrategy(IBlobUploadStrategy):
+    """
+    Asynchronous counterpart of m365server.azure_interface.blob_operations.BlobBlockUploadStrategy.
+
+    Accepts synchronous binary streams, which are read in a worker thread, as well as objects
+    with an async read method such as fastapi.UploadFile.
+    """
+
+    def __init__(self, block_size: int = 8 * 1024 * 1024, max_concurrency: int = 4) -> None:
+        """
+        Initialize the BlobBlockUploadStrategy.
+
+        Args:
+            block_size (int): Number of bytes read from the stream and staged per block.
+            max_concurrency (int): Maximum number of blocks staged in parallel.
+        """
+        if block_size <= 0 or max_concurrency <= 0:
+            raise ValueError("block_size and max_concurrency must be positive")
+        self.block_size = block_size
+        self.max_concurrency = max_concurrency
+
+    async def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO, BinaryIO, Any],
+                          metadata: Optional[Dict[str, str]] = None):
+        logger.info(f"Uploading data to blob '{blob_name}' in blocks of {self.block_size} bytes")
+        try:
+            blob_client = container_client.get_blob_client(blob_name)
+            if isinstance(file_data, str):
+                logger.info(f"Detected file data as string, attempting to open file at path: {file_data}")
+                file = await asyncio.to_thread(open, file_data, "rb")
+                try:
+                    block_count = await self._upload_stream(blob_client, file, metadata)
+                finally:
+                    file.close()
+            elif hasattr(file_data, "read"):
+                block_count = await self._upload_stream(blob_client, file_data, metadata)
+            else:
+                logger.error(f"Unsupported data type for file_data: {type(file_data).__name__}")
+                return
+
+            logger.info(f"Successfully uploaded data to blob '{blob_name}' in {block_count} block(s)")
+        except azure.core.exceptions.HttpResponseError as e:
+            logger.error(f"HTTP error during blob upload: {e}")
+            raise
+        except azure.core.exceptions.AzureError as e:
+            logger.error(f"Azure error during blob upload: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during blob upload: {e}")
+            raise
+
+    async def _read(self, stream: Any) -> bytes:
+        if inspect.iscoroutinefunction(stream.read):
+            return await stream.read(self.block_size)
+        return await asyncio.to_thread(stream.read, self.block_size)
+
+    async def _upload_stream(self, blob_client: BlobClient, stream: Any, metadata: Optional[Dict[str, str]] = None) -> int:
+        first_block = await self._read(stream)
+        if len(first_block) < self.block_size:
+            # Small enough for a single Put Blob request.
+            with azure_call("upload"):
+                await blob_client.upload_blob(first_block, overwrite=True, metadata=metadata)
+            BYTES_UPLOADED.inc(len(first_block))
+            return 1
+
+        # A per-upload prefix keeps concurrent uploads of the same blob from sharing block ids.
+        upload_id = uuid.uuid4().hex
+        block_list: List[BlobBlock] = []
+        tasks: List[asyncio.Task] = []
+        errors: List[BaseException] = []
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def stage(block_id: str, block: bytes) -> None:
+            try:
+                with azure_call("stage_block"):
+                    await blob_client.stage_block(block_id, block)
+                BYTES_UPLOADED.inc(len(block))
+            except BaseException as e:
+                errors.append(e)
+                raise
+            finally:
+                slots.release()
+
+        try:
+            block = first_block
+            await slots.acquire()
+            while block and not errors:
+                block_id = self._block_id(upload_id, len(block_list))
+                block_list.append(BlobBlock(block_id=block_id))
+                tasks.append(asyncio.create_task(stage(block_id, block)))
+                del block
+
+                # Wait for a free slot before reading the next block so that at most
+                # max_concurrency blocks are in memory.
+                await slots.acquire()
+                block = await self._read(stream) if not errors else b""
+            slots.release()
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        with azure_call("commit_block_list"):
+            await blob_client.commit_block_list(block_list, metadata=metadata)
+        return len(block_list)
+
+    @staticmethod
+    def _block_id(upload_id: str, index: int) -> str:
+        return base64.b64encode(f"{upload_id}-{index:08d}".encode()).decode()
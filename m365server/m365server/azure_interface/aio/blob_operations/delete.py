@@ -0,0 +1,66 @@
+import asyncio
+from typing import List
+
+from m365server.azure_interface.blob_operations import BlobDeleteResult, IBlobDeleteStrategy
+from m365server.azure_interface.blob_operations.delete import MAX_BATCH_SIZE, _batch_results, _chunks
+from m365server.azure_interface.metrics import azure_call
+from azure.storage.blob.aio import ContainerClient
+
+from loguru import logger
+
+class BlobDeleteStrategy(IBlobDeleteStrategy):
+    def __init__(self, batch_size: int = MAX_BATCH_SIZE, max_concurrency: int = 4) -> None:
+        """
+        Initialize the BlobDeleteStrategy.
+
+        Args:
+            batch_size (int): Number of blobs deleted per batch request, at most 256.
+            max_concurrency (int): Maximum number of batch requests in flight at the same time.
+        """
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_concurrency = max_concurrency
+
+    @azure_call("delete")
+    async def delete_blob(self, container_client: ContainerClient, blob_name: str):
+        logger.info(f'Deleting blob "{blob_name}"')
+        try:
+            await container_client.delete_blob(blob_name)
+            logger.info(f"Successfully deleted blob '{blob_name}'")
+        except Exception as ex:
+            logger.error(f"Failed to delete blob '{blob_name}': {ex}")
+            raise
+
+    async def _delete_batch(self, container_client: ContainerClient, blob_names: List[str],
+                            semaphore: asyncio.Semaphore) -> List[BlobDeleteResult]:
+        async with semaphore:
+            try:
+                with azure_call("delete_batch"):
+                    responses = await container_client.delete_blobs(*blob_names, raise_on_any_failure=False)
+                    responses = [response async for response in responses]
+                return _batch_results(blob_names, responses)
+            except Exception as ex:
+                logger.error(f"Failed to delete batch of {len(blob_names)} blob(s): {ex}")
+                status_code = getattr(ex, "status_code", None) or 500
+                return [BlobDeleteResult(blob_name, status_code, str(ex)) for blob_name in blob_names]
+
+    async def delete_blobs(self, container_client: ContainerClient, blob_names: List[str]) -> List[BlobDeleteResult]:
+        """
+        Deletes blobs with the Blob Batch API, sending up to max_concurrency batches at a time.
+
+        Failures are reported per blob rather than raised.
+
+        Args:
+            container_client (ContainerClient): The container holding the blobs.
+            blob_names (List[str]): The blobs to delete.
+
+        Returns:
+            List[BlobDeleteResult]: One result per blob, in the order given.
+        """
+        logger.info(f"Deleting {len(blob_names)} blob(s) in batches of {self.batch_size}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = await asyncio.gather(*(
+            self._delete_batch(container_client, names, semaphore) for names in _chunks(blob_names, self.batch_size)
+        ))
+        results = [result for batch in batches for result in batch]
+        logger.info(f"Deleted {sum(result.deleted for result in results)} of {len(blob_names)} blob(s)")
+        return results
@@ -0,0 +1,88 @@
+from m365server.azure_interface.blob_operations import IBlobDownloadStrategy
+from azure.storage.blob import BlobProperties
+from azure.storage.blob.aio import ContainerClient
+from azure.core import MatchConditions
+from azure.core.exceptions import ResourceNotFoundError
+from typing import AsyncIterator, Optional
+from loguru import logger
+
+from m365server.azure_interface.metrics import BYTES_DOWNLOADED, azure_call
+
+
+class BlobDownloadStrategy(IBlobDownloadStrategy):
+    def __init__(self, retry_total: Optional[int] = None) -> None:
+        """
+        Initialize the BlobDownloadStrategy.
+
+        Args:
+            retry_total (Optional[int]): Retries the Azure SDK makes per request, instead of the client's retry policy.
+                Set to 0 when a ResilientDownloadStrategy retries the reads instead.
+        """
+        self._request_options = {} if retry_total is None else {"retry_total": retry_total}
+
+    @azure_call("download")
+    async def download_blob(self, container_client: ContainerClient, blob_name: str) -> bytes:
+        if not container_client or not blob_name:
+            logger.error("Invalid input arguments for blob download")
+            raise ValueError("Invalid input arguments for blob download")
+
+        logger.info(f"Initiating download of blob '{blob_name}'")
+        try:
+            blob_client = container_client.get_blob_client(blob_name)
+            blob_data = await blob_client.download_blob(**self._request_options)
+            content_type = blob_data.properties.content_settings.content_type
+
+            logger.info(f"Downloading blob '{blob_name}' of size {blob_data.size} bytes and content type '{content_type}'")
+            downloaded_data = await blob_data.readall()
+            BYTES_DOWNLOADED.inc(len(downloaded_data))
+            logger.info(f"Successfully downloaded blob '{blob_name}' with size {len(downloaded_data)} bytes")
+
+            return downloaded_data
+        except ResourceNotFoundError as e:
+            logger.error(f"Blob '{blob_name}' not found in container: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to download blob '{blob_name}': {e}")
+            raise
+
+    @azure_call("get_properties")
+    async def get_blob_properties(self, container_client: ContainerClient, blob_name: str) -> BlobProperties:
+        if not container_client or not blob_name:
+            logger.error("Invalid input arguments for blob properties")
+            raise ValueError("Invalid input arguments for blob properties")
+
+        try:
+            return await container_client.get_blob_client(blob_name).get_blob_properties(**self._request_options)
+        except ResourceNotFoundError as e:
+            logger.error(f"Blob '{blob_name}' not found in container: {e}")
+            raise
+
+    @azure_call("stream")
+    async def stream_blob(self, container_client: ContainerClient, blob_name: str,
+                          offset: Optional[int] = None, length: Optional[int] = None,
+                          etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Streams a blob, or a byte range of it, in chunks of the client's max_chunk_get_size.
+
+        Only one chunk is held in memory at a time. When etag is given the download fails
+        if the blob changes, so a response never mixes bytes from two versions of the blob.
+        """
+        if not container_client or not blob_name:
+            logger.error("Invalid input arguments for blob download")
+            raise ValueError("Invalid input arguments for blob download")
+
+        logger.info(f"Streaming blob '{blob_name}' (offset={offset}, length={length})")
+        condition = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+        try:
+            downloader = await container_client.get_blob_client(blob_name).download_blob(
+                offset=offset, length=length, max_concurrency=1, **condition, **self._request_options
+            )
+            async for chunk in downloader.chunks():
+                BYTES_DOWNLOADED.inc(len(chunk))
+                yield chunk
+        except ResourceNotFoundError as e:
+            logger.error(f"Blob '{blob_name}' not found in container: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stream blob '{blob_name}': {e}")
+            raise
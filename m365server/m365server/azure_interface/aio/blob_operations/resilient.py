@@ -0,0 +1,75 @@
+from typing import AsyncIterator, Optional, Tuple
+
+from azure.storage.blob import BlobProperties
+from azure.storage.blob.aio import ContainerClient
+from loguru import logger
+
+from m365server.azure_interface.aio.resilience import ResiliencePolicy
+from m365server.azure_interface.blob_operations import IBlobDownloadStrategy
+from m365server.azure_interface.metrics import STORAGE_RETRIES
+
+
+class ResilientDownloadStrategy(IBlobDownloadStrategy):
+    """
+    Wraps a download strategy so that its reads are retried, timed out and hedged by a ResiliencePolicy.
+
+    A stream is opened like any other read, its first chunk included. The "stream" timeout then
+    applies to every further chunk, and a stream pinned to an ETag that fails part way is resumed
+    from the first byte it has not delivered. An unpinned stream is not resumed, since the blob may
+    have changed in between.
+    """
+
+    def __init__(self, strategy: IBlobDownloadStrategy, policy: ResiliencePolicy) -> None:
+        self.strategy = strategy
+        self.policy = policy
+
+    async def download_blob(self, container_client: ContainerClient, blob_name: str) -> bytes:
+        return await self.policy.call("download", lambda: self.strategy.download_blob(container_client, blob_name))
+
+    async def get_blob_properties(self, container_client: ContainerClient, blob_name: str) -> BlobProperties:
+        return await self.policy.call("get_properties", lambda: self.strategy.get_blob_properties(container_client, blob_name))
+
+    async def _open(self, container_client: ContainerClient, blob_name: str, offset: Optional[int],
+                    length: Optional[int], etag: Optional[str]) -> Tuple[Optional[bytes], AsyncIterator[bytes]]:
+        chunks = self.strategy.stream_blob(container_client, blob_name, offset=offset, length=length, etag=etag)
+        try:
+            return await anext(chunks, None), chunks
+        except BaseException:
+            await chunks.aclose()
+            raise
+
+    async def _open_with_policy(self, container_client: ContainerClient, blob_name: str, offset: Optional[int],
+                                length: Optional[int], etag: Optional[str]) -> Tuple[Optional[bytes], AsyncIterator[bytes]]:
+        return await self.policy.call(
+            "stream", lambda: self._open(container_client, blob_name, offset, length, etag),
+            discard=lambda opened: opened[1].aclose()
+        )
+
+    async def stream_blob(self, container_client: ContainerClient, blob_name: str,
+                          offset: Optional[int] = None, length: Optional[int] = None,
+                          etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        chunk, chunks = await self._open_with_policy(container_client, blob_name, offset, length, etag)
+        delivered = 0
+        resumes = 0
+        try:
+            while chunk is not None:
+                delivered += len(chunk)
+                yield chunk
+                try:
+                    chunk = await self.policy.timed("stream", anext(chunks, None))
+                except Exception as error:
+                    reason = self.policy.retry_reason(error)
+                    resumes += 1
+                    if reason is None or etag is None or resumes >= self.policy.max_attempts:
+                        raise
+                    STORAGE_RETRIES.labels(operation="stream", reason=reason).inc()
+                    logger.warning(f"Resuming stream of blob '{blob_name}' at byte {delivered} ({reason}): {error}")
+                    await chunks.aclose()
+                    if length is not None and delivered >= length:
+                        break
+                    chunk, chunks = await self._open_with_policy(
+                        container_client, blob_name, (offset or 0) + delivered,
+                        None if length is None else length - delivered, etag
+                    )
+        finally:
+            await chunks.aclose()
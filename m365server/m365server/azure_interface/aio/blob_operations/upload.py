@@ -0,0 +1,44 @@
+import asyncio
+from m365server.azure_interface.blob_operations import IBlobUploadStrategy
+import azure
+from azure.storage.blob.aio import ContainerClient
+from typing import Dict, Optional, Union
+from io import BytesIO
+from loguru import logger
+
+from m365server.azure_interface.metrics import BYTES_UPLOADED, azure_call
+
+class BlobUploadStrategy(IBlobUploadStrategy):
+    @azure_call("upload")
+    async def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO],
+                          metadata: Optional[Dict[str, str]] = None):
+        logger.info(f"Uploading data to blob '{blob_name}'")
+        try:
+            if isinstance(file_data, str):
+                logger.info(f"Detected file data as string, attempting to open file at path: {file_data}")
+                data = await asyncio.to_thread(_read_file, file_data)
+                await container_client.upload_blob(name=blob_name, data=data, overwrite=True, metadata=metadata)
+                BYTES_UPLOADED.inc(len(data))
+            elif isinstance(file_data, BytesIO):
+                logger.info(f"Detected file data as BytesIO, uploading directly.")
+                await container_client.upload_blob(name=blob_name, data=file_data.getvalue(), overwrite=True, metadata=metadata)
+                BYTES_UPLOADED.inc(file_data.getbuffer().nbytes)
+            else:
+                logger.error(f"Unsupported data type for file_data: {type(file_data).__name__}")
+                return
+
+            logger.info(f"Successfully uploaded data to blob '{blob_name}'")
+        except azure.core.exceptions.HttpResponseError as e:
+            logger.error(f"HTTP error during blob upload: {e}")
+            raise
+        except azure.core.exceptions.AzureError as e:
+            logger.error(f"Azure error during blob upload: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during blob upload: {e}")
+            raise
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
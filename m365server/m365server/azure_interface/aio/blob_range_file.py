@@ -0,0 +1,105 @@
+import asyncio
+import io
+from typing import Any, Optional
+
+from loguru import logger
+
+
+class BlobRangeFile(io.RawIOBase):
+    """
+    A read-only, seekable file over a blob that downloads only the byte ranges that are read.
+
+    Lets synchronous readers such as pyarrow.parquet open a blob without downloading it: each
+    read becomes a ranged GET pinned to the blob's ETag, issued on the event loop that owns the
+    storage manager. Reads block until the range arrives, so the file must be used from a worker
+    thread and never from the event loop itself.
+    """
+
+    def __init__(self, storage_manager: Any, container_name: str, blob_name: str, size: int,
+                 etag: Optional[str], loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Initialize the BlobRangeFile.
+
+        Args:
+            storage_manager (Any): An async storage manager providing stream_blob.
+            container_name (str): The name of the container where the blob is located.
+            blob_name (str): The name of the blob to read.
+            size (int): The size of the blob in bytes.
+            etag (Optional[str]): The ETag every range is read at, so reads never mix two versions of the blob.
+            loop (asyncio.AbstractEventLoop): The event loop the storage manager runs on.
+        """
+        self.storage_manager = storage_manager
+        self.container_name = container_name
+        self.blob_name = blob_name
+        self.size = size
+        self.etag = etag
+        self._loop = loop
+        self._position = 0
+        self.bytes_read = 0
+        self.range_requests = 0
+
+    @classmethod
+    async def open(cls, storage_manager: Any, container_name: str, blob_name: str,
+                   properties: Optional[Any] = None) -> "BlobRangeFile":
+        """
+        Creates a BlobRangeFile for the current version of a blob, or for the version described by properties.
+        Must be awaited on the storage manager's event loop.
+        """
+        if properties is None:
+            properties = await storage_manager.get_blob_properties(container_name, blob_name)
+        return cls(storage_manager, container_name, blob_name, properties.size, properties.etag,
+                   asyncio.get_running_loop())
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    async def _read_range(self, offset: int, length: int) -> bytes:
+        chunks = [chunk async for chunk in self.storage_manager.stream_blob(
+            self.container_name, self.blob_name, offset=offset, length=length, etag=self.etag
+        )]
+        return b"".join(chunks)
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self.size - self._position
+        length = remaining if size is None or size < 0 else min(size, remaining)
+        if length <= 0:
+            return b""
+        data = asyncio.run_coroutine_threadsafe(self._read_range(self._position, length), self._loop).result()
+        self._position += len(data)
+        self.bytes_read += len(data)
+        self.range_requests += 1
+        return data
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            logger.info(f"Read {self.bytes_read} of {self.size} bytes of blob '{self.blob_name}' "
+                        f"in {self.range_requests} range request(s)")
+        super().close()
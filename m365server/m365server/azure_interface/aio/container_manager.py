@@ -0,0 +1,147 @@
+from typing import AsyncIterator, List, Optional
+from azure.storage.blob.aio import BlobPrefix, BlobServiceClient, ContainerClient
+from azure.core.exceptions import ResourceNotFoundError
+from loguru import logger
+
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+from m365server.azure_interface.metrics import azure_call
+from m365server.azure_interface.profiling import span
+from m365server.azure_interface.ttl_cache import TTLCache
+
+class ContainerManager:
+    """
+    Asynchronous counterpart of m365server.azure_interface.container_manager.ContainerManager.
+    """
+    def __init__(self, blob_service_client: BlobServiceClient, cache_ttl: float = 300.0, retry_total: Optional[int] = None):
+        """
+        Initialize the ContainerManager.
+
+        Container clients are created on first use and cached for cache_ttl seconds,
+        so no request to the storage account is made until a container is needed.
+
+        Args:
+            blob_service_client (BlobServiceClient): The shared client for the storage account.
+            cache_ttl (float): Number of seconds container clients and the container listing are cached.
+            retry_total (Optional[int]): Retries the Azure SDK makes per listing request, instead of the client's retry policy.
+        """
+        self.blob_service_client = blob_service_client
+        self._request_options = {} if retry_total is None else {"retry_total": retry_total}
+        self.container_clients: TTLCache[ContainerClient] = TTLCache(cache_ttl)
+        self._container_names: TTLCache[List[str]] = TTLCache(cache_ttl)
+
+    def get_container_client(self, container_name: str) -> ContainerClient:
+        """
+        Retrieves the ContainerClient for the specified container name.
+
+        Creating a container client makes no network call, so this method is synchronous.
+
+        Args:
+            container_name (str): The name of the container.
+
+        Returns:
+            ContainerClient: The client for the specified container.
+        """
+        with span("container_client"):
+            return self.container_clients.get_or_create(
+                container_name,
+                lambda: self.blob_service_client.get_container_client(container_name)
+            )
+
+    async def list_blobs(self, container_name: str) -> List[str]:
+        container_client = self.get_container_client(container_name)
+        logger.info(f'Listing blobs in container "{container_name}"')
+        try:
+            with azure_call("list_blobs"):
+                blobs = [blob.name async for blob in container_client.list_blobs(**self._request_options)]
+        except ResourceNotFoundError:
+            logger.error(f'Container "{container_name}" not found')
+            self.container_clients.invalidate(container_name)
+            return []
+        logger.info(f'Found {len(blobs)} blob(s) in container "{container_name}"')
+        return blobs
+
+    async def iter_blob_pages(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None,
+                              continuation_token: Optional[str] = None) -> AsyncIterator[BlobListingPage]:
+        """
+        Yields a container listing one Azure page at a time, as the pages arrive.
+
+        The prefix and delimiter are applied by Azure. With a delimiter the listing is
+        hierarchical and virtual directories are reported in BlobListingPage.prefixes.
+
+        Args:
+            container_name (str): The name of the container to list.
+            prefix (Optional[str]): Only list blobs whose names start with this prefix.
+            delimiter (Optional[str]): Group blob names into virtual directories on this delimiter.
+            page_size (Optional[int]): Maximum number of results per page. Azure caps this at 5000.
+            continuation_token (Optional[str]): Resume the listing from a previous page's token.
+
+        Raises:
+            ResourceNotFoundError: If the container does not exist.
+        """
+        container_client = self.get_container_client(container_name)
+        if delimiter:
+            paged = container_client.walk_blobs(name_starts_with=prefix, delimiter=delimiter, results_per_page=page_size,
+                                               **self._request_options)
+        else:
+            paged = container_client.list_blobs(name_starts_with=prefix, results_per_page=page_size, **self._request_options)
+
+        pages = paged.by_page(continuation_token=continuation_token)
+        while True:
+            # Each page is a separate List Blobs request, timed on its own.
+            with azure_call("list_blobs_page"):
+                page = await anext(pages, None)
+            if page is None:
+                break
+            listing = BlobListingPage()
+            async for item in page:
+                if isinstance(item, BlobPrefix):
+                    listing.prefixes.append(item.name)
+                else:
+                    listing.blobs.append(BlobEntry.from_properties(item))
+            listing.continuation_token = pages.continuation_token or None
+            yield listing
+
+    async def list_blobs_page(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None, continuation_token: Optional[str] = None) -> BlobListingPage:
+        """
+        Returns a single page of a container listing. See iter_blob_pages.
+        """
+        pages = self.iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token)
+        try:
+            return await anext(pages, BlobListingPage())
+        finally:
+            await pages.aclose()
+
+    async def list_containers(self) -> List[str]:
+        names = self._container_names.get("all")
+        if names is None:
+            logger.info("Refreshing container listing")
+            with azure_call("list_containers"):
+                names = self._container_names.set(
+                    "all", [container.name async for container in self.blob_service_client.list_containers(**self._request_options)]
+                )
+        return list(names)
+
+    async def log_container_info(self):
+        for container_name in await self.list_containers():
+            try:
+                container_client = self.get_container_client(container_name)
+                blobs = [blob async for blob in container_client.list_blobs()]
+                num_blobs = len(blobs)
+                total_size = sum(blob.size for blob in blobs)
+                last_modified_times = [blob.last_modified for blob in blobs]
+                earliest_modified_time = min(last_modified_times) if last_modified_times else None
+                latest_modified_time = max(last_modified_times) if last_modified_times else None
+
+                logger.info(f"Container name: {container_name}")
+                logger.info(f"Number of blobs: {num_blobs}")
+                logger.info(f"Total size of blobs (bytes): {total_size}")
+                logger.info(f"Earliest blob modification time: {earliest_modified_time}")
+                logger.info(f"Latest blob modification time: {latest_modified_time}")
+
+            except ResourceNotFoundError:
+                logger.error(f"Container '{container_name}' not found")
+
+            except Exception as ex:
+                logger.error(f"Failed to retrieve information for container '{container_name}': {ex}")
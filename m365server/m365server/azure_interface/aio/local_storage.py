@@ -0,0 +1,505 @@
+import asyncio
+import inspect
+import itertools
+import json
+import mimetypes
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Union
+
+from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError
+from azure.storage.blob import BlobProperties, ContentSettings
+from loguru import logger
+
+from m365server.azure_interface.aio.azure_blob_storage_manager import AzureBlobStorageManager
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+from m365server.azure_interface.blob_operations import (BlobDeleteResult, IBlobDeleteStrategy, IBlobDownloadStrategy,
+                                                        IBlobUploadStrategy)
+from m365server.azure_interface.configuration import AzureBlobStorageConfig
+
+# Azure returns at most 5000 results per listing page.
+MAX_PAGE_SIZE = 5000
+
+
+def _blob_properties(container_name: str, blob_name: str, size: int, etag: str, last_modified: datetime,
+                     content_type: Optional[str], metadata: Optional[Dict[str, str]]) -> BlobProperties:
+    properties = BlobProperties(name=blob_name, metadata=dict(metadata or {}))
+    properties.container = container_name
+    properties.size = size
+    properties.etag = etag
+    properties.last_modified = last_modified
+    properties.content_settings = ContentSettings(
+        content_type=content_type or mimetypes.guess_type(blob_name)[0] or "application/octet-stream"
+    )
+    return properties
+
+
+def _check_etag(properties: BlobProperties, etag: Optional[str]) -> None:
+    if etag is not None and properties.etag != etag:
+        raise ResourceModifiedError(f"Blob '{properties.name}' has changed since ETag {etag} was read")
+
+
+def _file_etag(stat: os.stat_result) -> str:
+    # Every write renames a new file into place, so the inode changes even when the mtime does not.
+    return f'"0x{stat.st_mtime_ns:X}{stat.st_ino:X}"'
+
+
+class BlobStore(ABC):
+    """
+    One container of a local storage backend. Plays the part of an Azure ContainerClient for the
+    BlobStore strategies, raising the same azure.core exceptions Azure would.
+    """
+
+    def __init__(self, container_name: str) -> None:
+        self.container_name = container_name
+
+    @abstractmethod
+    async def write(self, blob_name: str, blocks: AsyncIterator[bytes], metadata: Optional[Dict[str, str]] = None) -> None:
+        """
+        Stores a blob from a stream of blocks, replacing any existing blob of the same name.
+        """
+        ...
+
+    @abstractmethod
+    async def get_properties(self, blob_name: str) -> BlobProperties:
+        """
+        Raises:
+            ResourceNotFoundError: If the blob does not exist.
+        """
+        ...
+
+    @abstractmethod
+    def read(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None,
+             etag: Optional[str] = None, chunk_size: int = 4 * 1024 * 1024) -> AsyncIterator[bytes]:
+        """
+        Yields a blob, or a byte range of it, in chunks of chunk_size bytes.
+
+        Raises:
+            ResourceNotFoundError: If the blob does not exist.
+            ResourceModifiedError: If etag is given and the blob has a different ETag.
+        """
+        ...
+
+    @abstractmethod
+    async def delete(self, blob_name: str) -> None:
+        """
+        Raises:
+            ResourceNotFoundError: If the blob does not exist.
+        """
+        ...
+
+    @abstractmethod
+    async def list(self, prefix: Optional[str] = None) -> List[BlobProperties]:
+        """
+        Returns the properties of every blob whose name starts with prefix, sorted by name.
+        """
+        ...
+
+
+class _MemoryBlob:
+    __slots__ = ("data", "properties")
+
+    def __init__(self, data: bytes, properties: BlobProperties) -> None:
+        self.data = data
+        self.properties = properties
+
+
+class InMemoryBlobStore(BlobStore):
+    """
+    A container held in a dict. Blobs live as long as the store.
+    """
+
+    _etags = itertools.count(1)
+
+    def __init__(self, container_name: str) -> None:
+        super().__init__(container_name)
+        self._blobs: Dict[str, _MemoryBlob] = {}
+
+    def _get(self, blob_name: str) -> _MemoryBlob:
+        blob = self._blobs.get(blob_name)
+        if blob is None:
+            raise ResourceNotFoundError(f"Blob '{blob_name}' not found in container '{self.container_name}'")
+        return blob
+
+    async def write(self, blob_name: str, blocks: AsyncIterator[bytes], metadata: Optional[Dict[str, str]] = None) -> None:
+        data = b"".join([block async for block in blocks])
+        etag = f'"0x{next(self._etags):016X}"'
+        properties = _blob_properties(self.container_name, blob_name, len(data), etag,
+                                      datetime.now(timezone.utc), None, metadata)
+        self._blobs[blob_name] = _MemoryBlob(data, properties)
+
+    async def get_properties(self, blob_name: str) -> BlobProperties:
+        return self._get(blob_name).properties
+
+    async def read(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None,
+                   etag: Optional[str] = None, chunk_size: int = 4 * 1024 * 1024) -> AsyncIterator[bytes]:
+        blob = self._get(blob_name)
+        _check_etag(blob.properties, etag)
+        start = offset or 0
+        end = len(blob.data) if length is None else min(start + length, len(blob.data))
+        for position in range(start, end, chunk_size):
+            yield blob.data[position:min(position + chunk_size, end)]
+
+    async def delete(self, blob_name: str) -> None:
+        self._get(blob_name)
+        del self._blobs[blob_name]
+
+    async def list(self, prefix: Optional[str] = None) -> List[BlobProperties]:
+        return [self._blobs[name].properties for name in sorted(self._blobs) if not prefix or name.startswith(prefix)]
+
+
+class FileSystemBlobStore(BlobStore):
+    """
+    A container stored as a directory tree, one file per blob; "/" in a blob name becomes a subdirectory.
+
+    Blobs are written to a temporary file and renamed into place, so readers never see a partial blob,
+    and a reader that has opened a blob keeps reading the version it opened. Blob metadata is kept in
+    JSON sidecar files under the backend's .metadata directory; content types are guessed from blob names.
+    """
+
+    def __init__(self, container_name: str, root: str) -> None:
+        super().__init__(container_name)
+        self.directory = os.path.join(root, container_name)
+        self._metadata_directory = os.path.join(root, ".metadata", container_name)
+        self._temp_directory = os.path.join(root, ".tmp")
+
+    def _path(self, blob_name: str) -> str:
+        path = os.path.normpath(os.path.join(self.directory, blob_name))
+        if not path.startswith(self.directory + os.sep):
+            raise ValueError(f"Invalid blob name '{blob_name}'")
+        return path
+
+    def _sidecar_path(self, blob_name: str) -> str:
+        return os.path.join(self._metadata_directory, f"{blob_name}.json")
+
+    def _properties(self, blob_name: str) -> BlobProperties:
+        try:
+            stat = os.stat(self._path(blob_name))
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"Blob '{blob_name}' not found in container '{self.container_name}'")
+        try:
+            with open(self._sidecar_path(blob_name)) as file:
+                sidecar = json.load(file)
+        except FileNotFoundError:
+            sidecar = {}
+        return _blob_properties(
+            self.container_name, blob_name, stat.st_size, _file_etag(stat),
+            datetime.fromtimestamp(stat.st_mtime, timezone.utc), None, sidecar.get("metadata")
+        )
+
+    def _commit(self, temp_path: str, blob_name: str, metadata: Optional[Dict[str, str]]) -> None:
+        path = self._path(blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sidecar_path = self._sidecar_path(blob_name)
+        if metadata:
+            os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+            with open(f"{temp_path}.json", "w") as file:
+                json.dump({"metadata": metadata}, file)
+            os.replace(f"{temp_path}.json", sidecar_path)
+        elif os.path.exists(sidecar_path):
+            os.remove(sidecar_path)
+        os.replace(temp_path, path)
+
+    async def write(self, blob_name: str, blocks: AsyncIterator[bytes], metadata: Optional[Dict[str, str]] = None) -> None:
+        self._path(blob_name)
+        await asyncio.to_thread(os.makedirs, self._temp_directory, exist_ok=True)
+        temp_path = os.path.join(self._temp_directory, uuid.uuid4().hex)
+        file = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            async for block in blocks:
+                await asyncio.to_thread(file.write, block)
+            await asyncio.to_thread(file.close)
+            await asyncio.to_thread(self._commit, temp_path, blob_name, metadata)
+        except BaseException:
+            file.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    async def get_properties(self, blob_name: str) -> BlobProperties:
+        return await asyncio.to_thread(self._properties, blob_name)
+
+    def _open(self, blob_name: str, etag: Optional[str]) -> BinaryIO:
+        file = open(self._path(blob_name), "rb")
+        # Checked against the opened file, so the ETag and the bytes read always belong to the same version.
+        stat = os.fstat(file.fileno())
+        if etag is not None and etag != _file_etag(stat):
+            file.close()
+            raise ResourceModifiedError(f"Blob '{blob_name}' has changed since ETag {etag} was read")
+        return file
+
+    async def read(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None,
+                   etag: Optional[str] = None, chunk_size: int = 4 * 1024 * 1024) -> AsyncIterator[bytes]:
+        try:
+            file = await asyncio.to_thread(self._open, blob_name, etag)
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"Blob '{blob_name}' not found in container '{self.container_name}'")
+        try:
+            if offset:
+                file.seek(offset)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = await asyncio.to_thread(file.read, chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            file.close()
+
+    def _delete(self, blob_name: str) -> None:
+        try:
+            os.remove(self._path(blob_name))
+        except FileNotFoundError:
+            raise ResourceNotFoundError(f"Blob '{blob_name}' not found in container '{self.container_name}'")
+        if os.path.exists(self._sidecar_path(blob_name)):
+            os.remove(self._sidecar_path(blob_name))
+
+    async def delete(self, blob_name: str) -> None:
+        await asyncio.to_thread(self._delete, blob_name)
+
+    def _list(self, prefix: Optional[str]) -> List[BlobProperties]:
+        names = []
+        for directory, _, files in os.walk(self.directory):
+            relative = os.path.relpath(directory, self.directory)
+            for file_name in files:
+                name = file_name if relative == "." else f"{relative.replace(os.sep, '/')}/{file_name}"
+                if not prefix or name.startswith(prefix):
+                    names.append(name)
+        properties = []
+        for name in sorted(names):
+            try:
+                properties.append(self._properties(name))
+            except ResourceNotFoundError:
+                pass
+        return properties
+
+    async def list(self, prefix: Optional[str] = None) -> List[BlobProperties]:
+        return await asyncio.to_thread(self._list, prefix)
+
+
+class LocalContainerManager(ABC):
+    """
+    Serves container listings from a local backend, with the interface of
+    m365server.azure_interface.aio.ContainerManager.
+
+    Continuation tokens are the name of the last blob or virtual directory of the previous page.
+    """
+
+    @abstractmethod
+    def get_container_client(self, container_name: str) -> BlobStore:
+        ...
+
+    @abstractmethod
+    async def list_containers(self) -> List[str]:
+        ...
+
+    async def _existing_store(self, container_name: str) -> BlobStore:
+        if container_name not in await self.list_containers():
+            raise ResourceNotFoundError(f"Container '{container_name}' not found")
+        return self.get_container_client(container_name)
+
+    async def list_blobs(self, container_name: str) -> List[str]:
+        try:
+            store = await self._existing_store(container_name)
+        except ResourceNotFoundError:
+            logger.error(f'Container "{container_name}" not found')
+            return []
+        return [properties.name for properties in await store.list()]
+
+    async def iter_blob_pages(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None,
+                              continuation_token: Optional[str] = None) -> AsyncIterator[BlobListingPage]:
+        """
+        Yields a container listing one page at a time. See ContainerManager.iter_blob_pages.
+
+        Raises:
+            ResourceNotFoundError: If the container does not exist.
+        """
+        store = await self._existing_store(container_name)
+        items: List[Union[str, BlobProperties]] = []
+        seen_prefixes = set()
+        for properties in await store.list(prefix):
+            if delimiter:
+                index = properties.name.find(delimiter, len(prefix or ""))
+                if index >= 0:
+                    virtual_directory = properties.name[:index + len(delimiter)]
+                    if virtual_directory not in seen_prefixes:
+                        seen_prefixes.add(virtual_directory)
+                        items.append(virtual_directory)
+                    continue
+            items.append(properties)
+
+        def key(item: Union[str, BlobProperties]) -> str:
+            return item if isinstance(item, str) else item.name
+
+        if continuation_token:
+            items = [item for item in items if key(item) > continuation_token]
+        size = min(page_size or MAX_PAGE_SIZE, MAX_PAGE_SIZE)
+        for start in range(0, max(len(items), 1), size):
+            page_items = items[start:start + size]
+            listing = BlobListingPage()
+            for item in page_items:
+                if isinstance(item, str):
+                    listing.prefixes.append(item)
+                else:
+                    listing.blobs.append(BlobEntry.from_properties(item))
+            listing.continuation_token = key(page_items[-1]) if start + size < len(items) else None
+            yield listing
+
+    async def list_blobs_page(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None, continuation_token: Optional[str] = None) -> BlobListingPage:
+        pages = self.iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token)
+        try:
+            return await anext(pages, BlobListingPage())
+        finally:
+            await pages.aclose()
+
+    async def log_container_info(self):
+        for container_name in await self.list_containers():
+            blobs = await self.get_container_client(container_name).list()
+            logger.info(f"Container name: {container_name}")
+            logger.info(f"Number of blobs: {len(blobs)}")
+            logger.info(f"Total size of blobs (bytes): {sum(blob.size for blob in blobs)}")
+
+
+class InMemoryContainerManager(LocalContainerManager):
+    """
+    Containers held in memory. A container is created by the first request for its client.
+    """
+
+    def __init__(self) -> None:
+        self.stores: Dict[str, InMemoryBlobStore] = {}
+
+    def get_container_client(self, container_name: str) -> InMemoryBlobStore:
+        store = self.stores.get(container_name)
+        if store is None:
+            store = self.stores[container_name] = InMemoryBlobStore(container_name)
+        return store
+
+    async def list_containers(self) -> List[str]:
+        return sorted(self.stores)
+
+
+class FileSystemContainerManager(LocalContainerManager):
+    """
+    Containers stored as directories under root. A container exists once a blob has been written to it.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+
+    def get_container_client(self, container_name: str) -> FileSystemBlobStore:
+        return FileSystemBlobStore(container_name, self.root)
+
+    def _list_containers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if not name.startswith(".") and os.path.isdir(os.path.join(self.root, name)))
+
+    async def list_containers(self) -> List[str]:
+        return await asyncio.to_thread(self._list_containers)
+
+    def delete_all(self) -> None:
+        """
+        Removes every container and blob under root.
+        """
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+class BlobStoreUploadStrategy(IBlobUploadStrategy):
+    """
+    Uploads to a BlobStore, reading the data in blocks the way BlobBlockUploadStrategy does.
+    """
+
+    def __init__(self, block_size: int = 8 * 1024 * 1024) -> None:
+        self.block_size = block_size
+
+    async def _blocks(self, stream: Any) -> AsyncIterator[bytes]:
+        read_async = inspect.iscoroutinefunction(stream.read)
+        while True:
+            block = await stream.read(self.block_size) if read_async else await asyncio.to_thread(stream.read, self.block_size)
+            if not block:
+                return
+            yield block
+
+    async def upload_blob(self, container_client: BlobStore, blob_name: str, file_data: Union[str, BytesIO, BinaryIO, Any],
+                          metadata: Optional[Dict[str, str]] = None):
+        if isinstance(file_data, str):
+            file = await asyncio.to_thread(open, file_data, "rb")
+            try:
+                await container_client.write(blob_name, self._blocks(file), metadata)
+            finally:
+                file.close()
+        elif isinstance(file_data, BytesIO):
+            # Stored without copying block by block; the buffer is already in memory.
+            await container_client.write(blob_name, _single_block(file_data.getvalue()), metadata)
+        elif hasattr(file_data, "read"):
+            await container_client.write(blob_name, self._blocks(file_data), metadata)
+        else:
+            logger.error(f"Unsupported data type for file_data: {type(file_data).__name__}")
+
+
+async def _single_block(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+class BlobStoreDownloadStrategy(IBlobDownloadStrategy):
+    def __init__(self, chunk_size: int = 4 * 1024 * 1024) -> None:
+        self.chunk_size = chunk_size
+
+    async def download_blob(self, container_client: BlobStore, blob_name: str) -> bytes:
+        return b"".join([chunk async for chunk in container_client.read(blob_name, chunk_size=self.chunk_size)])
+
+    async def get_blob_properties(self, container_client: BlobStore, blob_name: str) -> BlobProperties:
+        return await container_client.get_properties(blob_name)
+
+    def stream_blob(self, container_client: BlobStore, blob_name: str, offset: Optional[int] = None,
+                    length: Optional[int] = None, etag: Optional[str] = None) -> AsyncIterator[bytes]:
+        return container_client.read(blob_name, offset=offset, length=length, etag=etag, chunk_size=self.chunk_size)
+
+
+class BlobStoreDeleteStrategy(IBlobDeleteStrategy):
+    async def delete_blob(self, container_client: BlobStore, blob_name: str):
+        await container_client.delete(blob_name)
+
+    async def delete_blobs(self, container_client: BlobStore, blob_names: List[str]) -> List[BlobDeleteResult]:
+        results = []
+        for blob_name in blob_names:
+            try:
+                await container_client.delete(blob_name)
+                results.append(BlobDeleteResult(blob_name, 202))
+            except ResourceNotFoundError:
+                results.append(BlobDeleteResult(blob_name, 404, "BlobNotFound"))
+        return results
+
+
+def create_local_storage_manager(root: Optional[str] = None, config: Optional[AzureBlobStorageConfig] = None
+                                 ) -> AzureBlobStorageManager:
+    """
+    Creates an AzureBlobStorageManager backed by memory, or by the directory root when one is given.
+
+    Everything above the strategies and the container manager (the caches, container stats and the
+    API) runs unchanged, which makes the local backends suitable for tests, local development and
+    measuring the server's own overhead.
+
+    Args:
+        root (Optional[str]): Directory holding the containers, or None to keep everything in memory.
+        config (Optional[AzureBlobStorageConfig]): Supplies the upload block and download chunk sizes.
+
+    Returns:
+        AzureBlobStorageManager: A manager that makes no network calls.
+    """
+    config = config or AzureBlobStorageConfig(storage_account_key="", storage_account_name="local")
+    container_manager = FileSystemContainerManager(root) if root else InMemoryContainerManager()
+    manager = AzureBlobStorageManager(config, container_manager=container_manager)
+    manager.set_upload_strategy(BlobStoreUploadStrategy(block_size=config.upload_block_size))
+    manager.set_download_strategy(BlobStoreDownloadStrategy(chunk_size=config.download_chunk_size))
+    manager.set_delete_strategy(BlobStoreDeleteStrategy())
+    return manager
@@ -0,0 +1,204 @@
+import asyncio
+import random
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from azure.core.exceptions import HttpResponseError, ServiceRequestError, ServiceResponseError
+from loguru import logger
+
+from m365server.azure_interface.blob_listing import BlobListingPage
+from m365server.azure_interface.metrics import HEDGED_READS, STORAGE_RETRIES
+
+T = TypeVar("T")
+
+# Throttling and transient server errors; every other status is the same on a second try.
+RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+# Reads whose duration is latency rather than transfer, so a duplicate costs little. A whole-blob
+# download is left out: hedging it would start a second full transfer of the blob.
+HEDGED_OPERATIONS = frozenset({"get_properties", "stream", "list_blobs_page", "list_containers"})
+
+
+class ResiliencePolicy:
+    """
+    Retries, times out and optionally hedges storage reads.
+
+    A read that fails with a throttling or server error, a dropped connection, or that takes longer
+    than its operation's timeout is retried up to max_attempts times in total, after an exponential
+    backoff with full jitter, or after the delay a throttling response asks for. When hedging is on, an
+    attempt of one of the hedged_operations still running after hedge_after_seconds gets a duplicate,
+    and whichever succeeds first is used while the other is cancelled. A stream is hedged only while it
+    is being opened, up to its first chunk.
+
+    Only idempotent reads belong behind the policy; writes keep the retry policy of the Azure SDK.
+    """
+
+    def __init__(self, max_attempts: int = 4, backoff_base_seconds: float = 0.1, backoff_max_seconds: float = 5.0,
+                 timeouts: Optional[Dict[str, float]] = None, hedge_after_seconds: Optional[float] = None,
+                 hedged_operations: Iterable[str] = HEDGED_OPERATIONS) -> None:
+        """
+        Initialize the ResiliencePolicy.
+
+        Args:
+            max_attempts (int): Attempts made at most per read, the first included.
+            backoff_base_seconds (float): Upper bound of the first backoff; it doubles with every retry.
+            backoff_max_seconds (float): Upper bound of any backoff.
+            timeouts (Optional[Dict[str, float]]): Seconds an attempt of each operation may take; operations missing are not timed out.
+            hedge_after_seconds (Optional[float]): Seconds after which a running attempt is hedged, or None to never hedge.
+            hedged_operations (Iterable[str]): Operations that are hedged; the others are only retried and timed out.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.timeouts = dict(timeouts or {})
+        self.hedge_after_seconds = hedge_after_seconds
+        self.hedged_operations = frozenset(hedged_operations)
+
+    @staticmethod
+    def retry_reason(error: BaseException) -> Optional[str]:
+        """
+        Returns why error is worth retrying, used as the reason label of the retry counter, or None if it is not.
+        """
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        if isinstance(error, HttpResponseError):
+            return str(error.status_code) if error.status_code in RETRYABLE_STATUS else None
+        if isinstance(error, (ServiceRequestError, ServiceResponseError)):
+            return "connection"
+        return None
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """
+        Returns the seconds to wait before retrying after the given failed attempt, counted from 1.
+        """
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max_seconds)
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempt - 1)))
+
+    async def timed(self, operation: str, awaitable: Awaitable[T]) -> T:
+        """
+        Awaits awaitable within the timeout of operation.
+        """
+        timeout = self.timeouts.get(operation)
+        if timeout is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, timeout)
+
+    async def call(self, operation: str, fn: Callable[[], Awaitable[T]],
+                   discard: Optional[Callable[[T], Awaitable[Any]]] = None) -> T:
+        """
+        Returns the result of the first attempt of fn() that succeeds, retrying and hedging as configured.
+
+        Args:
+            operation (str): The operation, which selects the timeout and labels the counters.
+            fn (Callable[[], Awaitable[T]]): Starts one attempt.
+            discard (Optional[Callable[[T], Awaitable[Any]]]): Releases the result of an attempt that lost a hedge.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self._hedged(operation, lambda: self.timed(operation, fn()), discard)
+            except Exception as error:
+                reason = self.retry_reason(error)
+                if reason is None or attempt == self.max_attempts:
+                    raise
+                delay = self.backoff(attempt, error)
+                STORAGE_RETRIES.labels(operation=operation, reason=reason).inc()
+                logger.warning(f"Retrying {operation} in {delay:.2f}s after attempt {attempt} failed ({reason}): {error}")
+            await asyncio.sleep(delay)
+
+    async def _hedged(self, operation: str, fn: Callable[[], Awaitable[T]],
+                      discard: Optional[Callable[[T], Awaitable[Any]]]) -> T:
+        if self.hedge_after_seconds is None or operation not in self.hedged_operations:
+            return await fn()
+        primary = asyncio.ensure_future(fn())
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_after_seconds)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done:
+            return primary.result()
+
+        logger.debug(f"Hedging {operation} after {self.hedge_after_seconds}s")
+        hedge = asyncio.ensure_future(fn())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: task is not primary):
+                    if task.exception() is None:
+                        HEDGED_READS.labels(operation=operation, winner="primary" if task is primary else "hedge").inc()
+                        for other in done - {task}:
+                            self._release_loser(other, discard)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(lambda task: self._release_loser(task, discard))
+
+    @staticmethod
+    def _release_loser(task: asyncio.Future, discard: Optional[Callable[[Any], Awaitable[Any]]]) -> None:
+        # Retrieves the loser's outcome so it is not reported as unhandled, and frees a result it still produced.
+        if task.cancelled() or task.exception() is not None:
+            return
+        if discard is not None:
+            asyncio.ensure_future(discard(task.result()))
+
+
+class ResilientContainerManager:
+    """
+    Wraps a container manager so that its listings go through a ResiliencePolicy.
+
+    Every page of a listing is an attempt of its own, resumed from the continuation token of the
+    page before, so a failed page is retried without listing the container from the start.
+    """
+
+    def __init__(self, container_manager: Any, policy: ResiliencePolicy) -> None:
+        self.container_manager = container_manager
+        self.policy = policy
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.container_manager, name)
+
+    async def _fetch_page(self, container_name: str, prefix: Optional[str], delimiter: Optional[str],
+                          page_size: Optional[int], continuation_token: Optional[str]) -> Optional[BlobListingPage]:
+        pages = self.container_manager.iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token)
+        try:
+            return await anext(pages, None)
+        finally:
+            await pages.aclose()
+
+    async def iter_blob_pages(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None,
+                              continuation_token: Optional[str] = None) -> AsyncIterator[BlobListingPage]:
+        """
+        Yields a container listing one page at a time. See ContainerManager.iter_blob_pages.
+        """
+        while True:
+            token = continuation_token
+            page = await self.policy.call(
+                "list_blobs_page", lambda: self._fetch_page(container_name, prefix, delimiter, page_size, token)
+            )
+            if page is None:
+                return
+            yield page
+            continuation_token = page.continuation_token
+            if not continuation_token:
+                return
+
+    async def list_blobs_page(self, container_name: str, prefix: Optional[str] = None, delimiter: Optional[str] = None,
+                              page_size: Optional[int] = None, continuation_token: Optional[str] = None) -> BlobListingPage:
+        page = await self.policy.call(
+            "list_blobs_page", lambda: self._fetch_page(container_name, prefix, delimiter, page_size, continuation_token)
+        )
+        return page or BlobListingPage()
+
+    async def list_blobs(self, container_name: str) -> List[str]:
+        return await self.policy.call("list_blobs", lambda: self.container_manager.list_blobs(container_name))
+
+    async def list_containers(self) -> List[str]:
+        return await self.policy.call("list_containers", self.container_manager.list_containers)
@@ -0,0 +1,164 @@
+import asyncio
+import itertools
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from loguru import logger
+
+from m365server.azure_interface.metrics import COALESCED_READS
+
+T = TypeVar("T")
+
+
+class _StreamFlight:
+    """
+    One download shared by every subscriber that joins it before its first chunk has been read.
+
+    A producer task reads the source stream and keeps each chunk only until every subscriber has
+    read it, reading at most one chunk ahead of the slowest subscriber. A flight holds one or two
+    chunks at a time whatever the number of subscribers, as a stream read by a single client does.
+    """
+
+    # Chunks the producer reads ahead of the slowest subscriber.
+    READ_AHEAD_CHUNKS = 1
+
+    def __init__(self, open_stream: Callable[[], AsyncIterator[bytes]],
+                 on_finished: Callable[["_StreamFlight"], None]) -> None:
+        self._open_stream = open_stream
+        self._on_finished = on_finished
+        self._chunks: List[bytes] = []
+        self._first = 0
+        self._positions: Dict[int, int] = {}
+        self._subscriber_ids = itertools.count()
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._done = False
+        self._abandoned = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def joinable(self) -> bool:
+        return self._first == 0 and not self._done and not self._abandoned
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _trim(self) -> None:
+        if not self._positions:
+            return
+        consumed = min(self._positions.values()) - self._first
+        if consumed > 0:
+            del self._chunks[:consumed]
+            self._first += consumed
+            self._notify()
+
+    async def _produce(self) -> None:
+        try:
+            async for chunk in self._open_stream():
+                self._chunks.append(chunk)
+                self._notify()
+                while len(self._chunks) > self.READ_AHEAD_CHUNKS:
+                    await self._changed.wait()
+        except Exception as error:
+            self._error = error
+        finally:
+            self._done = True
+            self._notify()
+            self._on_finished(self)
+
+    async def subscribe(self) -> AsyncIterator[bytes]:
+        if self._first > 0 or self._abandoned:
+            # The flight moved on between joining and the first read; download independently.
+            async for chunk in self._open_stream():
+                yield chunk
+            return
+        subscriber = next(self._subscriber_ids)
+        self._positions[subscriber] = self._first
+        if self._task is None:
+            self._task = asyncio.create_task(self._produce())
+        try:
+            while True:
+                position = self._positions[subscriber]
+                if position < self._first + len(self._chunks):
+                    self._positions[subscriber] = position + 1
+                    chunk = self._chunks[position - self._first]
+                    self._trim()
+                    yield chunk
+                elif self._done:
+                    if self._error is not None:
+                        raise self._error
+                    return
+                else:
+                    await self._changed.wait()
+        finally:
+            del self._positions[subscriber]
+            if self._positions:
+                self._trim()
+            elif not self._done:
+                # Nobody is left to read the download.
+                self._abandoned = True
+                self._task.cancel()
+
+
+class SingleFlight:
+    """
+    Coalesces identical storage reads that are in flight at the same time.
+
+    The first caller for a key starts the read; callers arriving while it is in flight wait for the
+    same result instead of calling Azure again. Streams fan out chunk by chunk to the callers that
+    joined before the first chunk was read; a caller arriving later starts its own download rather
+    than the shared one keeping every chunk for replay. A read is only shared while it is in flight,
+    and a caller that is cancelled leaves the read running for the others. Failures are raised to
+    every caller that shared the read.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._streams: Dict[Hashable, _StreamFlight] = {}
+
+    async def call(self, operation: str, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Returns the result of fn(), sharing it with every call for the same key while it runs.
+        """
+        future = self._calls.get((operation, key))
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[(operation, key)] = future
+            future.add_done_callback(lambda done: self._finish_call((operation, key), done))
+        else:
+            COALESCED_READS.labels(operation=operation).inc()
+            logger.debug(f"Joining in-flight {operation} of {key}")
+        return await asyncio.shield(future)
+
+    def _finish_call(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # Marks the exception retrieved when every caller was cancelled.
+            future.exception()
+
+    def stream(self, operation: str, key: Hashable, open_stream: Callable[[], AsyncIterator[bytes]]) -> AsyncIterator[bytes]:
+        """
+        Returns an iterator over the stream open_stream() returns, shared with every stream for the same key while it runs.
+        """
+        flight = self._streams.get((operation, key))
+        if flight is not None and flight.joinable:
+            COALESCED_READS.labels(operation=operation).inc()
+            logger.debug(f"Joining in-flight {operation} of {key}")
+        else:
+            flight = _StreamFlight(open_stream, lambda finished: self._finish_stream((operation, key), finished))
+            self._streams[(operation, key)] = flight
+        return flight.subscribe()
+
+    def _finish_stream(self, key: Hashable, flight: _StreamFlight) -> None:
+        if self._streams.get(key) is flight:
+            del self._streams[key]
+
+    def forget(self, container_name: str, blob_name: str) -> None:
+        """
+        Stops sharing the reads of a blob that is in flight, so that reads after a write see the new version.
+        Callers already sharing them are unaffected.
+        """
+        for flights in (self._calls, self._streams):
+            for key in [key for key in flights if key[1][:2] == (container_name, blob_name)]:
+                del flights[key]
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Optional
+
+from azure.core.credentials import AccessToken
+
+from m365server.azure_interface.token_provider import TokenProvider
+
+
+class AsyncTokenProvider:
+    """
+    Adapts a TokenProvider to the azure.core AsyncTokenCredential protocol used by the asynchronous clients.
+
+    Tokens held in memory are returned without blocking; a refresh runs in a worker thread so the
+    event loop keeps serving requests while the provider waits for Redis or the identity endpoint.
+    The wrapped provider is shared, so closing the adapter leaves it running.
+    """
+
+    def __init__(self, provider: TokenProvider) -> None:
+        self.provider = provider
+
+    async def get_token(self, *scopes: str, claims: Optional[str] = None, **kwargs) -> AccessToken:
+        if not claims:
+            token = self.provider.cached_token(" ".join(scopes))
+            if token is not None:
+                return token
+        return await asyncio.to_thread(self.provider.get_token, *scopes, claims=claims)
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "AsyncTokenProvider":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -1,45 +1,37 @@
+import os
 
-import msal
-from typing import List
-from msal import PublicClientApplication
 import requests
-import os
-from dotenv import load_dotenv,find_dotenv
 from loguru import logger
-load_dotenv(find_dotenv())
+
+from m365server.azure_interface.configuration import ServicePrincipalConfig
+from m365server.azure_interface.token_provider import GRAPH_SCOPE, get_token_provider
+
 default_graph_uri = 'https://graph.microsoft.com/.default/v1.0/'
 default_authority_url = 'https://login.microsoftonline.com/consumers/'
+user_endpoint = default_graph_uri + "me"
 
-APPLICATION_ID = os.environ.get('APPLICATION_ID')
-CLIENT_SECRET= os.environ.get('CLIENT_SECRET')
-AZURE_TENANT_ID=os.environ.get('AZURE_TENANT_ID')
-
-import subprocess
-import json 
 
 def get_auth_header():
-    # Define the request parameters
-    url = f"https://login.microsoftonline.com/{AZURE_TENANT_ID}/oauth2/v2.0/token"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {
-        "client_id": APPLICATION_ID,
-        "scope": "https://graph.microsoft.com/.default",
-        "client_secret": CLIENT_SECRET,
-        "grant_type": "client_credentials"
-    }
-
-    # Make the request and capture the response
-    response = requests.post(url, headers=headers, data=data)
-
-    # Extract the access token from the response
-    access_token = response.json()["access_token"]
-
-    # Create the Authorization header with the access token as a Bearer token
-    auth_header = {"Authorization": f"Bearer {access_token}"}
-
-    # Return the Authorization header
-    return auth_header
-
-user_endpoint = default_graph_uri + "me"
-response = requests.get(user_endpoint, headers=get_auth_header())
-logger.info(response.json())
+    """
+    Returns an Authorization header with a Graph token for the client credentials in APPLICATION_ID,
+    CLIENT_SECRET and AZURE_TENANT_ID.
+
+    The credentials are read on every call rather than at import, so importing this module
+    neither reads the environment nor touches the network. Tokens come from the shared
+    TokenProvider, which only calls the identity endpoint when its cached token is about to expire.
+    """
+    service_principal = ServicePrincipalConfig(
+        client_id=os.environ.get('APPLICATION_ID'),
+        client_secret=os.environ.get('CLIENT_SECRET'),
+        tenant_id=os.environ.get('AZURE_TENANT_ID')
+    )
+    return get_token_provider(service_principal).get_auth_header(GRAPH_SCOPE)
+
+
+def get_current_user():
+    """
+    Returns the Graph profile of the signed-in identity.
+    """
+    response = requests.get(user_endpoint, headers=get_auth_header())
+    logger.info(response.json())
+    return response.json()
@@ -1,10 +1,9 @@
 from io import BytesIO
-from typing import Dict, List, Union, Optional
+from typing import BinaryIO, Dict, Iterator, List, Union, Optional
 from loguru import logger
 import m365server.azure_interface as AzureInterface
-import pandas as pd
 from azure.core.exceptions import ResourceNotFoundError
-from azure.storage.blob import BlobServiceClient, ContainerClient
+from azure.storage.blob import BlobProperties, BlobServiceClient, ContainerClient
 from azure.identity import ClientSecretCredential
 
 from m365server.azure_interface.configuration import AzureBlobStorageConfig, ServicePrincipalConfig
@@ -25,25 +24,40 @@ class AzureBlobStorageManager:
             config (AzureBlobStorageConfig): Configuration for Azure Blob Storage.
         """
         logger.info("Initializing AzureBlobStorageManager")
+        self.config = config
         self.blob_service_client = BlobServiceClientFactory.create_client(config)
-        self.container_manager = ContainerManager(self.blob_service_client)
+        self.container_manager = ContainerManager(self.blob_service_client, cache_ttl=config.container_cache_ttl)
 
         self.upload_strategy = BlobOperations.BlobUploadStrategy()
         self.download_strategy = BlobOperations.BlobDownloadStrategy()
         self.delete_strategy = BlobOperations.BlobDeleteStrategy()
 
-    def upload_blob(self, container_name: str, blob_name: str, file_data: Union[str, BytesIO]):
+    def upload_blob(self, container_name: str, blob_name: str, file_data: Union[str, BytesIO, BinaryIO],
+                    metadata: Optional[Dict[str, str]] = None):
         container_client = self.container_manager.get_container_client(container_name)
-        self.upload_strategy.upload_blob(container_client, blob_name, file_data)
+        self.upload_strategy.upload_blob(container_client, blob_name, file_data, metadata)
 
     def download_blob(self, container_name: str, blob_name: str) -> bytes:
         container_client = self.container_manager.get_container_client(container_name)
         return self.download_strategy.download_blob(container_client, blob_name)
 
+    def get_blob_properties(self, container_name: str, blob_name: str) -> BlobProperties:
+        container_client = self.container_manager.get_container_client(container_name)
+        return self.download_strategy.get_blob_properties(container_client, blob_name)
+
+    def stream_blob(self, container_name: str, blob_name: str, offset: Optional[int] = None,
+                    length: Optional[int] = None, etag: Optional[str] = None) -> Iterator[bytes]:
+        container_client = self.container_manager.get_container_client(container_name)
+        return self.download_strategy.stream_blob(container_client, blob_name, offset=offset, length=length, etag=etag)
+
     def delete_blob(self, container_name: str, blob_name: str):
         container_client = self.container_manager.get_container_client(container_name)
         self.delete_strategy.delete_blob(container_client, blob_name)
 
+    def delete_blobs(self, container_name: str, blob_names: List[str]) -> List[BlobOperations.BlobDeleteResult]:
+        container_client = self.container_manager.get_container_client(container_name)
+        return self.delete_strategy.delete_blobs(container_client, blob_names)
+
     def set_upload_strategy(self, new_strategy: BlobOperations.IBlobUploadStrategy):
         self.upload_strategy = new_strategy
 
@@ -61,3 +75,10 @@ class AzureBlobStorageManager:
     
     def log_container_info(self) -> None:
         self.container_manager.log_container_info()
+
+    def close(self) -> None:
+        """
+        Closes the underlying BlobServiceClient and its connection pool.
+        """
+        logger.info("Closing AzureBlobStorageManager")
+        self.blob_service_client.close()
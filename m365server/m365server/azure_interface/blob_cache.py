@@ -0,0 +1,179 @@
+import time
+from typing import Dict, Optional
+
+import redis
+import redis.asyncio
+from loguru import logger
+
+from m365server.azure_interface.metrics import record_cache_lookups
+
+
+class BlobCache:
+    """
+    A Redis-backed read-through cache of blob contents keyed by container, blob name and ETag.
+
+    Entries larger than max_entry_bytes are never stored, and the least recently used entries
+    are evicted once the cache holds more than max_total_bytes. An entry also expires after
+    ttl_seconds without being read. Because the ETag is part of the key a changed blob is never
+    served stale; invalidate() additionally frees the old entries as soon as the server itself
+    writes or deletes a blob.
+
+    Redis failures are logged and treated as cache misses so that downloads keep working
+    when Redis is unavailable.
+    """
+
+    def __init__(self, redis_client: redis.asyncio.Redis, max_entry_bytes: int = 8 * 1024 * 1024,
+                 max_total_bytes: int = 256 * 1024 * 1024, ttl_seconds: int = 3600,
+                 namespace: str = "blobcache") -> None:
+        """
+        Initialize the BlobCache.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Client for a Redis connection pool that does not decode responses.
+            max_entry_bytes (int): Largest blob that is cached.
+            max_total_bytes (int): Total number of cached bytes kept before the least recently used entries are evicted.
+            ttl_seconds (int): Seconds an entry is kept after it was last read.
+            namespace (str): Prefix for every key the cache writes.
+        """
+        self.redis = redis_client
+        self.max_entry_bytes = max_entry_bytes
+        self.max_total_bytes = max_total_bytes
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._lru_key = f"{namespace}:lru"
+        self._sizes_key = f"{namespace}:sizes"
+        self._stats_key = f"{namespace}:stats"
+        self._bytes_key = f"{namespace}:bytes"
+
+    def accepts(self, size: int) -> bool:
+        """
+        Returns True if a blob of the given size is small enough to be cached.
+        """
+        return size is not None and size <= self.max_entry_bytes
+
+    def _data_key(self, container_name: str, blob_name: str, etag: str) -> str:
+        return f"{self.namespace}:data:{container_name}/{blob_name}@{etag}"
+
+    def _index_key(self, container_name: str, blob_name: str) -> str:
+        return f"{self.namespace}:index:{container_name}/{blob_name}"
+
+    async def get(self, container_name: str, blob_name: str, etag: str) -> Optional[bytes]:
+        """
+        Returns the cached bytes for the given version of a blob, or None on a miss.
+        """
+        key = self._data_key(container_name, blob_name, etag)
+        try:
+            data = await self.redis.get(key)
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if data is not None:
+                    pipe.expire(key, self.ttl_seconds)
+                    # The index must outlive the entry, or invalidate() could no longer find it.
+                    pipe.expire(self._index_key(container_name, blob_name), self.ttl_seconds)
+                    pipe.zadd(self._lru_key, {key: time.time()})
+                pipe.hincrby(self._stats_key, "hits" if data is not None else "misses", 1)
+                await pipe.execute()
+            record_cache_lookups("blob", hits=int(data is not None), misses=int(data is None))
+            return data
+        except redis.RedisError as ex:
+            logger.warning(f"Blob cache lookup failed for '{blob_name}': {ex}")
+            record_cache_lookups("blob", misses=1)
+            return None
+
+    async def put(self, container_name: str, blob_name: str, etag: str, data: bytes) -> None:
+        """
+        Stores the bytes of one version of a blob, evicting older entries if the cache is full.
+        """
+        if not self.accepts(len(data)):
+            return
+        key = self._data_key(container_name, blob_name, etag)
+        try:
+            index_key = self._index_key(container_name, blob_name)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.set(key, data, ex=self.ttl_seconds)
+                pipe.zadd(self._lru_key, {key: time.time()})
+                pipe.hset(self._sizes_key, key, len(data))
+                pipe.sadd(index_key, key)
+                pipe.expire(index_key, self.ttl_seconds)
+                added = (await pipe.execute())[2]
+            if added:
+                await self.redis.incrby(self._bytes_key, len(data))
+            await self._evict()
+        except redis.RedisError as ex:
+            logger.warning(f"Blob cache store failed for '{blob_name}': {ex}")
+
+    async def invalidate(self, container_name: str, blob_name: str) -> None:
+        """
+        Drops every cached version of a blob.
+        """
+        index_key = self._index_key(container_name, blob_name)
+        try:
+            keys = [key.decode() if isinstance(key, bytes) else key for key in await self.redis.smembers(index_key)]
+            if keys:
+                await self._remove(keys)
+            await self.redis.delete(index_key)
+            if keys:
+                logger.info(f"Invalidated {len(keys)} cached version(s) of blob '{blob_name}'")
+        except redis.RedisError as ex:
+            logger.warning(f"Blob cache invalidation failed for '{blob_name}': {ex}")
+
+    async def _evict(self) -> None:
+        """
+        Forgets entries that have expired, then evicts least recently used entries until the cache fits its budget.
+        """
+        expired = await self.redis.zrangebyscore(self._lru_key, 0, time.time() - self.ttl_seconds)
+        if expired:
+            await self._remove(expired)
+
+        total = int(await self.redis.get(self._bytes_key) or 0)
+        while total > self.max_total_bytes:
+            oldest = await self.redis.zrange(self._lru_key, 0, 15)
+            if not oldest:
+                break
+            victims = []
+            excess = total - self.max_total_bytes
+            for key, size in zip(oldest, await self.redis.hmget(self._sizes_key, oldest)):
+                victims.append(key)
+                excess -= int(size or 0)
+                if excess <= 0:
+                    break
+            total -= await self._remove(victims)
+
+    async def _remove(self, keys) -> int:
+        """
+        Deletes entries and their bookkeeping, returning the number of bytes freed.
+        """
+        sizes = await self.redis.hmget(self._sizes_key, keys)
+        freed = sum(int(size) for size in sizes if size is not None)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(*keys)
+            pipe.zrem(self._lru_key, *keys)
+            pipe.hdel(self._sizes_key, *keys)
+            pipe.decrby(self._bytes_key, freed)
+            await pipe.execute()
+        return freed
+
+    async def stats(self) -> Dict[str, float]:
+        """
+        Returns hit and miss counters shared by every worker, along with the current cache size.
+        """
+        try:
+            counters = await self.redis.hgetall(self._stats_key)
+            entries = await self.redis.hlen(self._sizes_key)
+            total = int(await self.redis.get(self._bytes_key) or 0)
+        except redis.RedisError as ex:
+            logger.warning(f"Failed to read blob cache stats: {ex}")
+            return {}
+        counters = {(k.decode() if isinstance(k, bytes) else k): int(v) for k, v in counters.items()}
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries,
+            "bytes": total,
+            "max_entry_bytes": self.max_entry_bytes,
+            "max_total_bytes": self.max_total_bytes,
+        }
+
+    async def close(self) -> None:
+        await self.redis.aclose(close_connection_pool=True)
@@ -1,8 +1,10 @@
-import os
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from azure.storage.blob import BlobServiceClient
-from azure.identity import ClientSecretCredential, AzureAuthorityHosts
 from loguru import logger
 from m365server.azure_interface.configuration import AzureBlobStorageConfig
+from m365server.azure_interface.token_provider import get_token_provider
 
 
 class BlobServiceClientFactory:
@@ -27,6 +29,9 @@ class BlobServiceClientFactory:
         """
         Creates a BlobServiceClient using service principal credentials.
 
+        Tokens come from the process-wide TokenProvider of the service principal, which caches
+        them and shares them with the other workers.
+
         Args:
             config (AzureBlobStorageConfig): The configuration for the Azure Blob Storage.
 
@@ -34,17 +39,11 @@ class BlobServiceClientFactory:
             BlobServiceClient: The client to interact with Azure Blob Storage.
         """
         logger.info("Creating client with service principal credentials")
-        authority_host = os.getenv("AZURE_AUTHORITY_HOST", AzureAuthorityHosts.AZURE_PUBLIC_CLOUD)
-        logger.info(f"Using authority host: {authority_host}")
-        credential = ClientSecretCredential(
-            tenant_id=config.service_principal_config.tenant_id,
-            client_id=config.service_principal_config.client_id,
-            client_secret=config.service_principal_config.client_secret,
-            authority=authority_host
-        )
+        credential = get_token_provider(config.service_principal_config)
+        logger.info(f"Using authority host: {credential.authority_host}")
         account_url = f"https://{config.storage_account_name}.{config.storage_account_suffix}"
         logger.info(f"Using account url: {account_url}")
-        client = BlobServiceClient(account_url=account_url, credential=credential)
+        client = BlobServiceClient(account_url=account_url, credential=credential, **BlobServiceClientFactory._client_options(config))
         logger.info("Successfully created client with service principal credentials")
         return client
     
@@ -60,5 +59,45 @@ class BlobServiceClientFactory:
             BlobServiceClient: The client to interact with Azure Blob Storage.
         """
         logger.info("Creating client with user credentials")
-        connection_string = f"DefaultEndpointsProtocol=https;AccountName={config.storage_account_name};AccountKey={config.storage_account_key};EndpointSuffix={config.storage_account_suffix}"
-        return BlobServiceClient.from_connection_string(connection_string)
+        # An explicit connection string points the client elsewhere, e.g. at the Azurite emulator.
+        connection_string = config.connection_string or f"DefaultEndpointsProtocol=https;AccountName={config.storage_account_name};AccountKey={config.storage_account_key};EndpointSuffix={config.storage_account_suffix}"
+        return BlobServiceClient.from_connection_string(connection_string, **BlobServiceClientFactory._client_options(config))
+
+    @staticmethod
+    def _client_options(config: AzureBlobStorageConfig) -> dict:
+        """
+        Returns the keyword arguments shared by every BlobServiceClient the factory creates.
+
+        Downloads are split into requests of at most config.download_chunk_size bytes,
+        which bounds the memory a streamed download holds at any time.
+        """
+        return {
+            "session": BlobServiceClientFactory._create_session(config),
+            "max_single_get_size": config.download_chunk_size,
+            "max_chunk_get_size": config.download_chunk_size,
+        }
+
+    @staticmethod
+    def _create_session(config: AzureBlobStorageConfig) -> requests.Session:
+        """
+        Creates the HTTP session shared by every request the client makes.
+
+        The session keeps up to config.connection_pool_size connections alive per host,
+        so a long-lived client reuses them instead of opening a new TLS connection per call.
+        Retries are left to the Azure SDK retry policy.
+
+        Args:
+            config (AzureBlobStorageConfig): The configuration for the Azure Blob Storage.
+
+        Returns:
+            requests.Session: The pooled session.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.connection_pool_size,
+            pool_maxsize=config.connection_pool_size,
+            max_retries=Retry(total=False, redirect=False, raise_on_status=False)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
@@ -1,11 +1,32 @@
+import asyncio
 from io import BytesIO
-from typing import Dict, Optional, Union
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
 
-import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+import pyarrow.json
+import pyarrow.parquet as pq
 from azure.storage.blob import BlobProperties, ContainerClient
 
 from loguru import logger
 
+if TYPE_CHECKING:
+    import pandas as pd
+    from m365server.azure_interface.derived_parquet import DerivedParquetStore
+
+# Arrow readers for the pandas loaders they can replace. Each is multithreaded and reads from
+# a buffer that wraps the blob's bytes, so the data is never copied before decoding.
+ARROW_READERS: Dict[str, Callable[[pa.BufferReader], pa.Table]] = {
+    'read_csv': lambda source: pyarrow.csv.read_csv(source, read_options=pyarrow.csv.ReadOptions(use_threads=True)),
+    'read_json': lambda source: pyarrow.json.read_json(source, read_options=pyarrow.json.ReadOptions(use_threads=True)),
+    'read_parquet': lambda source: pq.read_table(source, use_threads=True),
+}
+
+ENGINES = ('pandas', 'arrow')
+
+# Content type the parquet reader is mapped to.
+PARQUET_CONTENT_TYPE = 'application/octet-stream'
+
 class BlobDataLoader:
     """
     A class for loading blob data from an Azure Blob Storage container.
@@ -33,17 +54,60 @@ class BlobDataLoader:
         return content_type_mapping.get(content_type)
 
     @staticmethod
-    def load_blob_to_dataframe(blob_data: bytes, content_type: str) -> Union[pd.DataFrame, Dict[str, pd.DataFrame]]:
+    def load_blob_to_table(blob_data: bytes, content_type: str) -> Optional[pa.Table]:
+        """
+        Loads the content of a blob into an Arrow table using pyarrow's multithreaded readers.
+
+        CSV, JSON and parquet are supported; JSON must be newline-delimited. The content type is
+        resolved through the same mapping as the pandas loaders.
+
+        Args:
+            blob_data (bytes): The data from the blob.
+            content_type (str): The content type of the blob.
+
+        Returns:
+            Optional[pa.Table]: The blob data as a table, or None if the content type has no Arrow reader or the data cannot be read.
+        """
+        loader = BlobDataLoader.get_pandas_loader(content_type)
+        reader = ARROW_READERS.get(loader)
+        if reader is None:
+            logger.info(f"No arrow reader for content type: {content_type}")
+            return None
+        try:
+            table = reader(pa.BufferReader(pa.py_buffer(blob_data)))
+            logger.info(f"Loaded {table.num_rows} rows x {table.num_columns} columns with {loader} (arrow)")
+            return table
+        except Exception as ex:
+            # Not an error: the callers fall back to the pandas readers, which log one if they fail too.
+            logger.info(f"Arrow reader cannot load blob, leaving it to pandas - {str(ex)}")
+            return None
+
+    @staticmethod
+    def load_blob_to_dataframe(blob_data: bytes, content_type: str,
+                               engine: str = 'pandas') -> Union["pd.DataFrame", Dict[str, "pd.DataFrame"]]:
         """
         Loads the content of a blob into a pandas DataFrame.
 
         Args:
             blob_data (bytes): The data from the blob.
             content_type (str): The content type of the blob.
+            engine (str): 'pandas' to use the pandas readers, or 'arrow' to decode with load_blob_to_table and
+                convert without copying into ArrowDtype columns. The arrow engine falls back to pandas for
+                content types it cannot read.
 
         Returns:
             Union[pd.DataFrame, Dict[str, pd.DataFrame]]: The blob data loaded into a DataFrame. If the blob contains multiple sheets (as in an Excel file), returns a dictionary where keys are sheet names and values are DataFrames.
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+        # pandas takes about half a second to import and only the conversion paths need it.
+        import pandas as pd
+        if engine == 'arrow':
+            table = BlobDataLoader.load_blob_to_table(blob_data, content_type)
+            if table is not None:
+                return table.to_pandas(types_mapper=pd.ArrowDtype)
+            logger.info("Falling back to the pandas engine")
+
         try:
             loader = BlobDataLoader.get_pandas_loader(content_type)
             logger.info(f"Content type: {content_type}")
@@ -56,16 +120,45 @@ class BlobDataLoader:
                 #     data = data.getvalue().decode('utf-8')
                 if loader == 'read_excel':
                     df = pd.read_excel(data, sheet_name=None)
-                    logger.info(f"Loaded Excel data: {df}")
+                    logger.info(f"Loaded Excel data with sheets: {list(df)}")
                     return df
                 else:
                     df = getattr(pd, loader)(data)
-                    logger.info(f"Loaded data: {df}")
+                    logger.info(f"Loaded data with shape: {getattr(df, 'shape', len(df))}")
                     return df
         except Exception as ex:
             logger.error(f"Failed to load blob to DataFrame - {str(ex)}")
             return None
 
+    @staticmethod
+    async def load_blob(storage_manager: Any, container_name: str, blob_name: str, engine: str = 'pandas',
+                        derived_store: Optional["DerivedParquetStore"] = None) -> Union["pd.DataFrame", Dict[str, "pd.DataFrame"]]:
+        """
+        Downloads a blob through an async storage manager and loads it into a pandas DataFrame.
+
+        CSV, JSON and Excel blobs are read from their derived parquet copy, which is created on the first load, so
+        they are parsed once per version rather than on every load.
+
+        Args:
+            storage_manager (Any): The async storage manager holding the blob.
+            container_name (str): The name of the container where the blob is located.
+            blob_name (str): The name of the blob to load.
+            engine (str): The engine, as for load_blob_to_dataframe.
+            derived_store (Optional[DerivedParquetStore]): The store of parquet copies; defaults to the manager's.
+                Without one the blob itself is parsed.
+
+        Returns:
+            Union[pd.DataFrame, Dict[str, pd.DataFrame]]: The blob data, as returned by load_blob_to_dataframe.
+        """
+        if derived_store is None:
+            derived_store = storage_manager.derived_parquet_store
+        properties = await storage_manager.get_blob_properties(container_name, blob_name)
+        if derived_store is not None:
+            properties = await derived_store.get_parquet_blob(container_name, blob_name, properties)
+        blob_data = await storage_manager.download_blob(container_name, properties.name, properties)
+        content_type = properties.content_settings.content_type if properties.name == blob_name else PARQUET_CONTENT_TYPE
+        return await asyncio.to_thread(BlobDataLoader.load_blob_to_dataframe, blob_data, content_type, engine)
+
     @staticmethod
     def load_blob_content(container_client: ContainerClient, blob_name: str) -> bytes:
         """
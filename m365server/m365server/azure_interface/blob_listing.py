@@ -0,0 +1,41 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class BlobEntry:
+    """
+    The subset of blob properties returned by listings.
+    """
+    name: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @classmethod
+    def from_properties(cls, properties: Any) -> "BlobEntry":
+        last_modified = getattr(properties, "last_modified", None)
+        return cls(
+            name=properties.name,
+            size=getattr(properties, "size", None),
+            etag=getattr(properties, "etag", None),
+            last_modified=last_modified.isoformat() if last_modified else None
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BlobListingPage:
+    """
+    One page of a container listing.
+
+    Attributes:
+        blobs (List[BlobEntry]): The blobs on this page.
+        prefixes (List[str]): Virtual directories on this page, when the listing used a delimiter.
+        continuation_token (Optional[str]): Token for the next page, or None if this is the last page.
+    """
+    blobs: List[BlobEntry] = field(default_factory=list)
+    prefixes: List[str] = field(default_factory=list)
+    continuation_token: Optional[str] = None
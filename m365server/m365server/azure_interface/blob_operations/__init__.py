@@ -1,4 +1,5 @@
-from m365server.azure_interface.blob_operations.interfaces import IBlobUploadStrategy, IBlobDownloadStrategy, IBlobDeleteStrategy
+from m365server.azure_interface.blob_operations.interfaces import IBlobUploadStrategy, IBlobDownloadStrategy, IBlobDeleteStrategy, BlobDeleteResult
 from m365server.azure_interface.blob_operations.upload import BlobUploadStrategy
 from m365server.azure_interface.blob_operations.delete import BlobDeleteStrategy
-from m365server.azure_interface.blob_operations.download import BlobDownloadStrategy
\ No newline at end of file
+from m365server.azure_interface.blob_operations.download import BlobDownloadStrategy
+from m365server.azure_interface.blob_operations.block_upload import BlobBlockUploadStrategy
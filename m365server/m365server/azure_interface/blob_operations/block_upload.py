@@ -0,0 +1,116 @@
+import base64
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Dict, List, Optional, Union
+from io import BytesIO
+
+import azure
+from azure.storage.blob import BlobBlock, BlobClient, ContainerClient
+from loguru import logger
+
+from m365server.azure_interface.blob_operations import IBlobUploadStrategy
+from m365server.azure_interface.metrics import BYTES_UPLOADED, azure_call
+
+
+class BlobBlockUploadStrategy(IBlobUploadStrategy):
+    """
+    Uploads a stream as a block blob, reading it in fixed-size blocks and staging them concurrently.
+
+    At most max_concurrency blocks are held in memory at once, so peak memory per upload
+    is bounded by block_size * max_concurrency regardless of the size of the stream.
+    """
+
+    def __init__(self, block_size: int = 8 * 1024 * 1024, max_concurrency: int = 4) -> None:
+        """
+        Initialize the BlobBlockUploadStrategy.
+
+        Args:
+            block_size (int): Number of bytes read from the stream and staged per block.
+            max_concurrency (int): Maximum number of blocks staged in parallel.
+        """
+        if block_size <= 0 or max_concurrency <= 0:
+            raise ValueError("block_size and max_concurrency must be positive")
+        self.block_size = block_size
+        self.max_concurrency = max_concurrency
+
+    def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO, BinaryIO],
+                    metadata: Optional[Dict[str, str]] = None):
+        logger.info(f"Uploading data to blob '{blob_name}' in blocks of {self.block_size} bytes")
+        try:
+            blob_client = container_client.get_blob_client(blob_name)
+            if isinstance(file_data, str):
+                logger.info(f"Detected file data as string, attempting to open file at path: {file_data}")
+                with open(file_data, "rb") as file:
+                    block_count = self._upload_stream(blob_client, file, metadata)
+            elif hasattr(file_data, "read"):
+                block_count = self._upload_stream(blob_client, file_data, metadata)
+            else:
+                logger.error(f"Unsupported data type for file_data: {type(file_data).__name__}")
+                return
+
+            logger.info(f"Successfully uploaded data to blob '{blob_name}' in {block_count} block(s)")
+        except azure.core.exceptions.HttpResponseError as e:
+            logger.error(f"HTTP error during blob upload: {e}")
+            raise
+        except azure.core.exceptions.AzureError as e:
+            logger.error(f"Azure error during blob upload: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error during blob upload: {e}")
+            raise
+
+    def _upload_stream(self, blob_client: BlobClient, stream: BinaryIO, metadata: Optional[Dict[str, str]] = None) -> int:
+        first_block = stream.read(self.block_size)
+        if len(first_block) < self.block_size:
+            # Small enough for a single Put Blob request.
+            with azure_call("upload"):
+                blob_client.upload_blob(first_block, overwrite=True, metadata=metadata)
+            BYTES_UPLOADED.inc(len(first_block))
+            return 1
+
+        # A per-upload prefix keeps concurrent uploads of the same blob from sharing block ids.
+        upload_id = uuid.uuid4().hex
+        block_list: List[BlobBlock] = []
+        futures: List[Future] = []
+        errors: List[BaseException] = []
+        slots = threading.BoundedSemaphore(self.max_concurrency)
+
+        def on_staged(future: Future) -> None:
+            if future.exception() is not None:
+                errors.append(future.exception())
+            slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="blob-block-upload") as executor:
+            block = first_block
+            slots.acquire()
+            while block and not errors:
+                block_id = self._block_id(upload_id, len(block_list))
+                block_list.append(BlobBlock(block_id=block_id))
+                future = executor.submit(self._stage_block, blob_client, block_id, block)
+                future.add_done_callback(on_staged)
+                futures.append(future)
+                del block
+
+                # Wait for a free slot before reading the next block so that at most
+                # max_concurrency blocks are in memory.
+                slots.acquire()
+                block = stream.read(self.block_size) if not errors else b""
+            slots.release()
+
+            for future in futures:
+                future.result()
+
+        with azure_call("commit_block_list"):
+            blob_client.commit_block_list(block_list, metadata=metadata)
+        return len(block_list)
+
+    @staticmethod
+    @azure_call("stage_block")
+    def _stage_block(blob_client: BlobClient, block_id: str, block: bytes) -> None:
+        blob_client.stage_block(block_id, block)
+        BYTES_UPLOADED.inc(len(block))
+
+    @staticmethod
+    def _block_id(upload_id: str, index: int) -> str:
+        return base64.b64encode(f"{upload_id}-{index:08d}".encode()).decode()
@@ -1,10 +1,42 @@
-from m365server.azure_interface.blob_operations import IBlobDeleteStrategy
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from m365server.azure_interface.blob_operations.interfaces import BlobDeleteResult, IBlobDeleteStrategy
+from m365server.azure_interface.metrics import azure_call
 from azure.storage.blob import ContainerClient
 from azure.core.exceptions import ResourceNotFoundError
 
 from loguru import logger
 
+# The Blob Batch API accepts at most 256 sub-requests per batch.
+MAX_BATCH_SIZE = 256
+
+def _batch_results(blob_names: List[str], responses) -> List[BlobDeleteResult]:
+    """
+    Pairs each sub-response of a blob batch with the blob it deleted; sub-responses come back in request order.
+    """
+    results = []
+    for blob_name, response in zip(blob_names, responses):
+        error = None if 200 <= response.status_code < 300 else (response.reason or f"HTTP {response.status_code}")
+        results.append(BlobDeleteResult(blob_name, response.status_code, error))
+    return results
+
+def _chunks(blob_names: List[str], size: int) -> List[List[str]]:
+    return [blob_names[start:start + size] for start in range(0, len(blob_names), size)]
+
 class BlobDeleteStrategy(IBlobDeleteStrategy):
+    def __init__(self, batch_size: int = MAX_BATCH_SIZE, max_concurrency: int = 4) -> None:
+        """
+        Initialize the BlobDeleteStrategy.
+
+        Args:
+            batch_size (int): Number of blobs deleted per batch request, at most 256.
+            max_concurrency (int): Maximum number of batch requests in flight at the same time.
+        """
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.max_concurrency = max_concurrency
+
+    @azure_call("delete")
     def delete_blob(self, container_client: ContainerClient, blob_name: str):
         logger.info(f'Deleting blob "{blob_name}"')
         try:
@@ -13,3 +45,34 @@ class BlobDeleteStrategy(IBlobDeleteStrategy):
         except Exception as ex:
             logger.error(f"Failed to delete blob '{blob_name}': {ex}")
             raise
+
+    def _delete_batch(self, container_client: ContainerClient, blob_names: List[str]) -> List[BlobDeleteResult]:
+        try:
+            with azure_call("delete_batch"):
+                responses = container_client.delete_blobs(*blob_names, raise_on_any_failure=False)
+            return _batch_results(blob_names, responses)
+        except Exception as ex:
+            logger.error(f"Failed to delete batch of {len(blob_names)} blob(s): {ex}")
+            status_code = getattr(ex, "status_code", None) or 500
+            return [BlobDeleteResult(blob_name, status_code, str(ex)) for blob_name in blob_names]
+
+    def delete_blobs(self, container_client: ContainerClient, blob_names: List[str]) -> List[BlobDeleteResult]:
+        """
+        Deletes blobs with the Blob Batch API, sending up to max_concurrency batches at a time.
+
+        Failures are reported per blob rather than raised.
+
+        Args:
+            container_client (ContainerClient): The container holding the blobs.
+            blob_names (List[str]): The blobs to delete.
+
+        Returns:
+            List[BlobDeleteResult]: One result per blob, in the order given.
+        """
+        logger.info(f"Deleting {len(blob_names)} blob(s) in batches of {self.batch_size}")
+        batches = _chunks(blob_names, self.batch_size)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            results = [result for batch in executor.map(lambda names: self._delete_batch(container_client, names), batches)
+                       for result in batch]
+        logger.info(f"Deleted {sum(result.deleted for result in results)} of {len(blob_names)} blob(s)")
+        return results
@@ -1,12 +1,16 @@
 from m365server.azure_interface.blob_operations import IBlobDownloadStrategy
-from azure.storage.blob import ContainerClient
+from azure.storage.blob import BlobProperties, ContainerClient
+from azure.core import MatchConditions
 from azure.core.exceptions import ResourceNotFoundError
-from typing import Union
+from typing import Iterator, Optional, Union
 from io import BytesIO
 from loguru import logger
 
+from m365server.azure_interface.metrics import BYTES_DOWNLOADED, azure_call
+
 
 class BlobDownloadStrategy(IBlobDownloadStrategy):
+    @azure_call("download")
     def download_blob(self, container_client: ContainerClient, blob_name: str) -> bytes:
         if not container_client or not blob_name:
             logger.error("Invalid input arguments for blob download")
@@ -21,6 +25,7 @@ class BlobDownloadStrategy(IBlobDownloadStrategy):
 
             logger.info(f"Downloading blob '{blob_name}' of size {content_length} bytes and content type '{content_type}'")
             downloaded_data = blob_data.content_as_bytes()
+            BYTES_DOWNLOADED.inc(len(downloaded_data))
             logger.info(f"Successfully downloaded blob '{blob_name}' with size {len(downloaded_data)} bytes")
 
             return downloaded_data
@@ -29,4 +34,46 @@ class BlobDownloadStrategy(IBlobDownloadStrategy):
             raise
         except Exception as e:
             logger.error(f"Failed to download blob '{blob_name}': {e}")
-            raise
\ No newline at end of file
+            raise
+
+    @azure_call("get_properties")
+    def get_blob_properties(self, container_client: ContainerClient, blob_name: str) -> BlobProperties:
+        if not container_client or not blob_name:
+            logger.error("Invalid input arguments for blob properties")
+            raise ValueError("Invalid input arguments for blob properties")
+
+        try:
+            return container_client.get_blob_client(blob_name).get_blob_properties()
+        except ResourceNotFoundError as e:
+            logger.error(f"Blob '{blob_name}' not found in container: {e}")
+            raise
+
+    @azure_call("stream")
+    def stream_blob(self, container_client: ContainerClient, blob_name: str,
+                    offset: Optional[int] = None, length: Optional[int] = None,
+                    etag: Optional[str] = None) -> Iterator[bytes]:
+        """
+        Streams a blob, or a byte range of it, in chunks of the client's max_chunk_get_size.
+
+        Only one chunk is held in memory at a time. When etag is given the download fails
+        if the blob changes, so a response never mixes bytes from two versions of the blob.
+        """
+        if not container_client or not blob_name:
+            logger.error("Invalid input arguments for blob download")
+            raise ValueError("Invalid input arguments for blob download")
+
+        logger.info(f"Streaming blob '{blob_name}' (offset={offset}, length={length})")
+        condition = {"etag": etag, "match_condition": MatchConditions.IfNotModified} if etag else {}
+        try:
+            downloader = container_client.get_blob_client(blob_name).download_blob(
+                offset=offset, length=length, max_concurrency=1, **condition
+            )
+            for chunk in downloader.chunks():
+                BYTES_DOWNLOADED.inc(len(chunk))
+                yield chunk
+        except ResourceNotFoundError as e:
+            logger.error(f"Blob '{blob_name}' not found in container: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to stream blob '{blob_name}': {e}")
+            raise
@@ -1,12 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Union
 from io import BytesIO
 
-from azure.storage.blob import ContainerClient
+from azure.storage.blob import BlobProperties, ContainerClient
 
 class IBlobUploadStrategy(ABC):
     @abstractmethod
-    def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO]):
+    def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO],
+                    metadata: Optional[Dict[str, str]] = None):
         pass
 
 class IBlobDownloadStrategy(ABC):
@@ -14,7 +16,37 @@ class IBlobDownloadStrategy(ABC):
     def download_blob(self, container_client: ContainerClient, blob_name: str) -> bytes:
         pass
 
+    @abstractmethod
+    def get_blob_properties(self, container_client: ContainerClient, blob_name: str) -> BlobProperties:
+        pass
+
+    @abstractmethod
+    def stream_blob(self, container_client: ContainerClient, blob_name: str,
+                    offset: Optional[int] = None, length: Optional[int] = None,
+                    etag: Optional[str] = None) -> Iterator[bytes]:
+        pass
+
+@dataclass
+class BlobDeleteResult:
+    """
+    The outcome of deleting one blob in a batch.
+    """
+    blob_name: str
+    status_code: int
+    error: Optional[str] = None
+
+    @property
+    def deleted(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "deleted": self.deleted}
+
 class IBlobDeleteStrategy(ABC):
     @abstractmethod
     def delete_blob(self, container_client: ContainerClient, blob_name: str):
         pass
+
+    @abstractmethod
+    def delete_blobs(self, container_client: ContainerClient, blob_names: List[str]) -> List[BlobDeleteResult]:
+        pass
@@ -1,21 +1,28 @@
 from m365server.azure_interface.blob_operations import IBlobUploadStrategy
 import azure
 from azure.storage.blob import ContainerClient
-from typing import Union
+from typing import Dict, Optional, Union
 from io import BytesIO
+import os
 from loguru import logger
 
+from m365server.azure_interface.metrics import BYTES_UPLOADED, azure_call
+
 class BlobUploadStrategy(IBlobUploadStrategy):
-    def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO]):
+    @azure_call("upload")
+    def upload_blob(self, container_client: ContainerClient, blob_name: str, file_data: Union[str, BytesIO],
+                    metadata: Optional[Dict[str, str]] = None):
         logger.info(f"Uploading data to blob '{blob_name}'")
         try:
             if isinstance(file_data, str):
                 logger.info(f"Detected file data as string, attempting to open file at path: {file_data}")
                 with open(file_data, "rb") as file:
-                    container_client.upload_blob(name=blob_name, data=file, overwrite=True)
+                    container_client.upload_blob(name=blob_name, data=file, overwrite=True, metadata=metadata)
+                BYTES_UPLOADED.inc(os.path.getsize(file_data))
             elif isinstance(file_data, BytesIO):
                 logger.info(f"Detected file data as BytesIO, uploading directly.")
-                container_client.upload_blob(name=blob_name, data=file_data.getvalue(), overwrite=True)
+                container_client.upload_blob(name=blob_name, data=file_data.getvalue(), overwrite=True, metadata=metadata)
+                BYTES_UPLOADED.inc(file_data.getbuffer().nbytes)
             else:
                 logger.error(f"Unsupported data type for file_data: {type(file_data).__name__}")
                 return
@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, Optional
 from dataclasses import dataclass, field
 from loguru import logger 
 @dataclass
@@ -14,6 +14,13 @@ class AzureBlobStorageConfig:
     storage_account_name: str
     storage_account_suffix: str = "core.windows.net"
     service_principal_config: Optional[ServicePrincipalConfig] = field(default=None)
+    container_cache_ttl: float = 300.0
+    connection_pool_size: int = 100
+    download_chunk_size: int = 4 * 1024 * 1024
+    upload_block_size: int = 8 * 1024 * 1024
+    upload_max_concurrency: int = 4
+    delete_max_concurrency: int = 4
+    connection_string: Optional[str] = None
 
     def should_use_service_principal(self) -> bool:
         """
@@ -28,6 +35,13 @@ def get_default_config() -> AzureBlobStorageConfig:
     storage_account_key: str = os.getenv("STORAGE_ACCOUNT_KEY")
     storage_account_name: str = os.getenv("STORAGE_ACCOUNT_NAME")
     azure_suffix: str = os.getenv('AZURE_ENDPOINT_SUFFIX')
+    container_cache_ttl: float = float(os.getenv("CONTAINER_CACHE_TTL_SECONDS", "300"))
+    connection_pool_size: int = int(os.getenv("AZURE_CONNECTION_POOL_SIZE", "100"))
+    download_chunk_size: int = int(os.getenv("DOWNLOAD_CHUNK_SIZE_BYTES", str(4 * 1024 * 1024)))
+    upload_block_size: int = int(os.getenv("UPLOAD_BLOCK_SIZE_BYTES", str(8 * 1024 * 1024)))
+    upload_max_concurrency: int = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "4"))
+    delete_max_concurrency: int = int(os.getenv("DELETE_MAX_CONCURRENCY", "4"))
+    connection_string: Optional[str] = os.getenv("AZURE_STORAGE_CONNECTION_STRING") or None
 
     # Check if service principal environment variables are set
     if all([os.getenv("AZURE_CLIENT_ID"), os.getenv("AZURE_CLIENT_SECRET"), os.getenv("AZURE_TENANT_ID")]):
@@ -42,12 +56,249 @@ def get_default_config() -> AzureBlobStorageConfig:
             storage_account_key=storage_account_key,
             storage_account_name=storage_account_name,
             storage_account_suffix=azure_suffix,
-            service_principal_config=service_principal_config
+            service_principal_config=service_principal_config,
+            container_cache_ttl=container_cache_ttl,
+            connection_pool_size=connection_pool_size,
+            download_chunk_size=download_chunk_size,
+            upload_block_size=upload_block_size,
+            upload_max_concurrency=upload_max_concurrency,
+            delete_max_concurrency=delete_max_concurrency,
+            connection_string=connection_string
         )
     else:
         logger.info("Using storage account key for authentication")
         return AzureBlobStorageConfig(
             storage_account_key=storage_account_key,
             storage_account_name=storage_account_name,
-            storage_account_suffix=azure_suffix
+            storage_account_suffix=azure_suffix,
+            container_cache_ttl=container_cache_ttl,
+            connection_pool_size=connection_pool_size,
+            download_chunk_size=download_chunk_size,
+            upload_block_size=upload_block_size,
+            upload_max_concurrency=upload_max_concurrency,
+            delete_max_concurrency=delete_max_concurrency,
+            connection_string=connection_string
         )
+
+@dataclass
+class BlobCacheConfig:
+    enabled: bool = True
+    max_entry_bytes: int = 8 * 1024 * 1024
+    max_total_bytes: int = 256 * 1024 * 1024
+    ttl_seconds: int = 3600
+
+def get_blob_cache_config() -> BlobCacheConfig:
+    return BlobCacheConfig(
+        enabled=os.getenv("BLOB_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        max_entry_bytes=int(os.getenv("BLOB_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024))),
+        max_total_bytes=int(os.getenv("BLOB_CACHE_MAX_TOTAL_BYTES", str(256 * 1024 * 1024))),
+        ttl_seconds=int(os.getenv("BLOB_CACHE_TTL_SECONDS", "3600"))
+    )
+
+@dataclass
+class DiskCacheConfig:
+    enabled: bool = False
+    directory: str = "/var/cache/m365server/blobs"
+    max_total_bytes: int = 10 * 1024 * 1024 * 1024
+    min_entry_bytes: int = 8 * 1024 * 1024
+    max_entry_bytes: Optional[int] = None
+
+def get_disk_cache_config() -> DiskCacheConfig:
+    max_entry_bytes = os.getenv("DISK_CACHE_MAX_ENTRY_BYTES")
+    return DiskCacheConfig(
+        enabled=os.getenv("DISK_CACHE_ENABLED", "false").lower() in ("1", "true", "yes"),
+        directory=os.getenv("DISK_CACHE_DIR", "/var/cache/m365server/blobs"),
+        max_total_bytes=int(os.getenv("DISK_CACHE_MAX_TOTAL_BYTES", str(10 * 1024 * 1024 * 1024))),
+        min_entry_bytes=int(os.getenv("DISK_CACHE_MIN_ENTRY_BYTES", str(8 * 1024 * 1024))),
+        max_entry_bytes=int(max_entry_bytes) if max_entry_bytes else None
+    )
+
+@dataclass
+class SingleFlightConfig:
+    enabled: bool = True
+
+def get_single_flight_config() -> SingleFlightConfig:
+    return SingleFlightConfig(
+        enabled=os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+    )
+
+@dataclass
+class TokenCacheConfig:
+    shared_cache_enabled: bool = True
+    refresh_before_seconds: float = 300.0
+    refresh_lock_seconds: float = 10.0
+
+def get_token_cache_config() -> TokenCacheConfig:
+    return TokenCacheConfig(
+        shared_cache_enabled=os.getenv("TOKEN_SHARED_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        refresh_before_seconds=float(os.getenv("TOKEN_REFRESH_BEFORE_SECONDS", "300")),
+        refresh_lock_seconds=float(os.getenv("TOKEN_REFRESH_LOCK_SECONDS", "10"))
+    )
+
+@dataclass
+class AdmissionConfig:
+    enabled: bool = True
+    max_inflight_bytes: int = 512 * 1024 * 1024
+    max_transfer_bytes: int = 32 * 1024 * 1024
+    max_per_container: Optional[int] = 32
+    max_wait_seconds: float = 5.0
+    max_queue: int = 256
+    retry_after_seconds: float = 1.0
+
+def get_admission_config() -> AdmissionConfig:
+    max_per_container = int(os.getenv("ADMISSION_MAX_PER_CONTAINER", "32"))
+    return AdmissionConfig(
+        enabled=os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes"),
+        max_inflight_bytes=int(os.getenv("ADMISSION_MAX_INFLIGHT_BYTES", str(512 * 1024 * 1024))),
+        max_transfer_bytes=int(os.getenv("ADMISSION_MAX_TRANSFER_BYTES", str(32 * 1024 * 1024))),
+        max_per_container=max_per_container if max_per_container > 0 else None,
+        max_wait_seconds=float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "5")),
+        max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "256")),
+        retry_after_seconds=float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+    )
+
+@dataclass
+class ResilienceConfig:
+    enabled: bool = True
+    max_attempts: int = 4
+    backoff_base_seconds: float = 0.1
+    backoff_max_seconds: float = 5.0
+    properties_timeout_seconds: float = 10.0
+    download_timeout_seconds: float = 120.0
+    stream_timeout_seconds: float = 30.0
+    list_timeout_seconds: float = 30.0
+    hedge_enabled: bool = False
+    hedge_after_seconds: float = 0.5
+
+    def timeouts(self) -> Dict[str, float]:
+        """
+        Returns the timeout of every operation the ResiliencePolicy applies one to.
+        """
+        return {
+            "get_properties": self.properties_timeout_seconds,
+            "download": self.download_timeout_seconds,
+            "stream": self.stream_timeout_seconds,
+            "list_blobs_page": self.list_timeout_seconds,
+            "list_containers": self.list_timeout_seconds,
+        }
+
+def get_resilience_config() -> ResilienceConfig:
+    return ResilienceConfig(
+        enabled=os.getenv("RESILIENCE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        max_attempts=int(os.getenv("RESILIENCE_MAX_ATTEMPTS", "4")),
+        backoff_base_seconds=float(os.getenv("RESILIENCE_BACKOFF_BASE_SECONDS", "0.1")),
+        backoff_max_seconds=float(os.getenv("RESILIENCE_BACKOFF_MAX_SECONDS", "5")),
+        properties_timeout_seconds=float(os.getenv("RESILIENCE_PROPERTIES_TIMEOUT_SECONDS", "10")),
+        download_timeout_seconds=float(os.getenv("RESILIENCE_DOWNLOAD_TIMEOUT_SECONDS", "120")),
+        stream_timeout_seconds=float(os.getenv("RESILIENCE_STREAM_TIMEOUT_SECONDS", "30")),
+        list_timeout_seconds=float(os.getenv("RESILIENCE_LIST_TIMEOUT_SECONDS", "30")),
+        hedge_enabled=os.getenv("RESILIENCE_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+        hedge_after_seconds=float(os.getenv("RESILIENCE_HEDGE_AFTER_SECONDS", "0.5"))
+    )
+
+@dataclass
+class ContainerStatsConfig:
+    ttl_seconds: float = 300.0
+    scan_concurrency: int = 8
+
+def get_container_stats_config() -> ContainerStatsConfig:
+    return ContainerStatsConfig(
+        ttl_seconds=float(os.getenv("CONTAINER_STATS_TTL_SECONDS", "300")),
+        scan_concurrency=int(os.getenv("CONTAINER_STATS_SCAN_CONCURRENCY", "8"))
+    )
+
+@dataclass
+class BatchDownloadConfig:
+    max_blobs: int = 1000
+    max_concurrency: int = 16
+    stream_threshold_bytes: int = 8 * 1024 * 1024
+
+def get_batch_download_config() -> BatchDownloadConfig:
+    return BatchDownloadConfig(
+        max_blobs=int(os.getenv("BATCH_DOWNLOAD_MAX_BLOBS", "1000")),
+        max_concurrency=int(os.getenv("BATCH_DOWNLOAD_CONCURRENCY", "16")),
+        stream_threshold_bytes=int(os.getenv("BATCH_DOWNLOAD_STREAM_THRESHOLD_BYTES", str(8 * 1024 * 1024)))
+    )
+
+@dataclass
+class DerivedParquetConfig:
+    enabled: bool = True
+    prefix: str = "_derived/"
+
+def get_derived_parquet_config() -> DerivedParquetConfig:
+    return DerivedParquetConfig(
+        enabled=os.getenv("DERIVED_PARQUET_ENABLED", "true").lower() in ("1", "true", "yes"),
+        prefix=os.getenv("DERIVED_PARQUET_PREFIX", "_derived/")
+    )
+
+@dataclass
+class ParquetMetadataConfig:
+    cache_enabled: bool = True
+    cache_ttl_seconds: int = 86400
+    max_concurrency: int = 16
+
+def get_parquet_metadata_config() -> ParquetMetadataConfig:
+    return ParquetMetadataConfig(
+        cache_enabled=os.getenv("PARQUET_METADATA_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        cache_ttl_seconds=int(os.getenv("PARQUET_METADATA_CACHE_TTL_SECONDS", "86400")),
+        max_concurrency=int(os.getenv("PARQUET_METADATA_CONCURRENCY", "16"))
+    )
+
+@dataclass
+class CompressionConfig:
+    enabled: bool = True
+    min_size: int = 1024
+    gzip_level: int = 6
+    zstd_level: int = 3
+
+def get_compression_config() -> CompressionConfig:
+    return CompressionConfig(
+        enabled=os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes"),
+        min_size=int(os.getenv("COMPRESSION_MIN_SIZE_BYTES", "1024")),
+        gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        zstd_level=int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    )
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = True
+
+def get_metrics_config() -> MetricsConfig:
+    return MetricsConfig(
+        enabled=os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    )
+
+@dataclass
+class ProfilingConfig:
+    enabled: bool = False
+    header: str = "X-M365-Profile"
+    token: Optional[str] = None
+    directory: Optional[str] = None
+    sample_interval: float = 0.001
+
+def get_profiling_config() -> ProfilingConfig:
+    return ProfilingConfig(
+        enabled=os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes"),
+        header=os.getenv("PROFILING_HEADER", "X-M365-Profile"),
+        token=os.getenv("PROFILING_TOKEN") or None,
+        directory=os.getenv("PROFILING_DIR") or None,
+        sample_interval=float(os.getenv("PROFILING_SAMPLE_INTERVAL_SECONDS", "0.001"))
+    )
+
+@dataclass
+class StorageBackendConfig:
+    backend: str = "azure"
+    local_root: Optional[str] = None
+
+def get_storage_backend_config() -> StorageBackendConfig:
+    """
+    Reads which storage the server runs against: "azure" (the default), or the local
+    "memory" or "filesystem" backends used for development and load testing.
+    """
+    backend = os.getenv("STORAGE_BACKEND", "azure").lower()
+    if backend not in ("azure", "memory", "filesystem"):
+        raise ValueError(f"Unknown STORAGE_BACKEND '{backend}', expected azure, memory or filesystem")
+    local_root = os.getenv("LOCAL_STORAGE_ROOT") or None
+    if backend == "filesystem" and local_root is None:
+        raise ValueError("STORAGE_BACKEND=filesystem requires LOCAL_STORAGE_ROOT")
+    return StorageBackendConfig(backend=backend, local_root=local_root)
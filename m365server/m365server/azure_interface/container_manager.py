@@ -3,18 +3,25 @@ from azure.storage.blob import BlobServiceClient, ContainerClient
 from azure.core.exceptions import ResourceNotFoundError
 from loguru import logger
 
+from m365server.azure_interface.metrics import azure_call
+from m365server.azure_interface.ttl_cache import TTLCache
+
 class ContainerManager:
-    def __init__(self, blob_service_client: BlobServiceClient):
-        try:
-            self.blob_service_client = blob_service_client
-            self.container_clients = {
-                container.name: blob_service_client.get_container_client(container.name) 
-                for container in self.blob_service_client.list_containers()
-            }
-        except Exception as e:
-            logger.error(f"Failed to initialize ContainerManager: {e}")
-            raise
-        
+    def __init__(self, blob_service_client: BlobServiceClient, cache_ttl: float = 300.0):
+        """
+        Initialize the ContainerManager.
+
+        Container clients are created on first use and cached for cache_ttl seconds,
+        so no request to the storage account is made until a container is needed.
+
+        Args:
+            blob_service_client (BlobServiceClient): The shared client for the storage account.
+            cache_ttl (float): Number of seconds container clients and the container listing are cached.
+        """
+        self.blob_service_client = blob_service_client
+        self.container_clients: TTLCache[ContainerClient] = TTLCache(cache_ttl)
+        self._container_names: TTLCache[List[str]] = TTLCache(cache_ttl)
+
     def get_container_client(self, container_name: str) -> ContainerClient:
         """
         Retrieves the ContainerClient for the specified container name.
@@ -25,30 +32,38 @@ class ContainerManager:
         Returns:
             ContainerClient: The client for the specified container.
         """
-        if container_name not in self.container_clients:
-            logger.info(f"ContainerClient for '{container_name}' not found, creating new one.")
-            self.container_clients[container_name] = self.blob_service_client.get_container_client(container_name)
-        return self.container_clients[container_name]
-    
+        return self.container_clients.get_or_create(
+            container_name,
+            lambda: self.blob_service_client.get_container_client(container_name)
+        )
+
     def list_blobs(self, container_name: str) -> List[str]:
-        if container_name not in self.container_clients:
+        container_client = self.get_container_client(container_name)
+        logger.info(f'Listing blobs in container "{container_name}"')
+        try:
+            with azure_call("list_blobs"):
+                blobs = [blob.name for blob in container_client.list_blobs()]
+        except ResourceNotFoundError:
             logger.error(f'Container "{container_name}" not found')
+            self.container_clients.invalidate(container_name)
             return []
-
-        container_client = self.container_clients[container_name]
-        logger.info(f'Listing blobs in container "{container_name}"')
-        blobs = [blob.name for blob in container_client.list_blobs()]
-        logger.info(blobs)
         logger.info(f'Found {len(blobs)} blob(s) in container "{container_name}"')
         return blobs
-    
+
     def list_containers(self) -> List[str]:
-        return list(self.container_clients.keys())
+        names = self._container_names.get("all")
+        if names is None:
+            logger.info("Refreshing container listing")
+            with azure_call("list_containers"):
+                names = self._container_names.set(
+                    "all", [container.name for container in self.blob_service_client.list_containers()]
+                )
+        return list(names)
 
     def log_container_info(self):
-        for container_name in self.container_clients.keys():
+        for container_name in self.list_containers():
             try:
-                container_client = self.container_clients[container_name]
+                container_client = self.get_container_client(container_name)
                 blobs = list(container_client.list_blobs())
                 num_blobs = len(blobs)
                 total_size = sum(blob.size for blob in blobs)
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from m365server.azure_interface.blob_listing import BlobEntry
+from m365server.azure_interface.metrics import record_cache_lookups
+
+
+@dataclass
+class ContainerStats:
+    container_name: str
+    blob_count: int = 0
+    total_bytes: int = 0
+    earliest_modified: Optional[str] = None
+    latest_modified: Optional[str] = None
+    scanned_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "container_name": self.container_name,
+            "blob_count": self.blob_count,
+            "total_bytes": self.total_bytes,
+            "earliest_modified": self.earliest_modified,
+            "latest_modified": self.latest_modified,
+            "scanned_at": self.scanned_at,
+        }
+
+
+@dataclass
+class _ContainerIndex:
+    """
+    Size and modification time of every blob in a scanned container, kept so that
+    uploads and deletes can adjust the aggregates without rescanning.
+    """
+    blobs: Dict[str, Tuple[int, Optional[str]]] = field(default_factory=dict)
+    total_bytes: int = 0
+    earliest_modified: Optional[str] = None
+    latest_modified: Optional[str] = None
+    bounds_stale: bool = False
+    scanned_at: float = 0.0
+
+    def add(self, name: str, size: int, last_modified: Optional[str]) -> None:
+        self.remove(name)
+        self.blobs[name] = (size, last_modified)
+        self.total_bytes += size
+        if last_modified is not None and not self.bounds_stale:
+            if self.earliest_modified is None or last_modified < self.earliest_modified:
+                self.earliest_modified = last_modified
+            if self.latest_modified is None or last_modified > self.latest_modified:
+                self.latest_modified = last_modified
+
+    def remove(self, name: str) -> None:
+        previous = self.blobs.pop(name, None)
+        if previous is None:
+            return
+        size, last_modified = previous
+        self.total_bytes -= size
+        if last_modified is not None and last_modified in (self.earliest_modified, self.latest_modified):
+            # Recomputed on the next read, so a burst of deletes costs one pass.
+            self.bounds_stale = True
+
+    def snapshot(self, container_name: str) -> ContainerStats:
+        if self.bounds_stale:
+            modified = [last_modified for _, last_modified in self.blobs.values() if last_modified is not None]
+            self.earliest_modified = min(modified, default=None)
+            self.latest_modified = max(modified, default=None)
+            self.bounds_stale = False
+        return ContainerStats(
+            container_name=container_name,
+            blob_count=len(self.blobs),
+            total_bytes=self.total_bytes,
+            earliest_modified=self.earliest_modified,
+            latest_modified=self.latest_modified,
+            scanned_at=self.scanned_at,
+        )
+
+
+class ContainerStatsCache:
+    """
+    Per-container blob count, total size and modification time range, maintained incrementally.
+
+    Each container is scanned once, concurrently with the others, and then kept up to date by
+    record_upload and record_delete as writes go through this server. Because other workers and
+    other clients can also write to the account, a container is rescanned after ttl_seconds.
+    """
+
+    def __init__(self, iter_blob_pages: Callable, ttl_seconds: float = 300.0, max_concurrency: int = 8,
+                 clock: Callable[[], float] = time.time) -> None:
+        """
+        Initialize the ContainerStatsCache.
+
+        Args:
+            iter_blob_pages (Callable): Async generator function with the signature of ContainerManager.iter_blob_pages.
+            ttl_seconds (float): Seconds after which a container is rescanned.
+            max_concurrency (int): Maximum number of containers scanned at the same time.
+            clock (Callable[[], float]): Clock used to timestamp scans.
+        """
+        self._iter_blob_pages = iter_blob_pages
+        self.ttl_seconds = ttl_seconds
+        self.max_concurrency = max_concurrency
+        self._clock = clock
+        self._indexes: Dict[str, _ContainerIndex] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _is_fresh(self, container_name: str) -> bool:
+        index = self._indexes.get(container_name)
+        return index is not None and self._clock() - index.scanned_at < self.ttl_seconds
+
+    async def _scan(self, container_name: str, semaphore: asyncio.Semaphore) -> None:
+        lock = self._locks.setdefault(container_name, asyncio.Lock())
+        async with lock:
+            # Another request may have finished scanning while this one waited for the lock.
+            if self._is_fresh(container_name):
+                return
+            async with semaphore:
+                logger.info(f"Scanning container '{container_name}' for stats")
+                index = _ContainerIndex(scanned_at=self._clock())
+                async for page in self._iter_blob_pages(container_name, page_size=5000):
+                    for blob in page.blobs:
+                        index.add(blob.name, blob.size or 0, blob.last_modified)
+                self._indexes[container_name] = index
+                logger.info(f"Scanned {len(index.blobs)} blob(s) in container '{container_name}'")
+
+    async def get(self, container_names: List[str], refresh: bool = False) -> List[ContainerStats]:
+        """
+        Returns stats for the given containers, scanning stale or unknown containers concurrently.
+
+        Containers that cannot be scanned are logged and left out of the result.
+        """
+        if refresh:
+            for container_name in container_names:
+                self.invalidate(container_name)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        pending = [name for name in container_names if not self._is_fresh(name)]
+        record_cache_lookups("container_stats", hits=len(container_names) - len(pending), misses=len(pending))
+        results = await asyncio.gather(*(self._scan(name, semaphore) for name in pending), return_exceptions=True)
+        for container_name, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to retrieve information for container '{container_name}': {result}")
+        return [self._indexes[name].snapshot(name) for name in container_names if name in self._indexes]
+
+    def record_upload(self, container_name: str, blob: BlobEntry) -> None:
+        index = self._indexes.get(container_name)
+        if index is not None:
+            index.add(blob.name, blob.size or 0, blob.last_modified)
+
+    def record_delete(self, container_name: str, blob_name: str) -> None:
+        index = self._indexes.get(container_name)
+        if index is not None:
+            index.remove(blob_name)
+
+    def is_tracking(self, container_name: str) -> bool:
+        return container_name in self._indexes
+
+    def invalidate(self, container_name: str) -> None:
+        self._indexes.pop(container_name, None)
@@ -0,0 +1,158 @@
+import asyncio
+import os
+from io import BytesIO
+from typing import Any, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from azure.core.exceptions import ResourceNotFoundError
+from loguru import logger
+
+from m365server.azure_interface.blob_data_loader import BlobDataLoader
+from m365server.azure_interface.metrics import record_cache_lookups
+
+# Loaders whose output is worth materializing as parquet.
+CONVERTIBLE_LOADERS = ('read_csv', 'read_json', 'read_excel')
+
+SOURCE_ETAG_KEY = "source_etag"
+
+
+class ConversionError(ValueError):
+    """
+    Raised when a blob cannot be converted to parquet.
+    """
+
+
+def convert_to_parquet(blob_data: bytes, content_type: str) -> bytes:
+    """
+    Converts a tabular blob to parquet using the BlobDataLoader readers for its content type.
+
+    CSV and JSON lines are decoded with the Arrow engine; everything else goes through pandas.
+    Only the first sheet of a workbook is converted.
+
+    Args:
+        blob_data (bytes): The data from the blob.
+        content_type (str): The content type of the blob.
+
+    Returns:
+        bytes: The parquet file.
+    """
+    table = BlobDataLoader.load_blob_to_table(blob_data, content_type)
+    if table is None:
+        frame = BlobDataLoader.load_blob_to_dataframe(blob_data, content_type)
+        if isinstance(frame, dict):
+            frame = next(iter(frame.values()), None)
+        if frame is None:
+            raise ConversionError(f"Cannot load blob of content type '{content_type}'")
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as ex:
+            raise ConversionError(f"Cannot convert blob to Arrow: {ex}")
+    buffer = BytesIO()
+    pq.write_table(table, buffer)
+    return buffer.getvalue()
+
+
+class DerivedParquetStore:
+    """
+    Materializes parquet copies of CSV, JSON and Excel blobs so they are parsed once rather than on every load.
+
+    A copy of blob "reports/q1.xlsx" is stored as "_derived/reports/q1.xlsx.parquet" in the same container,
+    with the source blob's ETag in its metadata. A copy is reused until the source ETag changes, at which
+    point it is rebuilt on the next load, and is deleted along with its source when the storage manager
+    has the store set.
+    """
+
+    def __init__(self, storage_manager: Any, prefix: str = "_derived/") -> None:
+        """
+        Initialize the DerivedParquetStore.
+
+        Args:
+            storage_manager (Any): The async storage manager holding both the sources and their copies.
+            prefix (str): Blob name prefix under which copies are stored.
+        """
+        self.storage_manager = storage_manager
+        self.prefix = prefix
+
+    def derived_name(self, blob_name: str) -> str:
+        return f"{self.prefix}{blob_name}.parquet"
+
+    def is_derived(self, blob_name: str) -> bool:
+        return blob_name.startswith(self.prefix)
+
+    @staticmethod
+    def is_convertible(content_type: Optional[str]) -> bool:
+        return BlobDataLoader.get_pandas_loader(content_type) in CONVERTIBLE_LOADERS
+
+    async def get_parquet_blob(self, container_name: str, blob_name: str, properties: Optional[Any] = None) -> Any:
+        """
+        Returns the properties of a parquet blob holding the data of blob_name, converting it first if needed.
+
+        Parquet and other non-convertible blobs are returned unchanged, so the result can always be read as parquet
+        when the source is tabular.
+
+        Args:
+            container_name (str): The name of the container where the blob is located.
+            blob_name (str): The name of the source blob.
+            properties (Optional[Any]): Properties of the source blob already fetched by the caller.
+
+        Returns:
+            BlobProperties: The properties of the blob to read; its name is the source or the derived copy.
+        """
+        if properties is None:
+            properties = await self.storage_manager.get_blob_properties(container_name, blob_name)
+        content_type = properties.content_settings.content_type
+        if not self.is_convertible(content_type):
+            return properties
+
+        derived_name = self.derived_name(blob_name)
+        try:
+            derived = await self.storage_manager.get_blob_properties(container_name, derived_name)
+            if (derived.metadata or {}).get(SOURCE_ETAG_KEY) == properties.etag:
+                logger.info(f"Using derived parquet copy '{derived_name}' of blob '{blob_name}'")
+                record_cache_lookups("derived_parquet", hits=1)
+                return derived
+        except ResourceNotFoundError:
+            pass
+
+        record_cache_lookups("derived_parquet", misses=1)
+        logger.info(f"Converting blob '{blob_name}' ({content_type}) to parquet")
+        # Pinned to the ETag the copy is tagged with, so a concurrent overwrite cannot mislabel it.
+        blob_data = b"".join([chunk async for chunk in self.storage_manager.stream_blob(
+            container_name, blob_name, etag=properties.etag
+        )])
+        parquet = await asyncio.to_thread(convert_to_parquet, blob_data, content_type)
+        await self.storage_manager.upload_blob(
+            container_name, derived_name, BytesIO(parquet),
+            metadata={SOURCE_ETAG_KEY: properties.etag}
+        )
+        logger.info(f"Stored {len(parquet)} byte parquet copy of blob '{blob_name}' as '{derived_name}'")
+        return await self.storage_manager.get_blob_properties(container_name, derived_name)
+
+    async def delete_copies(self, container_name: str, blob_names: List[str]) -> None:
+        """
+        Deletes the parquet copies of deleted source blobs; sources without a copy are skipped.
+
+        Only a few blobs have a copy, so the copies under the names' common prefix are listed first
+        rather than sending a delete for every name.
+
+        Args:
+            container_name (str): The name of the container where the blobs were located.
+            blob_names (List[str]): The names of the deleted source blobs.
+        """
+        derived_names = {self.derived_name(blob_name) for blob_name in blob_names if not self.is_derived(blob_name)}
+        if not derived_names:
+            return
+        existing = []
+        try:
+            prefix = f"{self.prefix}{os.path.commonprefix(blob_names)}"
+            async for page in self.storage_manager.iter_blob_pages(container_name, prefix=prefix, page_size=5000):
+                existing.extend(blob.name for blob in page.blobs if blob.name in derived_names)
+        except ResourceNotFoundError:
+            return
+        if not existing:
+            return
+        results = await self.storage_manager.delete_blobs(container_name, existing)
+        deleted = [result.blob_name for result in results if result.deleted]
+        if deleted:
+            logger.info(f"Deleted {len(deleted)} derived parquet cop{'y' if len(deleted) == 1 else 'ies'} of deleted blobs")
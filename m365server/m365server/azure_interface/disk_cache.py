@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import os
+import time
+import uuid
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from m365server.azure_interface.metrics import record_cache_lookups
+
+
+class DiskBlobCache:
+    """
+    A local-disk LRU cache of blob contents keyed by container, blob name and ETag.
+
+    The tier below the Redis BlobCache, for blobs too large to keep in Redis: each entry is a
+    file under directory, so a hit can be sent with FileResponse without loading the blob into
+    memory, and a miss is filled with tee() while it is sent. Fills are written to a temporary
+    file and renamed into place, so readers in any worker only ever see complete entries. A hit
+    touches the file's modification time. Each worker keeps a running total of the bytes on disk,
+    and once a fill takes it over max_total_bytes, or at least every rescan_seconds, it rescans the
+    directory and deletes the least recently used entries until the directory fits. Since the directory itself is the index, every worker on a node shares the
+    cache and its budget; the periodic rescan picks up what the other workers added.
+
+    Because the ETag is part of the key a changed blob is never served stale; invalidate()
+    additionally frees the old entries as soon as the server itself writes or deletes a blob.
+    """
+
+    def __init__(self, directory: str, max_total_bytes: int = 10 * 1024 ** 3, min_entry_bytes: int = 0,
+                 max_entry_bytes: Optional[int] = None, rescan_seconds: float = 60.0) -> None:
+        """
+        Initialize the DiskBlobCache.
+
+        Args:
+            directory (str): Directory holding the entries, ideally on local SSD. Created if missing.
+            max_total_bytes (int): Bytes kept before the least recently used entries are evicted.
+            min_entry_bytes (int): Smallest blob that is cached, so that small blobs are left to the Redis cache.
+            max_entry_bytes (Optional[int]): Largest blob that is cached; defaults to max_total_bytes.
+            rescan_seconds (float): Longest time between two rescans of the directory.
+        """
+        self.directory = directory
+        self.max_total_bytes = max_total_bytes
+        self.min_entry_bytes = min_entry_bytes
+        self.max_entry_bytes = max_total_bytes if max_entry_bytes is None else min(max_entry_bytes, max_total_bytes)
+        self._entries_directory = os.path.join(directory, "entries")
+        self._temp_directory = os.path.join(directory, "tmp")
+        os.makedirs(self._entries_directory, exist_ok=True)
+        os.makedirs(self._temp_directory, exist_ok=True)
+        self.rescan_seconds = rescan_seconds
+        self.hits = 0
+        self.misses = 0
+        # The budget may have been lowered since the directory was last used.
+        self._scanned_at = time.monotonic()
+        self._total_bytes = self._evict()
+
+    def accepts(self, size: int) -> bool:
+        """
+        Returns True if a blob of the given size belongs in the disk cache.
+        """
+        return size is not None and self.min_entry_bytes <= size <= self.max_entry_bytes
+
+    def _blob_prefix(self, container_name: str, blob_name: str) -> str:
+        digest = hashlib.sha256(f"{container_name}/{blob_name}".encode()).hexdigest()
+        return os.path.join(self._entries_directory, digest[:2], digest)
+
+    def _path(self, container_name: str, blob_name: str, etag: str) -> str:
+        return f"{self._blob_prefix(container_name, blob_name)}.{hashlib.sha256(etag.encode()).hexdigest()[:32]}"
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def get(self, container_name: str, blob_name: str, etag: str) -> Optional[str]:
+        """
+        Returns the path of the cached file for the given version of a blob, or None on a miss.
+
+        The hit touches the entry, which makes it the last to be evicted while it is sent.
+        """
+        path = self._path(container_name, blob_name, etag)
+        hit = await asyncio.to_thread(self._touch, path)
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        record_cache_lookups("disk", hits=int(hit), misses=int(not hit))
+        return path if hit else None
+
+    async def tee(self, container_name: str, blob_name: str, etag: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """
+        Passes chunks on while writing them to the entry for one version of a blob, so a miss is served as it fills.
+
+        The chunks should come from a download pinned to etag. The entry is created once they have all been
+        yielded; if they fail part way, or the reader stops early, no entry is created.
+        """
+        path = self._path(container_name, blob_name, etag)
+        temp_path = os.path.join(self._temp_directory, uuid.uuid4().hex)
+        file = await asyncio.to_thread(open, temp_path, "wb")
+        size = 0
+        try:
+            try:
+                async for chunk in chunks:
+                    await asyncio.to_thread(file.write, chunk)
+                    size += len(chunk)
+                    yield chunk
+            finally:
+                await asyncio.to_thread(file.close)
+                if hasattr(chunks, "aclose"):
+                    await chunks.aclose()
+            replaced = await asyncio.to_thread(self._commit, temp_path, path)
+        except BaseException:
+            await asyncio.to_thread(self._discard, temp_path)
+            raise
+        self._total_bytes += size - replaced
+        if self._total_bytes > self.max_total_bytes or time.monotonic() - self._scanned_at > self.rescan_seconds:
+            self._scanned_at = time.monotonic()
+            self._total_bytes = await asyncio.to_thread(self._evict)
+
+    @classmethod
+    def _commit(cls, temp_path: str, path: str) -> int:
+        """
+        Moves a filled temporary file into place, returning the size of the entry it replaced.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        replaced = cls._size(path)
+        os.replace(temp_path, path)
+        return replaced
+
+    @staticmethod
+    def _size(path: str) -> int:
+        try:
+            return os.stat(path).st_size
+        except FileNotFoundError:
+            return 0
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def invalidate(self, container_name: str, blob_name: str) -> None:
+        """
+        Drops every cached version of a blob.
+        """
+        prefix = self._blob_prefix(container_name, blob_name)
+
+        def remove() -> Tuple[int, int]:
+            directory, name = os.path.split(prefix)
+            try:
+                paths = [entry.path for entry in os.scandir(directory) if entry.name.startswith(f"{name}.")]
+            except FileNotFoundError:
+                return 0, 0
+            freed = 0
+            for path in paths:
+                freed += self._size(path)
+                self._discard(path)
+            return len(paths), freed
+
+        removed, freed = await asyncio.to_thread(remove)
+        self._total_bytes = max(0, self._total_bytes - freed)
+        if removed:
+            logger.info(f"Invalidated {removed} version(s) of blob '{blob_name}' on disk")
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int, int]:
+        """
+        Lists the entries as (modification time, size, path), returning them with their count and total size.
+        Temporary files abandoned by a stopped worker for over an hour are deleted on the way.
+        """
+        entries = []
+        for shard in os.scandir(self._entries_directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        stale = time.time() - 3600
+        for entry in os.scandir(self._temp_directory):
+            try:
+                if entry.stat().st_mtime < stale:
+                    self._discard(entry.path)
+            except FileNotFoundError:
+                pass
+        return entries, len(entries), sum(size for _, size, _ in entries)
+
+    def _evict(self) -> int:
+        """
+        Deletes least recently used entries until the directory fits its budget, returning the bytes left.
+
+        A file that is being sent stays readable after it is deleted, and entries are touched when
+        they are served, so an entry in use is the last one evicted.
+        """
+        entries, _, total = self._scan()
+        if total > self.max_total_bytes:
+            entries.sort()
+            evicted = 0
+            for _, size, path in entries:
+                if total <= self.max_total_bytes:
+                    break
+                self._discard(path)
+                total -= size
+                evicted += 1
+            logger.info(f"Evicted {evicted} blob(s) from the disk cache")
+        return total
+
+    async def stats(self) -> Dict[str, float]:
+        """
+        Returns this worker's hit and miss counters along with the entries and bytes on disk.
+        """
+        count, total = await asyncio.to_thread(lambda: self._scan()[1:])
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+            "entries": count,
+            "bytes": total,
+            "min_entry_bytes": self.min_entry_bytes,
+            "max_entry_bytes": self.max_entry_bytes,
+            "max_total_bytes": self.max_total_bytes,
+        }
@@ -0,0 +1,207 @@
+import functools
+import inspect
+import time
+from typing import Callable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from m365server.azure_interface.profiling import current_recorder
+
+# Azure calls range from single-digit millisecond property reads to multi-second uploads.
+AZURE_CALL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+AZURE_CALL_SECONDS = Histogram(
+    "m365server_azure_call_duration_seconds",
+    "Latency of calls to Azure Blob Storage by operation and outcome. Streams are timed to their first chunk.",
+    ["operation", "outcome"],
+    buckets=AZURE_CALL_BUCKETS
+)
+
+AZURE_BYTES = Counter(
+    "m365server_azure_bytes_total",
+    "Blob bytes transferred to and from Azure Blob Storage.",
+    ["direction"]
+)
+
+CACHE_LOOKUPS = Counter(
+    "m365server_cache_lookups_total",
+    "Cache lookups by cache and result; the hit ratio is hits / (hits + misses).",
+    ["cache", "result"]
+)
+
+COALESCED_READS = Counter(
+    "m365server_coalesced_reads_total",
+    "Reads served by joining an identical read already in flight instead of calling Azure, by operation.",
+    ["operation"]
+)
+
+STORAGE_RETRIES = Counter(
+    "m365server_azure_retries_total",
+    "Storage reads retried after a throttling or server error, a dropped connection or a timeout, by operation and reason.",
+    ["operation", "reason"]
+)
+
+HEDGED_READS = Counter(
+    "m365server_azure_hedged_reads_total",
+    "Storage reads that were hedged with a duplicate request, by operation and which request finished first.",
+    ["operation", "winner"]
+)
+
+# Summed over the workers, so in-flight bytes over the budget is the utilization of the whole deployment.
+ADMISSION_INFLIGHT_BYTES = Gauge(
+    "m365server_admission_inflight_bytes",
+    "Bytes reserved by the uploads and downloads currently admitted.",
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_BUDGET_BYTES = Gauge(
+    "m365server_admission_budget_bytes",
+    "Bytes the admitted uploads and downloads may reserve together.",
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_QUEUED = Gauge(
+    "m365server_admission_queued_transfers",
+    "Uploads and downloads waiting to be admitted.",
+    multiprocess_mode="livesum"
+)
+
+ADMISSION_REJECTED = Counter(
+    "m365server_admission_rejected_total",
+    "Uploads and downloads rejected with 429, by reason.",
+    ["reason"]
+)
+
+ADMISSION_WAIT_SECONDS = Histogram(
+    "m365server_admission_wait_seconds",
+    "Time uploads and downloads waited to be admitted, rejected ones included.",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+BYTES_DOWNLOADED = AZURE_BYTES.labels(direction="download")
+BYTES_UPLOADED = AZURE_BYTES.labels(direction="upload")
+
+
+class azure_call:
+    """
+    Times a call to Azure and records it in AZURE_CALL_SECONDS under the given operation.
+
+    Usable as a context manager around a single call, or as a decorator for functions, coroutine
+    functions and (async) generators. A generator is timed until it yields its first item, so the
+    time a slow consumer spends between chunks is not counted as Azure latency.
+
+    During a profiled request each call is also recorded as an "azure.<operation>" span; a
+    generator's span lasts until it is exhausted or closed, with the first item time noted.
+    """
+
+    def __init__(self, operation: str) -> None:
+        self.operation = operation
+        self.span_name = f"azure.{operation}"
+        self._ok = AZURE_CALL_SECONDS.labels(operation=operation, outcome="ok")
+        self._error = AZURE_CALL_SECONDS.labels(operation=operation, outcome="error")
+        self._start = 0.0
+
+    def __enter__(self) -> "azure_call":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Cancelled calls are not observed; they say nothing about Azure's latency.
+        if exc_type is None or issubclass(exc_type, Exception):
+            self._observe(self._start, exc_type is not None)
+
+    def _latency(self, start: float, failed: bool) -> float:
+        end = time.perf_counter()
+        (self._error if failed else self._ok).observe(end - start)
+        return end
+
+    def _observe(self, start: float, failed: bool) -> None:
+        end = self._latency(start, failed)
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.add(self.span_name, start, end)
+
+    def _observe_stream(self, start: float, first_item: Optional[float]) -> None:
+        recorder = current_recorder()
+        if recorder is not None:
+            recorder.add(self.span_name, start, time.perf_counter(), first_item)
+
+    def __call__(self, function: Callable) -> Callable:
+        if inspect.isasyncgenfunction(function):
+            @functools.wraps(function)
+            async def async_generator(*args, **kwargs):
+                start = time.perf_counter()
+                first_item = None
+                items = function(*args, **kwargs)
+                try:
+                    async for item in items:
+                        if first_item is None:
+                            first_item = self._latency(start, False)
+                        yield item
+                    if first_item is None:
+                        first_item = self._latency(start, False)
+                except Exception:
+                    if first_item is None:
+                        self._latency(start, True)
+                    raise
+                finally:
+                    self._observe_stream(start, first_item)
+                    await items.aclose()
+            return async_generator
+
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def generator(*args, **kwargs):
+                start = time.perf_counter()
+                first_item = None
+                items = function(*args, **kwargs)
+                try:
+                    for item in items:
+                        if first_item is None:
+                            first_item = self._latency(start, False)
+                        yield item
+                    if first_item is None:
+                        first_item = self._latency(start, False)
+                except Exception:
+                    if first_item is None:
+                        self._latency(start, True)
+                    raise
+                finally:
+                    self._observe_stream(start, first_item)
+                    items.close()
+            return generator
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def coroutine(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await function(*args, **kwargs)
+                except Exception:
+                    self._observe(start, True)
+                    raise
+                self._observe(start, False)
+                return result
+            return coroutine
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except Exception:
+                self._observe(start, True)
+                raise
+            self._observe(start, False)
+            return result
+        return wrapper
+
+
+def record_cache_lookups(cache: str, hits: int = 0, misses: int = 0) -> None:
+    """
+    Counts hits and misses of one of the server's caches.
+    """
+    if hits:
+        CACHE_LOOKUPS.labels(cache=cache, result="hit").inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache=cache, result="miss").inc(misses)
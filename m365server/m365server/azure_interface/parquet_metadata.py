@@ -0,0 +1,252 @@
+import asyncio
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import redis
+import redis.asyncio
+from loguru import logger
+
+from m365server.azure_interface.blob_listing import BlobEntry
+from m365server.azure_interface.metrics import record_cache_lookups
+
+PARQUET_MAGIC = b"PAR1"
+
+# Large enough to hold the whole footer of most files, so one ranged read usually suffices.
+FOOTER_TAIL_BYTES = 64 * 1024
+
+
+class InvalidParquetError(ValueError):
+    """
+    Raised when a blob does not end with a parquet footer.
+    """
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, bytes):
+        try:
+            return value.decode("utf-8")
+        except UnicodeDecodeError:
+            return base64.b64encode(value).decode()
+    return value
+
+
+def summarize_parquet_footer(footer: bytes) -> Dict[str, Any]:
+    """
+    Parses a parquet footer into a JSON-serializable summary.
+
+    Args:
+        footer (bytes): The file metadata followed by its 4-byte length and the PAR1 magic.
+
+    Returns:
+        Dict[str, Any]: Row and row group counts, the Arrow schema, and per row group column chunk sizes and statistics.
+    """
+    try:
+        metadata = pq.read_metadata(pa.BufferReader(footer))
+    except pa.ArrowException as ex:
+        raise InvalidParquetError(f"Invalid parquet footer: {ex}")
+
+    row_groups = []
+    for index in range(metadata.num_row_groups):
+        row_group = metadata.row_group(index)
+        columns = []
+        for column_index in range(row_group.num_columns):
+            column = row_group.column(column_index)
+            statistics = column.statistics if column.is_stats_set else None
+            has_min_max = statistics is not None and statistics.has_min_max
+            columns.append({
+                "path": column.path_in_schema,
+                "compression": column.compression,
+                "compressed_size": column.total_compressed_size,
+                "uncompressed_size": column.total_uncompressed_size,
+                "min": _json_value(statistics.min) if has_min_max else None,
+                "max": _json_value(statistics.max) if has_min_max else None,
+                "null_count": statistics.null_count if statistics is not None and statistics.has_null_count else None,
+            })
+        row_groups.append({
+            "num_rows": row_group.num_rows,
+            "total_byte_size": row_group.total_byte_size,
+            "columns": columns,
+        })
+
+    schema = metadata.schema.to_arrow_schema()
+    return {
+        "num_rows": metadata.num_rows,
+        "num_row_groups": metadata.num_row_groups,
+        "num_columns": metadata.num_columns,
+        "created_by": metadata.created_by,
+        "footer_size": len(footer),
+        "schema": [{"name": field.name, "type": str(field.type), "nullable": field.nullable} for field in schema],
+        "row_groups": row_groups,
+    }
+
+
+class ParquetMetadataCache:
+    """
+    A Redis cache of parsed parquet footers keyed by container, blob name and ETag.
+
+    Redis failures are logged and treated as cache misses.
+    """
+
+    def __init__(self, redis_client: redis.asyncio.Redis, ttl_seconds: int = 86400,
+                 namespace: str = "parquetmeta") -> None:
+        """
+        Initialize the ParquetMetadataCache.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Client for a Redis connection pool.
+            ttl_seconds (int): Seconds a summary is kept.
+            namespace (str): Prefix for every key the cache writes.
+        """
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    def _key(self, container_name: str, blob_name: str, etag: str) -> str:
+        return f"{self.namespace}:{container_name}/{blob_name}@{etag}"
+
+    async def get_many(self, container_name: str, blobs: List[Tuple[str, str]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns the cached summary of each (blob_name, etag) pair, or None where there is none, in one round trip.
+        """
+        if not blobs:
+            return []
+        try:
+            values = await self.redis.mget([self._key(container_name, name, etag) for name, etag in blobs])
+        except redis.RedisError as ex:
+            logger.warning(f"Parquet metadata cache lookup failed: {ex}")
+            values = [None] * len(blobs)
+        hits = sum(value is not None for value in values)
+        record_cache_lookups("parquet_metadata", hits=hits, misses=len(values) - hits)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def put_many(self, container_name: str, summaries: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        """
+        Stores (blob_name, etag, summary) triples in one round trip.
+        """
+        if not summaries:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name, etag, summary in summaries:
+                    pipe.set(self._key(container_name, name, etag), json.dumps(summary), ex=self.ttl_seconds)
+                await pipe.execute()
+        except redis.RedisError as ex:
+            logger.warning(f"Parquet metadata cache store failed: {ex}")
+
+    async def close(self) -> None:
+        await self.redis.aclose(close_connection_pool=True)
+
+
+class ParquetMetadataReader:
+    """
+    Reads parquet footers with tail range reads, serving and filling a ParquetMetadataCache when one is set.
+    """
+
+    def __init__(self, storage_manager: Any, cache: Optional[ParquetMetadataCache] = None,
+                 max_concurrency: int = 16) -> None:
+        """
+        Initialize the ParquetMetadataReader.
+
+        Args:
+            storage_manager (Any): An async storage manager providing get_blob_properties and stream_blob.
+            cache (Optional[ParquetMetadataCache]): Cache of parsed footers, or None to always read them.
+            max_concurrency (int): Maximum number of footers fetched at the same time.
+        """
+        self.storage_manager = storage_manager
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+
+    async def _read_range(self, container_name: str, blob_name: str, offset: int, length: int, etag: str) -> bytes:
+        return b"".join([chunk async for chunk in self.storage_manager.stream_blob(
+            container_name, blob_name, offset=offset, length=length, etag=etag
+        )])
+
+    async def read_footer(self, container_name: str, blob_name: str, size: int, etag: str) -> bytes:
+        """
+        Returns the footer of a parquet blob, reading only the end of the blob.
+
+        A single read of the last 64 KiB covers most footers; a larger footer costs one more read.
+        """
+        if size < 12:
+            raise InvalidParquetError(f"Blob '{blob_name}' is too small to be a parquet file")
+        tail_offset = max(0, size - FOOTER_TAIL_BYTES)
+        tail = await self._read_range(container_name, blob_name, tail_offset, size - tail_offset, etag)
+        if tail[-4:] != PARQUET_MAGIC:
+            raise InvalidParquetError(f"Blob '{blob_name}' does not end with a parquet footer")
+        footer_size = int.from_bytes(tail[-8:-4], "little") + 8
+        if footer_size > size - 4:
+            raise InvalidParquetError(f"Blob '{blob_name}' has a corrupt parquet footer length")
+        if footer_size > len(tail):
+            head_offset = size - footer_size
+            tail = await self._read_range(container_name, blob_name, head_offset, tail_offset - head_offset, etag) + tail
+        return tail[-footer_size:]
+
+    async def _summarize(self, container_name: str, entry: BlobEntry) -> Dict[str, Any]:
+        footer = await self.read_footer(container_name, entry.name, entry.size, entry.etag)
+        summary = await asyncio.to_thread(summarize_parquet_footer, footer)
+        return {"blob_name": entry.name, "etag": entry.etag, "size": entry.size, **summary}
+
+    async def get_many(self, container_name: str, entries: List[BlobEntry]) -> List[Dict[str, Any]]:
+        """
+        Returns the metadata summary of each blob, reading the footers of uncached blobs concurrently.
+
+        Blobs whose footer cannot be read get an entry with an "error" key instead.
+
+        Args:
+            container_name (str): The name of the container where the blobs are located.
+            entries (List[BlobEntry]): The blobs, with their size and ETag.
+
+        Returns:
+            List[Dict[str, Any]]: One summary per blob, in the order given.
+        """
+        cached = await self.cache.get_many(container_name, [(entry.name, entry.etag) for entry in entries]) \
+            if self.cache is not None else [None] * len(entries)
+        missing = [entry for entry, summary in zip(entries, cached) if summary is None]
+        logger.info(f"Parquet metadata for {len(entries) - len(missing)} of {len(entries)} blob(s) served from cache")
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def summarize(entry: BlobEntry) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._summarize(container_name, entry)
+
+        results = await asyncio.gather(*(summarize(entry) for entry in missing), return_exceptions=True)
+        fetched: Dict[str, Dict[str, Any]] = {}
+        for entry, result in zip(missing, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to read parquet metadata of blob '{entry.name}': {result}")
+                fetched[entry.name] = {"blob_name": entry.name, "etag": entry.etag, "error": str(result)}
+            else:
+                fetched[entry.name] = result
+        if self.cache is not None:
+            await self.cache.put_many(container_name, [
+                (entry.name, entry.etag, fetched[entry.name]) for entry in missing if "error" not in fetched[entry.name]
+            ])
+        return [summary if summary is not None else fetched[entry.name] for entry, summary in zip(entries, cached)]
+
+    async def get(self, container_name: str, blob_name: str) -> Dict[str, Any]:
+        """
+        Returns the metadata summary of a single parquet blob.
+
+        Raises:
+            InvalidParquetError: If the blob is not a parquet file.
+        """
+        properties = await self.storage_manager.get_blob_properties(container_name, blob_name)
+        entry = BlobEntry(blob_name, properties.size, properties.etag)
+        if self.cache is not None:
+            cached = (await self.cache.get_many(container_name, [(entry.name, entry.etag)]))[0]
+            if cached is not None:
+                return cached
+        summary = await self._summarize(container_name, entry)
+        if self.cache is not None:
+            await self.cache.put_many(container_name, [(entry.name, entry.etag, summary)])
+        return summary
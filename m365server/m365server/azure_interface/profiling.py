@@ -0,0 +1,97 @@
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    duration: float
+    first_item: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        span = {"name": self.name, "start_ms": round(self.start * 1000, 3), "duration_ms": round(self.duration * 1000, 3)}
+        if self.first_item is not None:
+            span["first_item_ms"] = round(self.first_item * 1000, 3)
+        return span
+
+
+@dataclass
+class SpanRecorder:
+    """
+    Collects the timed stages of a single profiled request.
+
+    Times are perf_counter readings; spans store them relative to the moment the recorder was created.
+    """
+    origin: float = field(default_factory=time.perf_counter)
+    spans: List[Span] = field(default_factory=list)
+
+    def add(self, name: str, start: float, end: float, first_item: Optional[float] = None) -> None:
+        self.spans.append(Span(name, start - self.origin, end - start,
+                               first_item - start if first_item is not None else None))
+
+    def totals(self) -> Dict[str, Tuple[int, float]]:
+        """
+        Returns the number of spans and their total duration in seconds for each span name, in order of first use.
+        """
+        totals: Dict[str, Tuple[int, float]] = {}
+        for span in self.spans:
+            count, seconds = totals.get(span.name, (0, 0.0))
+            totals[span.name] = (count + 1, seconds + span.duration)
+        return totals
+
+    def server_timing(self) -> str:
+        """
+        Renders the spans as a Server-Timing header value, one entry per span name.
+        """
+        entries = []
+        for name, (count, seconds) in self.totals().items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            entries.append(entry if count == 1 else f'{entry};desc="x{count}"')
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"spans": [span.to_dict() for span in self.spans]}
+
+
+# Set only while a profiled request runs; everywhere else span recording is a single ContextVar lookup.
+_recorder: ContextVar[Optional[SpanRecorder]] = ContextVar("m365server_span_recorder", default=None)
+
+
+def current_recorder() -> Optional[SpanRecorder]:
+    return _recorder.get()
+
+
+def start_recording() -> Tuple[SpanRecorder, Token]:
+    """
+    Starts recording spans in the current context and the tasks and threads it spawns.
+    """
+    recorder = SpanRecorder()
+    return recorder, _recorder.set(recorder)
+
+
+def stop_recording(token: Token) -> None:
+    _recorder.reset(token)
+
+
+class span:
+    """
+    Times a block as a named span of the profiled request, if there is one.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._recorder: Optional[SpanRecorder] = None
+        self._start = 0.0
+
+    def __enter__(self) -> "span":
+        self._recorder = _recorder.get()
+        if self._recorder is not None:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._recorder is not None:
+            self._recorder.add(self.name, self._start, time.perf_counter())
@@ -2,6 +2,7 @@ from m365server.azure_interface.blob_data_loader import BlobDataLoader, Containe
 import pytest
 import pandas as pd
 from io import BytesIO
+from loguru import logger
 
 def test_should_get_csv_loader():
     content_type = 'text/csv'
@@ -99,3 +100,48 @@ def test_should_load_xml_blob_to_dataframe():
     expected_df = pd.DataFrame({'id': [1, 2, 3], 'name': ['Alice', 'Bob', 'Charlie']})
     df = BlobDataLoader.load_blob_to_dataframe(blob_data, content_type)
     assert df.equals(expected_df)
+
+def test_should_load_csv_blob_to_table_with_arrow_engine():
+    blob_data = b'id,name\n1,Alice\n2,Bob\n3,Charlie\n'
+    table = BlobDataLoader.load_blob_to_table(blob_data, 'text/csv')
+    assert table.column_names == ['id', 'name']
+    assert table.column('name').to_pylist() == ['Alice', 'Bob', 'Charlie']
+
+def test_should_load_json_lines_blob_to_table_with_arrow_engine():
+    blob_data = b'{"id": 1, "name": "Alice"}\n{"id": 2, "name": "Bob"}\n'
+    table = BlobDataLoader.load_blob_to_table(blob_data, 'application/json')
+    assert table.num_rows == 2
+
+def test_arrow_engine_should_fall_back_to_pandas_for_json_arrays_without_logging_an_error():
+    levels = []
+    sink = logger.add(lambda message: levels.append(message.record["level"].name))
+    try:
+        df = BlobDataLoader.load_blob_to_dataframe(b'[{"id": 1}, {"id": 2}]', 'application/json', engine='arrow')
+    finally:
+        logger.remove(sink)
+    assert df['id'].tolist() == [1, 2]
+    assert "ERROR" not in levels
+
+def test_should_load_parquet_blob_to_arrow_backed_dataframe(tmp_path):
+    df = pd.DataFrame({'id': [1, 2, 3], 'name': ['Alice', 'Bob', 'Charlie']})
+    parquet_file = tmp_path / "data.parquet"
+    df.to_parquet(parquet_file, index=False)
+
+    loaded_df = BlobDataLoader.load_blob_to_dataframe(parquet_file.read_bytes(), 'application/octet-stream', engine='arrow')
+
+    assert isinstance(loaded_df['id'].dtype, pd.ArrowDtype)
+    assert loaded_df['name'].tolist() == ['Alice', 'Bob', 'Charlie']
+
+def test_arrow_engine_should_fall_back_to_pandas_for_excel(tmp_path):
+    df = pd.DataFrame({'id': [1, 2, 3], 'name': ['Alice', 'Bob', 'Charlie']})
+    excel_file = tmp_path / "data.xlsx"
+    df.to_excel(excel_file, index=False)
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+    assert BlobDataLoader.load_blob_to_table(excel_file.read_bytes(), content_type) is None
+    loaded_df = BlobDataLoader.load_blob_to_dataframe(excel_file.read_bytes(), content_type, engine='arrow')
+    assert loaded_df['Sheet1'].equals(df)
+
+def test_should_reject_unknown_engine():
+    with pytest.raises(ValueError):
+        BlobDataLoader.load_blob_to_dataframe(b'', 'text/csv', engine='polars')
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from m365server.azure_interface.admission import AdmissionController, AdmissionRejected
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_should_admit_transfers_within_the_budget_and_queue_the_rest():
+    async def scenario():
+        controller = AdmissionController(max_inflight_bytes=100, max_wait_seconds=1)
+        first = await controller.acquire("lake", 60)
+        second = asyncio.ensure_future(controller.acquire("lake", 60))
+        await asyncio.sleep(0)
+        queued = controller.stats()
+        first.release()
+        return queued, await second, controller.stats()
+
+    queued, second, stats = run(scenario())
+    assert (queued["inflight_bytes"], queued["queued"], queued["utilization"]) == (60, 1, 0.6)
+    assert second.nbytes == 60
+    assert stats["active_by_container"] == {"lake": 1} and stats["queued"] == 0
+
+
+def test_should_reject_transfers_that_wait_too_long_or_find_the_queue_full():
+    async def scenario():
+        controller = AdmissionController(max_inflight_bytes=100, max_wait_seconds=0.05, max_queue=1, retry_after_seconds=2)
+        held = await controller.acquire("lake", 100)
+        waiting = asyncio.ensure_future(controller.acquire("lake", 10))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as full:
+            await controller.acquire("lake", 10)
+        with pytest.raises(AdmissionRejected) as timeout:
+            await waiting
+        held.release()
+        return full.value, timeout.value, controller.stats()
+
+    full, timeout, stats = run(scenario())
+    assert (full.reason, full.retry_after, timeout.reason) == ("queue_full", 2, "timeout")
+    assert (stats["inflight_bytes"], stats["queued"], stats["rejected"]) == (0, 0, 2)
+
+
+def test_should_not_let_a_busy_container_hold_up_other_containers():
+    async def scenario():
+        controller = AdmissionController(max_inflight_bytes=100, max_per_container=1, max_wait_seconds=1)
+        busy = await controller.acquire("busy", 10)
+        blocked = asyncio.ensure_future(controller.acquire("busy", 10))
+        await asyncio.sleep(0)
+        other = await controller.acquire("other", 10)
+        admitted_early = blocked.done()
+        busy.release()
+        return admitted_early, await blocked, other
+
+    admitted_early, blocked, other = run(scenario())
+    assert not admitted_early
+    assert blocked.container_name == "busy" and other.container_name == "other"
+
+
+def test_should_cap_oversized_transfers_and_free_the_slot_of_cancelled_waiters():
+    async def scenario():
+        controller = AdmissionController(max_inflight_bytes=100, max_wait_seconds=1)
+        oversized = await controller.acquire("lake", 1000)
+        waiting = asyncio.ensure_future(controller.acquire("lake", 10))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        oversized.release()
+        oversized.release()
+        return oversized.nbytes, controller.stats()
+
+    nbytes, stats = run(scenario())
+    assert nbytes == 100
+    assert (stats["inflight_bytes"], stats["active_transfers"], stats["queued"]) == (0, 0, 0)
+
+
+def test_should_charge_bytes_without_a_slot_to_a_transfer_already_admitted():
+    async def scenario():
+        controller = AdmissionController(max_inflight_bytes=100, max_per_container=1, max_wait_seconds=0.05)
+        transfer = await controller.acquire("lake", 0)
+        extra = await controller.acquire("lake", 40, slot=False)
+        during = controller.stats()
+        extra.release()
+        transfer.release()
+        return during, controller.stats()
+
+    during, after = run(scenario())
+    assert (during["inflight_bytes"], during["active_by_container"]) == (40, {"lake": 1})
+    assert (after["inflight_bytes"], after["active_by_container"]) == (0, {})
+
+
+def test_should_wait_without_limit_for_unbounded_transfers():
+    async def scenario():
+        controller = AdmissionController(max_inflight_bytes=100, max_wait_seconds=0.01, max_queue=0)
+        held = await controller.acquire("lake", 100)
+        waiting = asyncio.ensure_future(controller.acquire("lake", 10, slot=False, bounded=False))
+        await asyncio.sleep(0.05)
+        waited = not waiting.done()
+        held.release()
+        return waited, await waiting, controller.stats()
+
+    waited, reservation, stats = run(scenario())
+    assert waited and reservation.nbytes == 10
+    assert (stats["inflight_bytes"], stats["rejected"]) == (10, 0)
@@ -0,0 +1,72 @@
+import asyncio
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+
+from m365server.azure_interface.aio.blob_operations import BlobBlockUploadStrategy
+
+
+class AsyncRecordingBlobClient:
+    def __init__(self, fail_on: int = None):
+        self.fail_on = fail_on
+        self.staged = {}
+        self.committed = None
+        self.uploaded = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def stage_block(self, block_id, data):
+        index = len(self.staged) + self.in_flight
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if index == self.fail_on:
+            raise RuntimeError("stage failed")
+        self.staged[block_id] = data
+
+    async def commit_block_list(self, block_list, metadata=None):
+        self.metadata = metadata
+        self.committed = b"".join(self.staged[block.id] for block in block_list)
+
+    async def upload_blob(self, data, overwrite=False, metadata=None):
+        self.metadata = metadata
+        self.uploaded = data
+
+
+class AsyncStream:
+    def __init__(self, data: bytes):
+        self._data = BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._data.read(size)
+
+
+def container_for(blob_client):
+    container_client = Mock()
+    container_client.get_blob_client.return_value = blob_client
+    return container_client
+
+
+@pytest.mark.parametrize("stream_type", [BytesIO, AsyncStream])
+def test_should_stage_blocks_concurrently_from_sync_and_async_streams(stream_type):
+    data = bytes(range(256)) * 40
+    blob_client = AsyncRecordingBlobClient()
+    strategy = BlobBlockUploadStrategy(block_size=1000, max_concurrency=3)
+
+    asyncio.run(strategy.upload_blob(container_for(blob_client), "export.parquet", stream_type(data)))
+
+    assert blob_client.committed == data
+    assert len(blob_client.staged) == 11
+    assert 1 < blob_client.max_in_flight <= 3
+
+
+def test_should_not_commit_when_a_block_fails():
+    blob_client = AsyncRecordingBlobClient(fail_on=2)
+    strategy = BlobBlockUploadStrategy(block_size=10, max_concurrency=2)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(strategy.upload_blob(container_for(blob_client), "export.parquet", BytesIO(b"x" * 100)))
+
+    assert blob_client.committed is None
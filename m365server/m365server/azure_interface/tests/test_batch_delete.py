@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from azure.core.exceptions import HttpResponseError
+
+from m365server.azure_interface.aio.blob_operations import BlobDeleteStrategy as AsyncBlobDeleteStrategy
+from m365server.azure_interface.blob_operations import BlobDeleteStrategy
+
+
+def _response(blob_name, missing):
+    if blob_name in missing:
+        return SimpleNamespace(status_code=404, reason="The specified blob does not exist.")
+    return SimpleNamespace(status_code=202, reason="Accepted")
+
+
+class FakeAsyncContainerClient:
+    def __init__(self, missing=(), failing_batch=None):
+        self.missing = set(missing)
+        self.failing_batch = failing_batch
+        self.batches = []
+        self.active = 0
+        self.peak = 0
+
+    async def delete_blobs(self, *blob_names, raise_on_any_failure=True):
+        assert raise_on_any_failure is False
+        self.batches.append(blob_names)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if len(self.batches) == self.failing_batch:
+            raise HttpResponseError("Server busy")
+
+        async def responses():
+            for blob_name in blob_names:
+                yield _response(blob_name, self.missing)
+        return responses()
+
+
+def test_should_split_into_batches_of_256_and_send_them_concurrently():
+    """
+    GIVEN 600 blobs to delete, one of which does not exist
+    WHEN they are deleted with the async strategy
+    THEN three batches should be sent concurrently and every blob should get a result
+    """
+    # Arrange
+    names = [f"spark/part-{i:05d}.parquet" for i in range(600)]
+    container_client = FakeAsyncContainerClient(missing={names[300]})
+    strategy = AsyncBlobDeleteStrategy(max_concurrency=4)
+
+    # Act
+    results = asyncio.run(strategy.delete_blobs(container_client, names))
+
+    # Assert
+    assert [len(batch) for batch in container_client.batches] == [256, 256, 88]
+    assert container_client.peak == 3
+    assert [result.blob_name for result in results] == names
+    assert [result.blob_name for result in results if not result.deleted] == [names[300]]
+    assert results[300].status_code == 404
+
+
+def test_should_report_every_blob_in_a_failed_batch():
+    names = [f"blob-{i}" for i in range(300)]
+    container_client = FakeAsyncContainerClient(failing_batch=1)
+    strategy = AsyncBlobDeleteStrategy(max_concurrency=1)
+
+    results = asyncio.run(strategy.delete_blobs(container_client, names))
+
+    assert sum(not result.deleted for result in results) == 256
+    assert all(result.deleted for result in results[256:])
+
+
+def test_sync_strategy_should_pair_responses_with_blob_names():
+    container_client = Mock()
+    container_client.delete_blobs.side_effect = lambda *names, raise_on_any_failure: iter(
+        [_response(name, {"b"}) for name in names]
+    )
+
+    results = BlobDeleteStrategy().delete_blobs(container_client, ["a", "b", "c"])
+
+    assert [(result.blob_name, result.deleted) for result in results] == [("a", True), ("b", False), ("c", True)]
@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from m365server.azure_interface.aio import AzureBlobStorageManager
+from m365server.azure_interface.blob_cache import BlobCache
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def cache() -> BlobCache:
+    return BlobCache(FakeAsyncRedis(), max_entry_bytes=10, max_total_bytes=25, ttl_seconds=60)
+
+
+def test_should_return_cached_bytes_for_matching_etag(cache):
+    async def scenario():
+        await cache.put("reports", "dim.parquet", '"0x1"', b"0123456789")
+        return await cache.get("reports", "dim.parquet", '"0x1"'), await cache.get("reports", "dim.parquet", '"0x2"')
+
+    hit, miss = run(scenario())
+    assert hit == b"0123456789"
+    assert miss is None
+
+
+def test_should_not_store_entries_over_the_size_limit(cache):
+    async def scenario():
+        await cache.put("reports", "big.parquet", '"0x1"', b"x" * 11)
+        return await cache.get("reports", "big.parquet", '"0x1"')
+
+    assert run(scenario()) is None
+
+
+def test_should_evict_least_recently_used_entries(cache):
+    async def scenario():
+        for name in ["a", "b"]:
+            await cache.put("reports", name, '"0x1"', b"x" * 10)
+            await asyncio.sleep(0.01)
+        await cache.get("reports", "a", '"0x1"')
+        await asyncio.sleep(0.01)
+        await cache.put("reports", "c", '"0x1"', b"x" * 10)
+        return [await cache.get("reports", name, '"0x1"') is not None for name in ["a", "b", "c"]], await cache.stats()
+
+    present, stats = run(scenario())
+    assert present == [True, False, True]
+    assert stats["bytes"] == 20
+    assert stats["entries"] == 2
+
+
+def test_should_invalidate_every_version_of_a_blob(cache):
+    async def scenario():
+        await cache.put("reports", "dim.parquet", '"0x1"', b"old")
+        await cache.put("reports", "dim.parquet", '"0x2"', b"new")
+        await cache.invalidate("reports", "dim.parquet")
+        return await cache.get("reports", "dim.parquet", '"0x1"'), await cache.get("reports", "dim.parquet", '"0x2"'), await cache.stats()
+
+    old, new, stats = run(scenario())
+    assert old is None and new is None
+    assert stats["bytes"] == 0
+
+
+def test_should_keep_the_index_alive_as_long_as_the_entry(cache):
+    async def scenario():
+        await cache.put("reports", "dim.parquet", '"0x1"', b"data")
+        index_key = cache._index_key("reports", "dim.parquet")
+        await cache.redis.expire(index_key, 1)
+        await cache.get("reports", "dim.parquet", '"0x1"')
+        return await cache.redis.ttl(index_key)
+
+    assert run(scenario()) > 1
+
+
+def test_should_count_hits_and_misses(cache):
+    async def scenario():
+        await cache.get("reports", "dim.parquet", '"0x1"')
+        await cache.put("reports", "dim.parquet", '"0x1"', b"data")
+        await cache.get("reports", "dim.parquet", '"0x1"')
+        await cache.get("reports", "dim.parquet", '"0x1"')
+        return await cache.stats()
+
+    stats = run(scenario())
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+def test_manager_should_read_through_and_invalidate_on_upload(cache):
+    """
+    GIVEN a storage manager with a blob cache
+    WHEN the same blob is downloaded twice and then uploaded
+    THEN only the first download should reach storage and the upload should invalidate the entry
+    """
+    # Arrange
+    async def stream_blob(container_client, blob_name, offset=None, length=None, etag=None):
+        yield b"cached"
+
+    manager = AzureBlobStorageManager.__new__(AzureBlobStorageManager)
+    manager.container_manager = Mock()
+    manager.download_strategy = Mock()
+    manager.download_strategy.get_blob_properties = AsyncMock(return_value=SimpleNamespace(size=6, etag='"0x1"'))
+    manager.download_strategy.stream_blob = Mock(side_effect=stream_blob)
+    manager.upload_strategy = Mock(upload_blob=AsyncMock())
+    manager.set_blob_cache(cache)
+    manager.set_disk_cache(None)
+    manager.set_single_flight(None)
+    manager.set_container_stats(None)
+
+    # Act
+    async def scenario():
+        first = await manager.download_blob("reports", "dim.parquet")
+        second = await manager.download_blob("reports", "dim.parquet")
+        await manager.upload_blob("reports", "dim.parquet", b"new")
+        return first, second, await cache.get("reports", "dim.parquet", '"0x1"')
+
+    first, second, after_upload = run(scenario())
+
+    # Assert
+    assert first == second == b"cached"
+    assert manager.download_strategy.stream_blob.call_count == 1
+    assert after_upload is None
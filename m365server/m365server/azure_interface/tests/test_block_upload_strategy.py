@@ -0,0 +1,81 @@
+import threading
+import time
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+
+from m365server.azure_interface.blob_operations import BlobBlockUploadStrategy
+
+
+class RecordingBlobClient:
+    def __init__(self, delay: float = 0.0, fail_on: int = None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.staged = {}
+        self.committed = None
+        self.uploaded = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def stage_block(self, block_id, data):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            # Counted on entry: staged blocks lag behind while others are still in flight.
+            index = self.calls
+            self.calls += 1
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+            if index == self.fail_on:
+                raise RuntimeError("stage failed")
+            self.staged[block_id] = data
+
+    def commit_block_list(self, block_list, metadata=None):
+        self.metadata = metadata
+        self.committed = b"".join(self.staged[block.id] for block in block_list)
+
+    def upload_blob(self, data, overwrite=False, metadata=None):
+        self.metadata = metadata
+        self.uploaded = data
+
+
+def container_for(blob_client):
+    container_client = Mock()
+    container_client.get_blob_client.return_value = blob_client
+    return container_client
+
+
+def test_should_stage_and_commit_blocks_in_order():
+    data = bytes(range(256)) * 40
+    blob_client = RecordingBlobClient(delay=0.001)
+    strategy = BlobBlockUploadStrategy(block_size=1000, max_concurrency=3)
+
+    strategy.upload_blob(container_for(blob_client), "export.parquet", BytesIO(data))
+
+    assert blob_client.committed == data
+    assert len(blob_client.staged) == 11
+    assert blob_client.max_in_flight <= 3
+
+
+def test_should_use_single_request_for_small_uploads():
+    blob_client = RecordingBlobClient()
+    strategy = BlobBlockUploadStrategy(block_size=1000, max_concurrency=3)
+
+    strategy.upload_blob(container_for(blob_client), "small.csv", BytesIO(b"id,name\n1,Alice\n"))
+
+    assert blob_client.uploaded == b"id,name\n1,Alice\n"
+    assert blob_client.staged == {}
+
+
+def test_should_not_commit_when_a_block_fails():
+    blob_client = RecordingBlobClient(fail_on=2)
+    strategy = BlobBlockUploadStrategy(block_size=10, max_concurrency=2)
+
+    with pytest.raises(RuntimeError):
+        strategy.upload_blob(container_for(blob_client), "export.parquet", BytesIO(b"x" * 100))
+
+    assert blob_client.committed is None
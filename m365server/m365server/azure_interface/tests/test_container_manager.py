@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import Mock
+
+from azure.core.async_paging import AsyncItemPaged, AsyncList
+
+from m365server.azure_interface.aio import ContainerManager as AsyncContainerManager
+from m365server.azure_interface.container_manager import ContainerManager
+from m365server.azure_interface.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_should_not_enumerate_containers_on_init():
+    service_client = Mock()
+    ContainerManager(service_client)
+    service_client.list_containers.assert_not_called()
+    service_client.get_container_client.assert_not_called()
+
+
+def test_should_reuse_container_client_until_ttl_expires():
+    """
+    GIVEN a ContainerManager with a cached container client
+    WHEN the client is requested again before and after the TTL
+    THEN it should only be recreated after the TTL has expired
+    """
+    # Arrange
+    service_client = Mock()
+    manager = ContainerManager(service_client, cache_ttl=10)
+    clock = FakeClock()
+    manager.container_clients = TTLCache(10, clock=clock)
+
+    # Act
+    first = manager.get_container_client("reports")
+    second = manager.get_container_client("reports")
+    clock.now = 11
+    manager.get_container_client("reports")
+
+    # Assert
+    assert first is second
+    assert service_client.get_container_client.call_count == 2
+
+
+def test_should_cache_container_listing():
+    container = Mock()
+    container.name = "reports"
+    service_client = Mock()
+    service_client.list_containers.return_value = [container]
+    manager = ContainerManager(service_client)
+
+    assert manager.list_containers() == ["reports"]
+    assert manager.list_containers() == ["reports"]
+    service_client.list_containers.assert_called_once()
+
+
+def test_ttl_cache_should_expire_entries():
+    clock = FakeClock()
+    cache = TTLCache(5, clock=clock)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    clock.now = 5
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_should_page_listings_with_prefix_pushed_down():
+    """
+    GIVEN an async ContainerManager over a container with two pages of blobs
+    WHEN the pages are iterated with a prefix
+    THEN the prefix and page size should be passed to Azure and each page should carry its continuation token
+    """
+    # Arrange
+    pages = {None: ("token-1", ["spark/part-0000.parquet"]), "token-1": (None, ["spark/part-0001.parquet"])}
+
+    async def get_next(continuation_token):
+        return pages[continuation_token]
+
+    async def extract_data(response):
+        next_token, names = response
+        return next_token, AsyncList([Mock(size=1, etag='"0x1"', last_modified=None) for _ in names])
+
+    def list_blobs(name_starts_with=None, results_per_page=None):
+        return AsyncItemPaged(get_next, extract_data)
+
+    container_client = Mock()
+    container_client.list_blobs.side_effect = list_blobs
+    service_client = Mock()
+    service_client.get_container_client.return_value = container_client
+    manager = AsyncContainerManager(service_client)
+
+    # Act
+    async def collect():
+        return [page async for page in manager.iter_blob_pages("exports", prefix="spark/", page_size=1)]
+
+    listing = asyncio.run(collect())
+
+    # Assert
+    container_client.list_blobs.assert_called_once_with(name_starts_with="spark/", results_per_page=1)
+    assert [page.continuation_token for page in listing] == ["token-1", None]
+    assert [len(page.blobs) for page in listing] == [1, 1]
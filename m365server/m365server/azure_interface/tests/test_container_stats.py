@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from m365server.azure_interface.aio import AzureBlobStorageManager
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+from m365server.azure_interface.container_stats import ContainerStatsCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeListing:
+    """
+    Serves a fixed set of blobs per container and records how many scans are running at once.
+    """
+
+    def __init__(self, containers):
+        self.containers = containers
+        self.scans = []
+        self.active = 0
+        self.peak = 0
+
+    async def iter_blob_pages(self, container_name, prefix=None, delimiter=None, page_size=None,
+                              continuation_token=None):
+        self.scans.append(container_name)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            yield BlobListingPage(blobs=list(self.containers[container_name]))
+        finally:
+            self.active -= 1
+
+
+def test_should_scan_containers_concurrently():
+    listing = FakeListing({
+        "reports": [BlobEntry("a.csv", 10, '"1"', "2024-01-01T00:00:00+00:00")],
+        "exports": [BlobEntry("b.csv", 5, '"2"', "2024-02-01T00:00:00+00:00"),
+                    BlobEntry("c.csv", 7, '"3"', "2024-03-01T00:00:00+00:00")],
+    })
+    cache = ContainerStatsCache(listing.iter_blob_pages)
+
+    stats = asyncio.run(cache.get(["reports", "exports"]))
+
+    assert listing.peak == 2
+    assert [(s.container_name, s.blob_count, s.total_bytes) for s in stats] == [("reports", 1, 10), ("exports", 2, 12)]
+    assert stats[1].earliest_modified == "2024-02-01T00:00:00+00:00"
+    assert stats[1].latest_modified == "2024-03-01T00:00:00+00:00"
+
+
+def test_should_apply_uploads_and_deletes_without_rescanning():
+    """
+    GIVEN a scanned container
+    WHEN blobs are uploaded and deleted through the cache
+    THEN the stats should change without another scan, until the TTL expires
+    """
+    # Arrange
+    listing = FakeListing({"reports": [BlobEntry("a.csv", 10, '"1"', "2024-01-01T00:00:00+00:00"),
+                                       BlobEntry("b.csv", 20, '"2"', "2024-06-01T00:00:00+00:00")]})
+    clock = FakeClock()
+    cache = ContainerStatsCache(listing.iter_blob_pages, ttl_seconds=60, clock=clock)
+
+    async def run():
+        await cache.get(["reports"])
+        cache.record_upload("reports", BlobEntry("c.csv", 5, '"3"', "2024-09-01T00:00:00+00:00"))
+        cache.record_delete("reports", "a.csv")
+        updated = (await cache.get(["reports"]))[0]
+        clock.now = 61
+        rescanned = (await cache.get(["reports"]))[0]
+        return updated, rescanned
+
+    # Act
+    updated, rescanned = asyncio.run(run())
+
+    # Assert
+    assert (updated.blob_count, updated.total_bytes) == (2, 25)
+    assert updated.earliest_modified == "2024-06-01T00:00:00+00:00"
+    assert updated.latest_modified == "2024-09-01T00:00:00+00:00"
+    assert (rescanned.blob_count, rescanned.total_bytes) == (2, 30)
+    assert listing.scans == ["reports", "reports"]
+
+
+def test_should_leave_out_containers_that_fail_to_scan():
+    async def failing(container_name, **kwargs):
+        raise RuntimeError("boom")
+        yield
+
+    cache = ContainerStatsCache(failing)
+    assert asyncio.run(cache.get(["reports"])) == []
+
+
+def test_manager_should_record_uploads_in_tracked_containers():
+    listing = FakeListing({"reports": []})
+    with patch("m365server.azure_interface.aio.azure_blob_storage_manager.BlobServiceClientFactory"):
+        manager = AzureBlobStorageManager(Mock(container_cache_ttl=300))
+    manager.set_container_stats(ContainerStatsCache(listing.iter_blob_pages))
+    properties = Mock(size=3, etag='"4"', last_modified=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    properties.name = "new.csv"
+
+    async def fake_properties(container_client, blob_name):
+        return properties
+
+    async def fake_upload(container_client, blob_name, data, metadata=None):
+        return None
+
+    manager.download_strategy.get_blob_properties = fake_properties
+    manager.upload_strategy.upload_blob = fake_upload
+
+    async def run():
+        await manager.get_container_stats(["reports"])
+        await manager.upload_blob("reports", "new.csv", b"abc")
+        return await manager.get_container_stats(["reports"])
+
+    stats = asyncio.run(run())
+
+    assert (stats[0].blob_count, stats[0].total_bytes) == (1, 3)
+    assert listing.scans == ["reports"]
@@ -0,0 +1,153 @@
+import asyncio
+from types import SimpleNamespace
+
+import pyarrow.parquet as pq
+from io import BytesIO
+from azure.core.exceptions import ResourceNotFoundError
+
+from m365server.azure_interface.aio import create_local_storage_manager
+from m365server.azure_interface.blob_data_loader import BlobDataLoader
+from m365server.azure_interface.derived_parquet import DerivedParquetStore
+
+
+class InMemoryStorageManager:
+    """
+    Just enough of the async storage manager for DerivedParquetStore: blobs with a content type, ETag and metadata.
+    """
+
+    def __init__(self):
+        self.blobs = {}
+        self.uploads = []
+        self._version = 0
+
+    def put(self, blob_name, data, content_type="application/octet-stream", metadata=None):
+        self._version += 1
+        self.blobs[blob_name] = (data, content_type, f'"0x{self._version}"', metadata or {})
+
+    async def get_blob_properties(self, container_name, blob_name):
+        if blob_name not in self.blobs:
+            raise ResourceNotFoundError("BlobNotFound")
+        data, content_type, etag, metadata = self.blobs[blob_name]
+        return SimpleNamespace(name=blob_name, size=len(data), etag=etag, metadata=metadata,
+                               content_settings=SimpleNamespace(content_type=content_type))
+
+    async def stream_blob(self, container_name, blob_name, offset=None, length=None, etag=None):
+        assert etag == self.blobs[blob_name][2]
+        yield self.blobs[blob_name][0]
+
+    async def upload_blob(self, container_name, blob_name, file_data, metadata=None):
+        self.uploads.append(blob_name)
+        self.put(blob_name, file_data.getvalue(), metadata=metadata)
+
+
+def test_should_convert_once_and_reconvert_when_the_source_changes():
+    """
+    GIVEN a CSV blob
+    WHEN its parquet copy is requested twice, then again after the CSV is overwritten
+    THEN the copy should be built once per source version and hold the current data
+    """
+    # Arrange
+    manager = InMemoryStorageManager()
+    manager.put("reports/q1.csv", b"id,amount\n1,10.5\n2,20.0\n", content_type="text/csv")
+    store = DerivedParquetStore(manager)
+
+    async def run():
+        first = await store.get_parquet_blob("exports", "reports/q1.csv")
+        second = await store.get_parquet_blob("exports", "reports/q1.csv")
+        manager.put("reports/q1.csv", b"id,amount\n3,30.0\n", content_type="text/csv")
+        third = await store.get_parquet_blob("exports", "reports/q1.csv")
+        return first, second, third
+
+    # Act
+    first, second, third = asyncio.run(run())
+
+    # Assert
+    assert first.name == second.name == third.name == "_derived/reports/q1.csv.parquet"
+    assert manager.uploads == ["_derived/reports/q1.csv.parquet"] * 2
+    table = pq.read_table(BytesIO(manager.blobs[third.name][0]))
+    assert table.column("id").to_pylist() == [3]
+    assert third.metadata["source_etag"] == manager.blobs["reports/q1.csv"][2]
+
+
+def test_should_convert_first_sheet_of_excel_workbook(tmp_path):
+    import pandas as pd
+    workbook = tmp_path / "data.xlsx"
+    pd.DataFrame({"id": [1, 2], "name": ["Alice", "Bob"]}).to_excel(workbook, index=False)
+    manager = InMemoryStorageManager()
+    manager.put("data.xlsx", workbook.read_bytes(),
+                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    properties = asyncio.run(DerivedParquetStore(manager).get_parquet_blob("exports", "data.xlsx"))
+
+    table = pq.read_table(BytesIO(manager.blobs[properties.name][0]))
+    assert table.column("name").to_pylist() == ["Alice", "Bob"]
+
+
+def test_should_leave_parquet_blobs_alone():
+    manager = InMemoryStorageManager()
+    manager.put("facts.parquet", b"PAR1")
+
+    properties = asyncio.run(DerivedParquetStore(manager).get_parquet_blob("exports", "facts.parquet"))
+
+    assert properties.name == "facts.parquet"
+    assert manager.uploads == []
+
+
+def test_loader_should_read_through_the_copy_and_deletes_should_remove_it():
+    """
+    GIVEN a local storage manager with a derived parquet store and a CSV blob
+    WHEN the blob is loaded with BlobDataLoader and then deleted
+    THEN the load should read the parquet copy, and the copy should be deleted along with the CSV
+    """
+    # Arrange
+    manager = create_local_storage_manager()
+    manager.set_derived_parquet_store(DerivedParquetStore(manager))
+
+    async def run():
+        await manager.upload_blob("exports", "q1.csv", BytesIO(b"id,amount\n1,10.5\n2,20.0\n"))
+        frame = await BlobDataLoader.load_blob(manager, "exports", "q1.csv")
+        copies = await manager.list_blobs("exports")
+        await manager.delete_blob("exports", "q1.csv")
+        return frame, copies, await manager.list_blobs("exports")
+
+    # Act
+    frame, copies, remaining = asyncio.run(run())
+
+    # Assert
+    assert frame["id"].tolist() == [1, 2]
+    assert sorted(copies) == ["_derived/q1.csv.parquet", "q1.csv"]
+    assert remaining == []
+
+
+def test_should_only_delete_copies_that_exist():
+    """
+    GIVEN a derived parquet store and a prefix holding one converted CSV and many parquet blobs
+    WHEN the prefix is deleted
+    THEN only the existing copy should be deleted, without a delete for blobs that never had one
+    """
+    # Arrange
+    manager = create_local_storage_manager()
+    manager.set_derived_parquet_store(DerivedParquetStore(manager))
+    deleted = []
+    delete_blobs = manager.delete_blobs
+
+    async def recording_delete_blobs(container_name, blob_names):
+        deleted.append(sorted(blob_names))
+        return await delete_blobs(container_name, blob_names)
+
+    async def run():
+        await manager.upload_blob("exports", "spark/q1.csv", BytesIO(b"id\n1\n"))
+        for index in range(3):
+            await manager.upload_blob("exports", f"spark/part-{index}.parquet", BytesIO(b"PAR1"))
+        await BlobDataLoader.load_blob(manager, "exports", "spark/q1.csv")
+        manager.delete_blobs = recording_delete_blobs
+        await manager.delete_blobs_by_prefix("exports", "spark/")
+        return await manager.list_blobs("exports")
+
+    # Act
+    remaining = asyncio.run(run())
+
+    # Assert
+    assert remaining == []
+    assert ["_derived/spark/q1.csv.parquet"] in deleted
+    assert not any(name.startswith("_derived/spark/part-") for names in deleted for name in names)
@@ -0,0 +1,134 @@
+import asyncio
+import os
+from io import BytesIO
+
+import pytest
+
+from m365server.azure_interface.aio import create_local_storage_manager
+from m365server.azure_interface.disk_cache import DiskBlobCache
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def fill(cache, blob_name, etag, *parts):
+    async for _ in cache.tee("c", blob_name, etag, chunks(*parts)):
+        pass
+    return cache._path("c", blob_name, etag)
+
+
+def test_should_store_versions_by_etag_and_invalidate_them(tmp_path):
+    async def scenario():
+        cache = DiskBlobCache(str(tmp_path), max_total_bytes=1000)
+        miss = await cache.get("c", "a.bin", '"1"')
+        path = await fill(cache, "a.bin", '"1"', b"abc", b"def")
+        await fill(cache, "a.bin", '"2"', b"new")
+        hit = await cache.get("c", "a.bin", '"1"')
+        await cache.invalidate("c", "a.bin")
+        return miss, path, hit, await cache.get("c", "a.bin", '"2"'), await cache.stats()
+
+    miss, path, hit, invalidated, stats = asyncio.run(scenario())
+    assert miss is None and invalidated is None
+    assert hit == path
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["bytes"]) == (1, 2, 0, 0)
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_should_evict_least_recently_used_entries(tmp_path):
+    async def scenario():
+        cache = DiskBlobCache(str(tmp_path), max_total_bytes=300)
+        for index, name in enumerate(["a", "b", "c"]):
+            path = await fill(cache, name, '"1"', b"x" * 100)
+            os.utime(path, (index, index))
+        await cache.get("c", "a", '"1"')
+        await fill(cache, "d", '"1"', b"x" * 100)
+        return [name for name in "abcd" if await cache.get("c", name, '"1"')]
+
+    assert asyncio.run(scenario()) == ["a", "c", "d"]
+
+
+def test_should_not_leave_partial_entries_when_a_fill_fails(tmp_path):
+    async def failing():
+        yield b"partial"
+        raise ConnectionError("connection reset")
+
+    async def scenario():
+        cache = DiskBlobCache(str(tmp_path))
+        with pytest.raises(ConnectionError):
+            async for _ in cache.tee("c", "a.bin", '"1"', failing()):
+                pass
+        return await cache.get("c", "a.bin", '"1"')
+
+    assert asyncio.run(scenario()) is None
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_should_read_through_the_disk_cache_and_drop_overwritten_blobs(tmp_path):
+    async def scenario():
+        manager = create_local_storage_manager()
+        manager.set_disk_cache(DiskBlobCache(str(tmp_path), min_entry_bytes=10))
+        await manager.upload_blob("lake", "big.parquet", BytesIO(b"p" * 64))
+        await manager.upload_blob("lake", "small.txt", BytesIO(b"s"))
+        first = await manager.download_blob("lake", "big.parquet")
+        second = await manager.download_blob("lake", "big.parquet")
+        small = await manager.download_blob("lake", "small.txt")
+        await manager.upload_blob("lake", "big.parquet", BytesIO(b"q" * 64))
+        stats = await manager.disk_cache.stats()
+        return first, second, small, stats, await manager.download_blob("lake", "big.parquet")
+
+    first, second, small, stats, changed = asyncio.run(scenario())
+    assert first == second == b"p" * 64 and small == b"s"
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 0)
+    assert changed == b"q" * 64
+
+
+def test_should_pass_chunks_on_while_filling_and_keep_partial_reads_out(tmp_path):
+    async def scenario():
+        cache = DiskBlobCache(str(tmp_path))
+        streamed = [chunk async for chunk in cache.tee("c", "a.bin", '"1"', chunks(b"abc", b"def"))]
+        early = cache.tee("c", "b.bin", '"1"', chunks(b"abc", b"def"))
+        await anext(early)
+        await early.aclose()
+        return streamed, await cache.get("c", "a.bin", '"1"'), await cache.get("c", "b.bin", '"1"')
+
+    streamed, filled, abandoned = asyncio.run(scenario())
+    assert streamed == [b"abc", b"def"]
+    assert open(filled, "rb").read() == b"abcdef" and abandoned is None
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_should_download_from_storage_when_the_entry_vanishes_after_lookup(tmp_path):
+    async def scenario():
+        manager = create_local_storage_manager()
+        manager.set_disk_cache(DiskBlobCache(str(tmp_path)))
+        await manager.upload_blob("lake", "big.parquet", BytesIO(b"p" * 64))
+        await manager.download_blob("lake", "big.parquet")
+        get = manager.disk_cache.get
+
+        async def evicted_get(container_name, blob_name, etag):
+            path = await get(container_name, blob_name, etag)
+            os.remove(path)
+            return path
+
+        manager.disk_cache.get = evicted_get
+        return await manager.download_blob("lake", "big.parquet")
+
+    assert asyncio.run(scenario()) == b"p" * 64
+
+
+def test_should_rescan_only_when_the_running_total_exceeds_the_budget(tmp_path, monkeypatch):
+    scans = []
+    scan = DiskBlobCache._scan
+    monkeypatch.setattr(DiskBlobCache, "_scan", lambda self: scans.append(1) or scan(self))
+
+    async def scenario():
+        cache = DiskBlobCache(str(tmp_path), max_total_bytes=300)
+        for name in "abc":
+            await fill(cache, name, '"1"', b"x" * 100)
+        filled = len(scans)
+        await fill(cache, "d", '"1"', b"x" * 100)
+        return filled, len(scans)
+
+    assert asyncio.run(scenario()) == (1, 2)
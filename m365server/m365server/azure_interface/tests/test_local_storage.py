@@ -0,0 +1,126 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from azure.core.exceptions import ResourceModifiedError, ResourceNotFoundError
+
+from m365server.azure_interface.aio import create_local_storage_manager
+from m365server.azure_interface.blob_data_loader import BlobDataLoader
+from m365server.azure_interface.configuration import AzureBlobStorageConfig
+
+
+@pytest.fixture(params=["memory", "filesystem"])
+def manager_factory(request, tmp_path):
+    config = AzureBlobStorageConfig(storage_account_key="", storage_account_name="local",
+                                    upload_block_size=1024, download_chunk_size=1000)
+    root = str(tmp_path / "storage") if request.param == "filesystem" else None
+    return lambda: create_local_storage_manager(root, config)
+
+
+def run(manager_factory, scenario):
+    async def main():
+        manager = manager_factory()
+        try:
+            return await scenario(manager)
+        finally:
+            await manager.close()
+    return asyncio.run(main())
+
+
+def test_should_round_trip_blobs_with_properties_and_metadata(manager_factory):
+    data = bytes(range(256)) * 20
+
+    async def scenario(manager):
+        await manager.upload_blob("reports", "q1/data.csv", BytesIO(b"a,b\n1,2\n"), metadata={"source": "crm"})
+        await manager.upload_blob("reports", "q1/blob.bin", BytesIO(data))
+        properties = await manager.get_blob_properties("reports", "q1/data.csv")
+        chunks = [chunk async for chunk in manager.stream_blob("reports", "q1/blob.bin")]
+        return properties, chunks, await manager.download_blob("reports", "q1/data.csv")
+
+    properties, chunks, csv = run(manager_factory, scenario)
+    assert (properties.size, properties.metadata) == (8, {"source": "crm"})
+    assert properties.content_settings.content_type == "text/csv"
+    assert BlobDataLoader.get_pandas_loader(properties.content_settings.content_type) == "read_csv"
+    assert [len(chunk) for chunk in chunks] == [1000] * 5 + [120]
+    assert b"".join(chunks) == data
+    assert csv == b"a,b\n1,2\n"
+
+
+def test_should_read_ranges_pinned_to_etag(manager_factory):
+    async def scenario(manager):
+        await manager.upload_blob("reports", "blob.bin", BytesIO(b"0123456789"))
+        etag = (await manager.get_blob_properties("reports", "blob.bin")).etag
+        ranged = b"".join([chunk async for chunk in manager.stream_blob("reports", "blob.bin", offset=3, length=4, etag=etag)])
+        await manager.upload_blob("reports", "blob.bin", BytesIO(b"changed"))
+        with pytest.raises(ResourceModifiedError):
+            [chunk async for chunk in manager.stream_blob("reports", "blob.bin", etag=etag)]
+        with pytest.raises(ResourceNotFoundError):
+            await manager.get_blob_properties("reports", "missing.bin")
+        return ranged, etag, (await manager.get_blob_properties("reports", "blob.bin")).etag
+
+    ranged, first_etag, second_etag = run(manager_factory, scenario)
+    assert ranged == b"3456"
+    assert first_etag != second_etag
+
+
+def test_should_upload_streams_in_blocks(manager_factory, tmp_path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"z" * 5000)
+
+    async def scenario(manager):
+        await manager.upload_blob("uploads", "from-path.bin", str(source))
+        with open(source, "rb") as file:
+            await manager.upload_blob("uploads", "from-file.bin", file)
+        return [(await manager.get_blob_properties("uploads", name)).size for name in ("from-path.bin", "from-file.bin")]
+
+    assert run(manager_factory, scenario) == [5000, 5000]
+
+
+def test_should_page_listings_with_prefixes_and_delimiters(manager_factory):
+    async def scenario(manager):
+        for name in ["a.csv", "b.csv", "spark/_temporary/0", "spark/part-0.parquet", "spark/part-1.parquet", "z.csv"]:
+            await manager.upload_blob("lake", name, BytesIO(b"x"))
+        pages = [page async for page in manager.iter_blob_pages("lake", page_size=2)]
+        hierarchical = await manager.list_blobs_page("lake", delimiter="/")
+        nested = await manager.list_blobs_page("lake", prefix="spark/", delimiter="/")
+        resumed = await manager.list_blobs_page("lake", page_size=2, continuation_token=pages[0].continuation_token)
+        with pytest.raises(ResourceNotFoundError):
+            await manager.list_blobs_page("missing")
+        return pages, hierarchical, nested, resumed, await manager.list_containers()
+
+    pages, hierarchical, nested, resumed, containers = run(manager_factory, scenario)
+    assert [[blob.name for blob in page.blobs] for page in pages] == [
+        ["a.csv", "b.csv"], ["spark/_temporary/0", "spark/part-0.parquet"], ["spark/part-1.parquet", "z.csv"]
+    ]
+    assert [page.continuation_token for page in pages] == ["b.csv", "spark/part-0.parquet", None]
+    assert ([blob.name for blob in hierarchical.blobs], hierarchical.prefixes) == (["a.csv", "b.csv", "z.csv"], ["spark/"])
+    assert nested.prefixes == ["spark/_temporary/"]
+    assert [blob.name for blob in resumed.blobs] == ["spark/_temporary/0", "spark/part-0.parquet"]
+    assert containers == ["lake"]
+
+
+def test_should_delete_blobs_and_report_missing_ones(manager_factory):
+    async def scenario(manager):
+        for name in ["logs/1", "logs/2", "keep"]:
+            await manager.upload_blob("data", name, BytesIO(b"x"))
+        single = await manager.delete_blob("data", "keep")
+        results = await manager.delete_blobs("data", ["logs/1", "missing"])
+        by_prefix = await manager.delete_blobs_by_prefix("data", "logs/")
+        return results, by_prefix, await manager.list_blobs("data")
+
+    results, by_prefix, remaining = run(manager_factory, scenario)
+    assert [(result.blob_name, result.status_code) for result in results] == [("logs/1", 202), ("missing", 404)]
+    assert [result.blob_name for result in by_prefix] == ["logs/2"]
+    assert remaining == []
+
+
+def test_should_keep_container_stats_in_step(manager_factory):
+    async def scenario(manager):
+        await manager.upload_blob("stats", "a.bin", BytesIO(b"x" * 10))
+        first = (await manager.get_container_stats(["stats"]))[0]
+        await manager.upload_blob("stats", "b.bin", BytesIO(b"x" * 5))
+        return first, (await manager.get_container_stats(["stats"]))[0]
+
+    first, second = run(manager_factory, scenario)
+    assert (first.blob_count, first.total_bytes) == (1, 10)
+    assert (second.blob_count, second.total_bytes) == (2, 15)
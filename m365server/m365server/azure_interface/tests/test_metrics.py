@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from m365server.azure_interface.metrics import azure_call, record_cache_lookups
+
+
+def calls(operation: str, outcome: str) -> float:
+    return REGISTRY.get_sample_value("m365server_azure_call_duration_seconds_count",
+                                     {"operation": operation, "outcome": outcome}) or 0.0
+
+
+def seconds(operation: str, outcome: str) -> float:
+    return REGISTRY.get_sample_value("m365server_azure_call_duration_seconds_sum",
+                                     {"operation": operation, "outcome": outcome}) or 0.0
+
+
+def test_should_record_outcome_of_coroutines():
+    @azure_call("test_coroutine")
+    async def call(fail: bool) -> str:
+        if fail:
+            raise ValueError("boom")
+        return "done"
+
+    assert asyncio.run(call(False)) == "done"
+    with pytest.raises(ValueError):
+        asyncio.run(call(True))
+
+    assert calls("test_coroutine", "ok") == 1
+    assert calls("test_coroutine", "error") == 1
+
+
+def test_should_time_streams_to_their_first_chunk_and_close_them():
+    closed = []
+
+    @azure_call("test_stream")
+    async def stream():
+        try:
+            await asyncio.sleep(0.05)
+            for chunk in (b"a", b"b", b"c"):
+                yield chunk
+        finally:
+            closed.append(True)
+
+    async def consume_slowly():
+        chunks = stream()
+        first = await anext(chunks)
+        await asyncio.sleep(0.2)
+        await chunks.aclose()
+        return first
+
+    assert asyncio.run(consume_slowly()) == b"a"
+    assert closed == [True]
+    assert calls("test_stream", "ok") == 1
+    assert 0.05 <= seconds("test_stream", "ok") < 0.2
+
+
+def test_should_time_sync_generators_and_context_blocks():
+    @azure_call("test_generator")
+    def generator():
+        raise ConnectionError("reset")
+        yield b""
+
+    with pytest.raises(ConnectionError):
+        list(generator())
+    with azure_call("test_block"):
+        time.sleep(0.01)
+
+    assert calls("test_generator", "error") == 1
+    assert calls("test_block", "ok") == 1
+    assert seconds("test_block", "ok") >= 0.01
+
+
+def test_should_count_cache_hits_and_misses():
+    record_cache_lookups("test_cache", hits=3, misses=1)
+    record_cache_lookups("test_cache", misses=0)
+
+    def lookups(result: str) -> float:
+        return REGISTRY.get_sample_value("m365server_cache_lookups_total", {"cache": "test_cache", "result": result})
+
+    assert (lookups("hit"), lookups("miss")) == (3, 1)
@@ -0,0 +1,98 @@
+import asyncio
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fakeredis import FakeAsyncRedis
+from types import SimpleNamespace
+
+from m365server.azure_interface.blob_listing import BlobEntry
+from m365server.azure_interface.parquet_metadata import (FOOTER_TAIL_BYTES, InvalidParquetError, ParquetMetadataCache,
+                                                         ParquetMetadataReader)
+
+
+def _parquet(rows: int, columns: int = 2, row_group_size: int = 100) -> bytes:
+    table = pa.table({f"c{i}": pa.array(range(rows), type=pa.int64()) for i in range(columns)})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=row_group_size)
+    return buffer.getvalue()
+
+
+class RangeRecordingManager:
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.ranges = []
+
+    async def get_blob_properties(self, container_name, blob_name):
+        return SimpleNamespace(size=len(self.blobs[blob_name]), etag='"0x1"')
+
+    async def stream_blob(self, container_name, blob_name, offset=None, length=None, etag=None):
+        self.ranges.append((blob_name, offset, length))
+        yield self.blobs[blob_name][offset:offset + length]
+
+
+def test_should_read_only_the_tail_and_serve_repeats_from_cache():
+    """
+    GIVEN a parquet blob larger than the tail read
+    WHEN its metadata is requested twice
+    THEN one tail range should be read and the second request should be served from Redis
+    """
+    # Arrange
+    blob = _parquet(rows=200_000, row_group_size=10_000)
+    manager = RangeRecordingManager({"facts.parquet": blob})
+    reader = ParquetMetadataReader(manager, ParquetMetadataCache(FakeAsyncRedis()))
+
+    async def run():
+        return await reader.get("exports", "facts.parquet"), await reader.get("exports", "facts.parquet")
+
+    # Act
+    first, second = asyncio.run(run())
+
+    # Assert
+    assert len(blob) > FOOTER_TAIL_BYTES
+    assert manager.ranges == [("facts.parquet", len(blob) - FOOTER_TAIL_BYTES, FOOTER_TAIL_BYTES)]
+    assert first == second
+    assert first["num_rows"] == 200_000
+    assert first["num_row_groups"] == 20
+    assert first["row_groups"][1]["columns"][0]["min"] == 10_000
+    assert first["schema"][0] == {"name": "c0", "type": "int64", "nullable": True}
+
+
+def test_should_make_a_second_read_for_footers_larger_than_the_tail():
+    blob = _parquet(rows=20_000, columns=40, row_group_size=100)
+    manager = RangeRecordingManager({"wide.parquet": blob})
+
+    summary = asyncio.run(ParquetMetadataReader(manager).get("exports", "wide.parquet"))
+
+    assert summary["footer_size"] > FOOTER_TAIL_BYTES
+    assert len(manager.ranges) == 2
+    assert summary["num_columns"] == 40
+
+
+def test_should_describe_many_blobs_and_report_invalid_ones():
+    blobs = {"a.parquet": _parquet(10), "b.parquet": _parquet(20), "bad.parquet": b"not a parquet file"}
+    manager = RangeRecordingManager(blobs)
+    cache = ParquetMetadataCache(FakeAsyncRedis())
+    reader = ParquetMetadataReader(manager, cache)
+    entries = [BlobEntry(name, len(data), '"0x1"') for name, data in blobs.items()]
+
+    async def run():
+        first = await reader.get_many("exports", entries)
+        manager.ranges.clear()
+        second = await reader.get_many("exports", entries)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [summary.get("num_rows") for summary in first] == [10, 20, None]
+    assert "error" in first[2]
+    # Only the invalid blob, which is never cached, is read again.
+    assert [name for name, _, _ in manager.ranges] == ["bad.parquet"]
+    assert second[:2] == first[:2]
+
+
+def test_should_reject_blobs_without_parquet_footer():
+    manager = RangeRecordingManager({"data.csv": b"id,name\n1,Alice\n"})
+    with pytest.raises(InvalidParquetError):
+        asyncio.run(ParquetMetadataReader(manager).get("exports", "data.csv"))
@@ -0,0 +1,186 @@
+import asyncio
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+from azure.core.exceptions import HttpResponseError, ResourceModifiedError, ResourceNotFoundError
+from prometheus_client import REGISTRY
+
+from m365server.azure_interface.aio import ResiliencePolicy, ResilientContainerManager, create_local_storage_manager
+from m365server.azure_interface.aio.blob_operations import ResilientDownloadStrategy
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def http_error(status: int, retry_after: str = None) -> HttpResponseError:
+    response = Mock(status_code=status, headers={"Retry-After": retry_after} if retry_after else {}, reason="error")
+    error = HttpResponseError(message=f"status {status}", response=response)
+    error.status_code = status
+    return error
+
+
+def flaky(*outcomes):
+    """
+    Returns an async function producing the given outcomes in turn, raising those that are exceptions.
+    """
+    calls = []
+
+    async def fn():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, tuple):
+            await asyncio.sleep(outcome[0])
+            outcome = outcome[1]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    fn.calls = calls
+    return fn
+
+
+def test_should_retry_throttling_and_server_errors_with_backoff():
+    policy = ResiliencePolicy(max_attempts=3, backoff_base_seconds=0.001)
+    fn = flaky(http_error(503), http_error(500), "data")
+    before = sample("m365server_azure_retries_total", operation="download", reason="503")
+
+    assert run(policy.call("download", fn)) == "data"
+    assert len(fn.calls) == 3
+    assert sample("m365server_azure_retries_total", operation="download", reason="503") == before + 1
+
+
+def test_should_not_retry_other_errors_and_give_up_after_max_attempts():
+    policy = ResiliencePolicy(max_attempts=2, backoff_base_seconds=0.001)
+    missing = flaky(ResourceNotFoundError("gone"))
+    throttled = flaky(http_error(503), http_error(503), "data")
+
+    with pytest.raises(ResourceNotFoundError):
+        run(policy.call("get_properties", missing))
+    with pytest.raises(HttpResponseError):
+        run(policy.call("get_properties", throttled))
+    assert (len(missing.calls), len(throttled.calls)) == (1, 2)
+
+
+def test_should_honour_retry_after_up_to_the_maximum_backoff():
+    policy = ResiliencePolicy(backoff_base_seconds=0.1, backoff_max_seconds=5)
+
+    assert policy.backoff(1, http_error(503, retry_after="2")) == 2
+    assert policy.backoff(1, http_error(503, retry_after="60")) == 5
+    assert all(0 <= policy.backoff(3, http_error(503)) <= 0.4 for _ in range(20))
+
+
+def test_should_retry_attempts_that_exceed_the_operation_timeout():
+    policy = ResiliencePolicy(max_attempts=2, backoff_base_seconds=0.001, timeouts={"get_properties": 0.02})
+    fn = flaky((1.0, "slow"), "fast")
+
+    assert run(policy.call("get_properties", fn)) == "fast"
+
+
+def test_should_take_whichever_hedged_read_finishes_first():
+    policy = ResiliencePolicy(hedge_after_seconds=0.02)
+    discarded = []
+
+    async def discard(result):
+        discarded.append(result)
+
+    before = sample("m365server_azure_hedged_reads_total", operation="get_properties", winner="hedge")
+    slow_then_fast = flaky((1.0, "primary"), (0.0, "hedge"))
+    fast = flaky("primary")
+
+    assert run(policy.call("get_properties", slow_then_fast, discard)) == "hedge"
+    assert run(policy.call("get_properties", fast)) == "primary"
+    assert len(fast.calls) == 1 and discarded == []
+    assert sample("m365server_azure_hedged_reads_total", operation="get_properties", winner="hedge") == before + 1
+
+
+def test_should_not_hedge_whole_blob_downloads():
+    policy = ResiliencePolicy(hedge_after_seconds=0.01)
+    slow = flaky((0.05, "data"), (0.0, "duplicate"))
+
+    assert run(policy.call("download", slow)) == "data"
+    assert len(slow.calls) == 1
+
+
+class FailingStreams:
+    """
+    Wraps a download strategy so that the first stream fails after delivering fail_after chunks.
+    """
+
+    def __init__(self, strategy, fail_after: int) -> None:
+        self.strategy = strategy
+        self.fail_after = fail_after
+        self.opened = []
+
+    async def get_blob_properties(self, container_client, blob_name):
+        return await self.strategy.get_blob_properties(container_client, blob_name)
+
+    async def stream_blob(self, container_client, blob_name, offset=None, length=None, etag=None):
+        self.opened.append((offset, length))
+        chunks = self.strategy.stream_blob(container_client, blob_name, offset=offset, length=length, etag=etag)
+        delivered = 0
+        async for chunk in chunks:
+            if len(self.opened) == 1 and delivered == self.fail_after:
+                raise http_error(503)
+            delivered += 1
+            yield chunk
+
+
+def test_should_resume_an_etag_pinned_stream_where_it_failed():
+    data = bytes(range(256)) * 64
+    manager = create_local_storage_manager()
+    run(manager.upload_blob("lake", "data.bin", BytesIO(data)))
+    manager.download_strategy.chunk_size = 1024
+    streams = FailingStreams(manager.download_strategy, fail_after=3)
+    manager.set_download_strategy(ResilientDownloadStrategy(streams, ResiliencePolicy(backoff_base_seconds=0.001)))
+
+    async def scenario():
+        properties = await manager.get_blob_properties("lake", "data.bin")
+        return b"".join([chunk async for chunk in manager.stream_blob("lake", "data.bin", offset=100, length=8000,
+                                                                      etag=properties.etag)])
+
+    assert run(scenario()) == data[100:8100]
+    assert streams.opened == [(100, 8000), (100 + 3 * 1024, 8000 - 3 * 1024)]
+
+
+def test_should_not_retry_a_stream_whose_blob_changed():
+    manager = create_local_storage_manager()
+    run(manager.upload_blob("lake", "data.bin", BytesIO(b"data")))
+    manager.set_download_strategy(ResilientDownloadStrategy(manager.download_strategy, ResiliencePolicy()))
+
+    async def scenario():
+        return [chunk async for chunk in manager.stream_blob("lake", "data.bin", etag='"stale"')]
+
+    with pytest.raises(ResourceModifiedError):
+        run(scenario())
+
+
+def test_should_retry_a_failed_listing_page_from_its_continuation_token():
+    manager = create_local_storage_manager()
+    for index in range(5):
+        run(manager.upload_blob("lake", f"blob-{index}", BytesIO(b"x")))
+    inner = manager.container_manager
+    requested = []
+
+    async def iter_blob_pages(container_name, prefix=None, delimiter=None, page_size=None, continuation_token=None):
+        requested.append(continuation_token)
+        if len(requested) == 3:
+            raise http_error(500)
+        async for page in inner.iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token):
+            yield page
+
+    flaky_listing = Mock(wraps=inner)
+    flaky_listing.iter_blob_pages = iter_blob_pages
+    manager.set_container_manager(ResilientContainerManager(flaky_listing, ResiliencePolicy(backoff_base_seconds=0.001)))
+
+    async def scenario():
+        return [page async for page in manager.iter_blob_pages("lake", page_size=2)]
+
+    pages = run(scenario())
+    assert [blob.name for page in pages for blob in page.blobs] == [f"blob-{index}" for index in range(5)]
+    assert requested[2] == requested[3] == pages[1].continuation_token
@@ -0,0 +1,154 @@
+import asyncio
+from io import BytesIO
+
+from m365server.azure_interface.aio import SingleFlight, create_local_storage_manager
+
+
+class Source:
+    """
+    A stream that counts how often it is opened, the chunks it produced and whether it was closed early.
+    """
+
+    def __init__(self, chunks, delay=0.01, fail_after=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.fail_after = fail_after
+        self.opened = 0
+        self.produced = 0
+        self.closed_early = False
+
+    async def __call__(self):
+        self.opened += 1
+        finished = False
+        try:
+            for index, chunk in enumerate(self.chunks):
+                if index == self.fail_after:
+                    raise ConnectionError("connection reset")
+                await asyncio.sleep(self.delay)
+                self.produced += 1
+                yield chunk
+            finished = True
+        finally:
+            self.closed_early = self.closed_early or not finished
+
+
+async def drain(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+def test_should_share_one_call_between_concurrent_callers():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "properties"
+
+    async def scenario():
+        flights = SingleFlight()
+        first = asyncio.create_task(flights.call("get_properties", ("c", "a"), fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.gather(*(flights.call("get_properties", ("c", "a"), fetch) for _ in range(9)))
+        after = await flights.call("get_properties", ("c", "a"), fetch)
+        return results, after
+
+    results, after = asyncio.run(scenario())
+    assert results == ["properties"] * 9 and after == "properties"
+    assert len(calls) == 2
+
+
+def test_should_fan_one_stream_out_to_every_subscriber():
+    source = Source([b"a" * 10, b"b" * 10, b"c" * 10])
+
+    async def scenario():
+        flights = SingleFlight()
+        first = flights.stream("stream", ("c", "a"), source)
+        reader = asyncio.create_task(drain(first))
+        await asyncio.sleep(0.005)
+        late = [flights.stream("stream", ("c", "a"), source) for _ in range(5)]
+        return await asyncio.gather(reader, *(drain(stream) for stream in late))
+
+    results = asyncio.run(scenario())
+    assert set(results) == {b"a" * 10 + b"b" * 10 + b"c" * 10}
+    assert source.opened == 1
+
+
+def test_should_read_at_most_one_chunk_ahead_of_the_slowest_subscriber():
+    source = Source([b"x" * 10] * 20, delay=0)
+
+    async def scenario():
+        flights = SingleFlight()
+        fast = flights.stream("stream", ("c", "a"), source)
+        slow = flights.stream("stream", ("c", "a"), source)
+        for _ in range(2):
+            await asyncio.gather(anext(fast), anext(slow))
+        fast_rest = asyncio.create_task(drain(fast))
+        await asyncio.sleep(0.01)
+        produced = source.produced
+        await drain(slow)
+        await fast_rest
+        return produced
+
+    # The two chunks read, the one the slow subscriber reads next and one read ahead.
+    assert asyncio.run(scenario()) == 4
+    assert source.opened == 1
+
+
+def test_should_download_independently_once_the_first_chunk_was_read():
+    source = Source([b"x" * 10] * 4)
+
+    async def scenario():
+        flights = SingleFlight()
+        reader = asyncio.create_task(drain(flights.stream("stream", ("c", "a"), source)))
+        await asyncio.sleep(0.015)
+        late = await drain(flights.stream("stream", ("c", "a"), source))
+        return await reader, late
+
+    assert asyncio.run(scenario()) == (b"x" * 40, b"x" * 40)
+    assert source.opened == 2
+
+
+def test_should_raise_failures_to_every_subscriber():
+    source = Source([b"a", b"b", b"c"], fail_after=1)
+
+    async def scenario():
+        flights = SingleFlight()
+        streams = [flights.stream("stream", ("c", "a"), source) for _ in range(3)]
+        return await asyncio.gather(*(drain(stream) for stream in streams), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert source.opened == 1
+
+
+def test_should_stop_the_download_when_every_subscriber_leaves():
+    source = Source([b"a"] * 100)
+
+    async def scenario():
+        flights = SingleFlight()
+        stream = flights.stream("stream", ("c", "a"), source)
+        assert await anext(stream) == b"a"
+        await stream.aclose()
+        await asyncio.sleep(0.02)
+
+    asyncio.run(scenario())
+    assert source.closed_early
+
+
+def test_manager_should_coalesce_reads_and_forget_them_on_writes():
+    async def scenario():
+        manager = create_local_storage_manager()
+        manager.set_single_flight(SingleFlight())
+        await manager.upload_blob("lake", "a.bin", BytesIO(b"old"))
+        properties = await asyncio.gather(*(manager.get_blob_properties("lake", "a.bin") for _ in range(5)))
+        reader = manager.stream_blob("lake", "a.bin")
+        first = await anext(reader)
+        await manager.upload_blob("lake", "a.bin", BytesIO(b"new"))
+        fresh = await drain(manager.stream_blob("lake", "a.bin"))
+        await reader.aclose()
+        return properties, first, fresh
+
+    properties, first, fresh = asyncio.run(scenario())
+    assert len({id(item) for item in properties}) == 1
+    assert (first, fresh) == (b"old", b"new")
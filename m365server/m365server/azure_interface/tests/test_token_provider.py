@@ -0,0 +1,129 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+import redis
+from azure.core.credentials import AccessToken
+from azure.core.exceptions import ClientAuthenticationError
+from fakeredis import FakeRedis, FakeServer
+
+from m365server.azure_interface.aio import AsyncTokenProvider
+from m365server.azure_interface import token_provider
+from m365server.azure_interface.configuration import ServicePrincipalConfig
+from m365server.azure_interface.token_provider import STORAGE_SCOPE, TokenProvider
+
+SERVICE_PRINCIPAL = ServicePrincipalConfig(client_id="app", client_secret="secret", tenant_id="tenant")
+
+
+def identity_endpoint(expires_in: int = 3600, delay: float = 0.0) -> Mock:
+    issued = []
+
+    def post(url, data, timeout):
+        time.sleep(delay)
+        issued.append(data["scope"])
+        return Mock(status_code=200, json=Mock(return_value={"access_token": f"token-{len(issued)}", "expires_in": expires_in}))
+
+    session = Mock()
+    session.post.side_effect = post
+    session.issued = issued
+    return session
+
+
+def provider(session, redis_client=None, **kwargs) -> TokenProvider:
+    return TokenProvider(SERVICE_PRINCIPAL, redis_client=redis_client, authority_host="login.example", session=session, **kwargs)
+
+
+def test_should_cache_tokens_until_shortly_before_expiry():
+    session = identity_endpoint()
+    with provider(session) as tokens:
+        first, second = tokens.get_token(STORAGE_SCOPE), tokens.get_token(STORAGE_SCOPE)
+
+        assert first.token == second.token == "token-1"
+        assert first.expires_on == pytest.approx(time.time() + 3600, abs=5)
+        assert session.post.call_args.args[0] == "https://login.example/tenant/oauth2/v2.0/token"
+        tokens._tokens[STORAGE_SCOPE] = AccessToken("token-1", int(time.time()) + 10)
+        assert tokens.get_token(STORAGE_SCOPE).token == "token-2"
+        assert tokens.get_auth_header("https://graph.microsoft.com/.default") == {"Authorization": "Bearer token-3"}
+
+
+def test_should_share_tokens_between_workers_through_redis():
+    server = FakeServer()
+    session = identity_endpoint(delay=0.1)
+    workers = [provider(session, FakeRedis(server=server, decode_responses=True)) for _ in range(4)]
+
+    with ThreadPoolExecutor(len(workers)) as pool:
+        tokens = list(pool.map(lambda worker: worker.get_token(STORAGE_SCOPE).token, workers))
+
+    assert tokens == ["token-1"] * 4
+    assert session.issued == [STORAGE_SCOPE]
+    for worker in workers:
+        worker.close()
+
+
+def test_should_refresh_in_the_background_ahead_of_expiry(monkeypatch):
+    monkeypatch.setattr(token_provider.random, "uniform", lambda low, high: high)
+    session = identity_endpoint(expires_in=63)
+    with provider(session, FakeRedis(decode_responses=True), refresh_before_seconds=62) as tokens:
+        assert tokens.get_token(STORAGE_SCOPE).token == "token-1"
+        deadline = time.monotonic() + 5
+        while tokens.cached_token(STORAGE_SCOPE).token == "token-1" and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert tokens.cached_token(STORAGE_SCOPE).token == "token-2"
+
+
+def test_should_request_tokens_directly_when_redis_is_unavailable():
+    redis_client = Mock()
+    redis_client.get.side_effect = redis.ConnectionError("down")
+    session = identity_endpoint()
+    with provider(session, redis_client) as tokens:
+        assert tokens.get_token(STORAGE_SCOPE).token == "token-1"
+
+
+def test_should_raise_authentication_errors():
+    session = Mock()
+    session.post.return_value = Mock(status_code=401, json=Mock(return_value={"error_description": "bad secret"}))
+    with provider(session) as tokens, pytest.raises(ClientAuthenticationError, match="bad secret"):
+        tokens.get_token(STORAGE_SCOPE)
+
+
+def test_async_adapter_should_serve_cached_tokens():
+    session = identity_endpoint()
+
+    async def scenario(credential):
+        return [(await credential.get_token(STORAGE_SCOPE)).token for _ in range(3)]
+
+    with provider(session) as tokens:
+        assert asyncio.run(scenario(AsyncTokenProvider(tokens))) == ["token-1"] * 3
+
+
+def test_should_encrypt_shared_tokens_with_the_client_secret():
+    server = FakeServer()
+    session = identity_endpoint()
+    with provider(session, FakeRedis(server=server, decode_responses=True)) as tokens:
+        tokens.get_token(STORAGE_SCOPE)
+    reader = FakeRedis(server=server, decode_responses=True)
+    values = [reader.get(key) for key in reader.keys("tokens:*")]
+    rotated = ServicePrincipalConfig(client_id="app", client_secret="rotated", tenant_id="tenant")
+
+    with TokenProvider(rotated, redis_client=reader, authority_host="login.example", session=session) as tokens:
+        assert tokens.get_token(STORAGE_SCOPE).token == "token-2"
+    assert len(values) == 1 and "token-1" not in values[0]
+
+
+def test_should_release_only_its_own_refresh_lock():
+    redis_client = FakeRedis(decode_responses=True)
+    session = identity_endpoint()
+
+    def post(url, data, timeout):
+        # The lock expired while the token was requested and another worker took it.
+        redis_client.set(f"tokens:tenant:app:{data['scope']}:lock", "other-worker")
+        return Mock(status_code=200, json=Mock(return_value={"access_token": "token-1", "expires_in": 3600}))
+
+    session.post.side_effect = post
+    with provider(session, redis_client) as tokens:
+        tokens.get_token(STORAGE_SCOPE)
+
+    assert redis_client.get(f"tokens:tenant:app:{STORAGE_SCOPE}:lock") == "other-worker"
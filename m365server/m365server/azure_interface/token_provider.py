@@ -0,0 +1,307 @@
+import base64
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple
+
+import redis
+import requests
+from azure.core.credentials import AccessToken
+from azure.core.exceptions import ClientAuthenticationError
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from loguru import logger
+
+from m365server.azure_interface.configuration import ServicePrincipalConfig, get_token_cache_config
+
+DEFAULT_AUTHORITY_HOST = "login.microsoftonline.com"
+GRAPH_SCOPE = "https://graph.microsoft.com/.default"
+STORAGE_SCOPE = "https://storage.azure.com/.default"
+
+# Deletes the refresh lock only while it still holds this worker's owner id, in one step, so a worker whose
+# lock expired cannot delete the lock another worker has taken since.
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class TokenProvider:
+    """
+    Caches the client-credential access tokens of one service principal and refreshes them ahead of expiry.
+
+    Tokens are kept in memory and, given a Redis client, in Redis, where every worker using the same
+    service principal finds them. A token is refreshed in the background refresh_before_seconds before
+    it expires; a Redis lock makes sure only one worker asks the identity endpoint while the others wait
+    for its token. Callers only block on the endpoint when no token is cached or the cached one is
+    about to expire.
+
+    Tokens are encrypted with AES-GCM under a key derived from the client secret before they are written
+    to Redis, so the blob cache sharing the instance, or anyone else who can read it, does not get usable
+    bearer tokens. Entries that cannot be decrypted, such as those written before the secret was rotated,
+    are treated as missing.
+
+    Redis failures are logged and the token is requested directly, so authentication keeps working
+    when Redis is unavailable.
+
+    The provider implements the azure.core TokenCredential protocol and can be passed to the Azure SDK
+    clients as their credential.
+    """
+
+    # A token this close to expiry is no longer handed out.
+    MIN_VALIDITY_SECONDS = 30
+
+    def __init__(self, service_principal: ServicePrincipalConfig, redis_client: Optional[redis.Redis] = None,
+                 authority_host: Optional[str] = None, refresh_before_seconds: float = 300.0,
+                 lock_seconds: float = 10.0, namespace: str = "tokens",
+                 session: Optional[requests.Session] = None) -> None:
+        """
+        Initialize the TokenProvider.
+
+        Args:
+            service_principal (ServicePrincipalConfig): The client id, secret and tenant tokens are requested for.
+            redis_client (Optional[redis.Redis]): Client for a Redis connection pool that decodes responses.
+                Tokens are only cached in memory when None.
+            authority_host (Optional[str]): Host of the identity endpoint. Defaults to AZURE_AUTHORITY_HOST,
+                or the public cloud.
+            refresh_before_seconds (float): Seconds before expiry a token is refreshed.
+            lock_seconds (float): Longest time a worker holds the refresh lock, and waits for another worker's refresh.
+            namespace (str): Prefix for every key the provider writes.
+            session (Optional[requests.Session]): Session used to call the identity endpoint.
+        """
+        self.service_principal = service_principal
+        self.redis = redis_client
+        authority_host = authority_host or os.getenv("AZURE_AUTHORITY_HOST") or DEFAULT_AUTHORITY_HOST
+        self.authority_host = authority_host.rstrip("/") if "://" in authority_host else f"https://{authority_host.rstrip('/')}"
+        self.refresh_before_seconds = refresh_before_seconds
+        self.lock_seconds = lock_seconds
+        self.namespace = namespace
+        self.session = session or requests.Session()
+        self._tokens: Dict[str, AccessToken] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._guard = threading.Lock()
+        self._closed = False
+        self._cipher = AESGCM(HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b"m365server token cache")
+                              .derive((service_principal.client_secret or "").encode()))
+        self._release_lock = redis_client.register_script(RELEASE_LOCK_SCRIPT) if redis_client is not None else None
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, **kwargs) -> AccessToken:
+        """
+        Returns an access token for the given scopes, from the cache unless it is about to expire.
+
+        Args:
+            scopes (str): The scopes the token is for; client credentials accept a single '/.default' scope.
+            claims (Optional[str]): Additional claims requested by a resource, which bypass the cache.
+
+        Returns:
+            AccessToken: The token and its expiry as a Unix timestamp.
+        """
+        scope = " ".join(scopes)
+        if claims:
+            return self._request_token(scope, claims)
+        token = self.cached_token(scope)
+        if token is not None:
+            return token
+        with self._scope_lock(scope):
+            token = self.cached_token(scope)
+            if token is None:
+                token = self._refresh(scope)
+            return token
+
+    def cached_token(self, scope: str) -> Optional[AccessToken]:
+        """
+        Returns the token for scope held in memory, or None when there is none or it is about to expire.
+        """
+        token = self._tokens.get(scope)
+        if token is not None and token.expires_on - time.time() > self.MIN_VALIDITY_SECONDS:
+            return token
+        return None
+
+    def get_auth_header(self, scope: str = GRAPH_SCOPE) -> Dict[str, str]:
+        """
+        Returns an Authorization header carrying a token for scope.
+        """
+        return {"Authorization": f"Bearer {self.get_token(scope).token}"}
+
+    def close(self) -> None:
+        """
+        Stops the background refreshes.
+        """
+        with self._guard:
+            self._closed = True
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+    def __enter__(self) -> "TokenProvider":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _scope_lock(self, scope: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(scope, threading.Lock())
+
+    def _key(self, scope: str) -> str:
+        return f"{self.namespace}:{self.service_principal.tenant_id}:{self.service_principal.client_id}:{scope}"
+
+    def _is_fresh(self, token: Optional[AccessToken]) -> bool:
+        return token is not None and token.expires_on - time.time() > self.refresh_before_seconds
+
+    def _refresh(self, scope: str) -> AccessToken:
+        """
+        Replaces the token for scope with one from Redis when another worker refreshed it already,
+        or else with a new one from the identity endpoint, and schedules its refresh.
+        """
+        token = self._refresh_shared(scope) if self.redis is not None else self._request_token(scope)
+        self._tokens[scope] = token
+        self._schedule_refresh(scope, token)
+        return token
+
+    def _refresh_shared(self, scope: str) -> AccessToken:
+        key = self._key(scope)
+        lock_key = f"{key}:lock"
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_seconds
+        try:
+            while True:
+                token = self._load(key)
+                if self._is_fresh(token):
+                    return token
+                if self.redis.set(lock_key, owner, nx=True, px=int(self.lock_seconds * 1000)):
+                    break
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Timed out waiting for another worker to refresh the token for {scope}")
+                    return self._request_token(scope)
+                time.sleep(0.05)
+        except redis.RedisError as ex:
+            logger.warning(f"Shared token cache unavailable for {scope}: {ex}")
+            return self._request_token(scope)
+
+        try:
+            token = self._request_token(scope)
+            self._store(key, token)
+            return token
+        finally:
+            try:
+                self._release_lock(keys=[lock_key], args=[owner])
+            except redis.RedisError as ex:
+                logger.warning(f"Failed to release the token refresh lock for {scope}: {ex}")
+
+    def _load(self, key: str) -> Optional[AccessToken]:
+        value = self.redis.get(key)
+        if value is None:
+            return None
+        try:
+            sealed = base64.b64decode(value)
+            # The key is authenticated too, so an entry copied to another key does not decrypt.
+            entry = json.loads(self._cipher.decrypt(sealed[:12], sealed[12:], key.encode()))
+        except (InvalidTag, ValueError) as ex:
+            logger.warning(f"Ignoring a shared token for {key} that cannot be decrypted: {type(ex).__name__}")
+            return None
+        return AccessToken(entry["token"], int(entry["expires_on"]))
+
+    def _store(self, key: str, token: AccessToken) -> None:
+        ttl = int(token.expires_on - time.time() - self.MIN_VALIDITY_SECONDS)
+        if ttl <= 0:
+            return
+        nonce = os.urandom(12)
+        plaintext = json.dumps({"token": token.token, "expires_on": token.expires_on}).encode()
+        value = base64.b64encode(nonce + self._cipher.encrypt(nonce, plaintext, key.encode())).decode()
+        try:
+            self.redis.set(key, value, ex=ttl)
+        except redis.RedisError as ex:
+            logger.warning(f"Failed to share the token for {key}: {ex}")
+
+    def _request_token(self, scope: str, claims: Optional[str] = None) -> AccessToken:
+        """
+        Requests a token for scope from the identity endpoint with the client credentials grant.
+        """
+        url = f"{self.authority_host}/{self.service_principal.tenant_id}/oauth2/v2.0/token"
+        data = {
+            "client_id": self.service_principal.client_id,
+            "client_secret": self.service_principal.client_secret,
+            "scope": scope,
+            "grant_type": "client_credentials"
+        }
+        if claims:
+            data["claims"] = claims
+        logger.info(f"Requesting a token for {scope}")
+        requested_at = time.time()
+        try:
+            response = self.session.post(url, data=data, timeout=30)
+            body = response.json()
+        except (requests.RequestException, ValueError) as ex:
+            raise ClientAuthenticationError(message=f"Token request for {scope} failed: {ex}") from ex
+        if response.status_code != 200 or "access_token" not in body:
+            raise ClientAuthenticationError(
+                message=f"Token request for {scope} failed: {body.get('error_description') or response.status_code}"
+            )
+        return AccessToken(body["access_token"], int(requested_at + int(body["expires_in"])))
+
+    def _schedule_refresh(self, scope: str, token: AccessToken) -> None:
+        # Jitter spreads the refreshes of workers that share a token; the lock keeps them to one request anyway.
+        delay = token.expires_on - time.time() - self.refresh_before_seconds * random.uniform(0.8, 1.0)
+        self._start_timer(scope, max(delay, 0.0))
+
+    def _start_timer(self, scope: str, delay: float) -> None:
+        with self._guard:
+            if self._closed:
+                return
+            previous = self._timers.get(scope)
+            if previous is not None:
+                previous.cancel()
+            timer = threading.Timer(delay, self._refresh_in_background, args=(scope,))
+            timer.daemon = True
+            self._timers[scope] = timer
+            timer.start()
+
+    def _refresh_in_background(self, scope: str) -> None:
+        try:
+            with self._scope_lock(scope):
+                self._refresh(scope)
+        except Exception as ex:
+            logger.warning(f"Background refresh of the token for {scope} failed: {ex}")
+            token = self._tokens.get(scope)
+            if token is not None and token.expires_on - time.time() > self.MIN_VALIDITY_SECONDS:
+                self._start_timer(scope, min(30.0, token.expires_on - time.time() - self.MIN_VALIDITY_SECONDS))
+
+
+_providers: Dict[Tuple[str, str, str], TokenProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_token_provider(service_principal: ServicePrincipalConfig) -> TokenProvider:
+    """
+    Returns the TokenProvider of this process for the given service principal, creating it on first use.
+
+    Storage clients and Graph calls share the provider, and with TOKEN_SHARED_CACHE_ENABLED its tokens
+    are shared with the other workers through the Redis pool of m365server.deps.get_cache.
+    """
+    key = (service_principal.tenant_id, service_principal.client_id, service_principal.client_secret)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            config = get_token_cache_config()
+            redis_client = None
+            if config.shared_cache_enabled:
+                # Imported here because m365server.deps imports the storage clients, which import this module.
+                from m365server.deps import get_cache
+                redis_client = get_cache()
+            provider = TokenProvider(
+                service_principal,
+                redis_client=redis_client,
+                refresh_before_seconds=config.refresh_before_seconds,
+                lock_seconds=config.refresh_lock_seconds
+            )
+            _providers[key] = provider
+        return provider
@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """
+    A small thread-safe cache whose entries expire after a fixed time-to-live.
+    """
+
+    def __init__(self, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initialize the TTLCache.
+
+        Args:
+            ttl (float): Number of seconds an entry stays valid after it is stored.
+            clock (Callable[[], float]): Monotonic clock used to timestamp entries.
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[Hashable, Tuple[float, T]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """
+        Returns the cached value for key, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: T) -> T:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+        return value
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """
+        Returns the cached value for key, creating and storing it with factory on a miss.
+        """
+        value = self.get(key)
+        if value is None:
+            value = self.set(key, factory())
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
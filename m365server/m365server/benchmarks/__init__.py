@@ -0,0 +1,3 @@
+"""
+Benchmarks of the server, run as modules, e.g. python -m m365server.benchmarks.storage.
+"""
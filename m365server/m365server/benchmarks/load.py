@@ -0,0 +1,471 @@
+"""
+End-to-end load tests of m365server.main:app.
+
+Starts the app under uvicorn against a local stand-in for Azure, seeds blobs through the API and
+drives each scenario at increasing concurrency with closed-loop clients, recording latency
+percentiles, throughput, errors and the server's peak resident memory.
+
+    python -m m365server.benchmarks.load                               # every scenario, in-process memory backend
+    python -m m365server.benchmarks.load --scenario mixed --backend filesystem --workers 4
+    python -m m365server.benchmarks.load --backend azurite             # Azurite listening on 127.0.0.1:10000
+    python -m m365server.benchmarks.load --url http://localhost:17200  # a server that is already running
+    python -m m365server.benchmarks.load --compare latest
+
+The max sustainable RPS of a scenario is the highest throughput among its concurrency levels whose
+p99 latency stays within the scenario's SLO and whose error rate stays below 1%. Results are kept in
+benchmark-results/ under the commit they were measured at; --compare exits with status 1 when a
+scenario regressed against the baseline by more than --tolerance.
+"""
+import argparse
+import asyncio
+import dataclasses
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+from m365server.benchmarks.results import RESULTS_DIR, load_results, percentiles, run_metadata, save_results
+
+RESULTS_VERSION = 1
+
+API_PREFIX = "/api/v1/blob_storage"
+BACKENDS = ("memory", "filesystem", "azurite")
+MAX_ERROR_RATE = 0.01
+# The well-known development account every Azurite instance accepts.
+AZURITE_CONNECTION_STRING = (
+    "DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint={url}/devstoreaccount1;"
+)
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    A workload: the mix of operations, the size of the blobs they move and the concurrency levels it runs at.
+
+    Downloads read the seed blobs, uploads overwrite a rotating set of as many blobs next to them, and
+    listings list every seed blob.
+    """
+    name: str
+    weights: Dict[str, float]
+    blob_size: int
+    seed_blobs: int = 100
+    concurrency: Tuple[int, ...] = (1, 8, 32, 64)
+    duration: float = 10.0
+    p99_slo_ms: float = 500.0
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (
+    Scenario("read-heavy", {"download": 0.8, "list": 0.1, "upload": 0.1}, 64 * 1024),
+    Scenario("write-heavy", {"upload": 0.7, "download": 0.3}, 1024 ** 2),
+    Scenario("mixed", {"download": 0.5, "upload": 0.3, "list": 0.2}, 256 * 1024),
+    Scenario("large-objects", {"download": 0.9, "upload": 0.1}, 16 * 1024 ** 2, seed_blobs=16,
+             concurrency=(1, 4, 16), p99_slo_ms=2000.0),
+    Scenario("listing", {"list": 1.0}, 16, seed_blobs=2000, p99_slo_ms=1000.0),
+)}
+
+
+@dataclass
+class LoadOptions:
+    backend: str = "memory"
+    workers: int = 1
+    url: Optional[str] = None
+    container: str = "loadtest"
+    warmup: float = 2.0
+    seed: int = 0
+    redis: bool = False
+    azurite_url: str = "http://127.0.0.1:10000"
+    server_log: Optional[str] = None
+
+
+class RssSampler:
+    """
+    Tracks the peak of the summed resident memory of a process and its children, such as the
+    uvicorn supervisor and its workers. Reads /proc, so it only measures on Linux.
+    """
+
+    def __init__(self, pid: int, interval: float = 0.1) -> None:
+        self.pid = pid
+        self.interval = interval
+        self.peak: Optional[int] = None
+
+    @staticmethod
+    def _children() -> Dict[int, List[int]]:
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat") as file:
+                        parent = int(file.read().rsplit(")", 1)[1].split()[1])
+                except (OSError, IndexError, ValueError):
+                    continue
+                children.setdefault(parent, []).append(int(entry))
+        return children
+
+    @staticmethod
+    def _rss(pid: int) -> int:
+        try:
+            with open(f"/proc/{pid}/status") as file:
+                for line in file:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+
+    def sample(self) -> Optional[int]:
+        if not os.path.isdir("/proc"):
+            return None
+        children = self._children()
+        pending, total = [self.pid], 0
+        while pending:
+            pid = pending.pop()
+            total += self._rss(pid)
+            pending.extend(children.get(pid, []))
+        self.peak = max(self.peak or 0, total)
+        return total
+
+    def take_peak(self) -> Optional[int]:
+        """
+        Returns the peak since the last call and starts a new measurement.
+        """
+        self.sample()
+        peak, self.peak = self.peak, None
+        return peak
+
+    async def run(self) -> None:
+        while self.sample() is not None:
+            await asyncio.sleep(self.interval)
+
+
+class AppServer:
+    """
+    Runs m365server.main:app under uvicorn in a subprocess, against the chosen storage backend.
+
+    The Redis caches are turned off unless options.redis is set, since the load tests usually run without Redis.
+    """
+
+    def __init__(self, options: LoadOptions) -> None:
+        self.options = options
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.url = ""
+        self._root: Optional[str] = None
+        self._log_path = options.server_log
+
+    def _environment(self) -> Dict[str, str]:
+        environment = {
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(filter(None, [PACKAGE_ROOT, os.environ.get("PYTHONPATH")])),
+            # Keeps a .env with service principal credentials from taking precedence over the stand-in.
+            "AZURE_CLIENT_ID": "", "AZURE_CLIENT_SECRET": "", "AZURE_TENANT_ID": "",
+        }
+        if not self.options.redis:
+            environment.update(BLOB_CACHE_ENABLED="false", PARQUET_METADATA_CACHE_ENABLED="false")
+        if self.options.backend == "azurite":
+            environment.update(STORAGE_BACKEND="azure",
+                               AZURE_STORAGE_CONNECTION_STRING=AZURITE_CONNECTION_STRING.format(url=self.options.azurite_url))
+        elif self.options.backend == "filesystem":
+            self._root = tempfile.mkdtemp(prefix="m365server-load-")
+            environment.update(STORAGE_BACKEND="filesystem", LOCAL_STORAGE_ROOT=self._root)
+        else:
+            environment.update(STORAGE_BACKEND="memory")
+        return environment
+
+    async def start(self, timeout: float = 60.0) -> None:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        if self._log_path is None:
+            self._log_path = os.path.join(tempfile.gettempdir(), f"m365server-load-{port}.log")
+        with open(self._log_path, "wb") as log:
+            self.process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "uvicorn", "m365server.main:app", "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(self.options.workers), "--log-level", "warning",
+                env=self._environment(), cwd=PACKAGE_ROOT, stdout=log, stderr=log
+            )
+        deadline = time.monotonic() + timeout
+        async with httpx.AsyncClient(base_url=self.url) as client:
+            while True:
+                if self.process.returncode is not None or time.monotonic() > deadline:
+                    await self.stop()
+                    raise RuntimeError(f"The server did not start, see {self._log_path}")
+                try:
+                    if (await client.get("/openapi.json")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.2)
+        logger.info(f"Started the server at {self.url} ({self.options.backend}, {self.options.workers} worker(s)), "
+                    f"logging to {self._log_path}")
+
+    async def stop(self) -> None:
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), 15)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        if self._root is not None:
+            shutil.rmtree(self._root, ignore_errors=True)
+            self._root = None
+
+    async def __aenter__(self) -> "AppServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+
+async def _create_azurite_container(options: LoadOptions) -> None:
+    from azure.core.exceptions import ResourceExistsError
+    from azure.storage.blob.aio import BlobServiceClient
+
+    connection_string = AZURITE_CONNECTION_STRING.format(url=options.azurite_url)
+    async with BlobServiceClient.from_connection_string(connection_string) as service:
+        try:
+            await service.create_container(options.container)
+        except ResourceExistsError:
+            pass
+
+
+async def _request(client: httpx.AsyncClient, operation: str, container: str, scenario: Scenario,
+                   payload: bytes, rng: random.Random) -> int:
+    """
+    Sends one request of the given operation and reads the whole response, returning its status.
+    """
+    if operation == "upload":
+        name = f"upload/{rng.randrange(scenario.seed_blobs):06d}"
+        response = await client.post(f"{API_PREFIX}/upload_blob/{container}", params={"blob_name": name},
+                                     files={"file": (name, payload)})
+        return response.status_code
+    if operation == "download":
+        name = f"seed/{rng.randrange(scenario.seed_blobs):06d}"
+        async with client.stream("GET", f"{API_PREFIX}/download_blob/{container}", params={"blob_name": name}) as response:
+            async for _ in response.aiter_raw():
+                pass
+            return response.status_code
+    if operation == "list":
+        response = await client.get(f"{API_PREFIX}/list_blobs/{container}", params={"prefix": "seed/"})
+        return response.status_code
+    raise ValueError(f"Unknown operation '{operation}'")
+
+
+async def _seed(client: httpx.AsyncClient, container: str, scenario: Scenario, payload: bytes, concurrency: int = 16) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def upload(index: int) -> None:
+        async with semaphore:
+            name = f"seed/{index:06d}"
+            response = await client.post(f"{API_PREFIX}/upload_blob/{container}", params={"blob_name": name},
+                                         files={"file": (name, payload)})
+            response.raise_for_status()
+
+    await asyncio.gather(*(upload(index) for index in range(scenario.seed_blobs)))
+
+
+async def run_level(client: httpx.AsyncClient, container: str, scenario: Scenario, payload: bytes,
+                    concurrency: int, duration: float, seed: int = 0) -> Dict[str, Any]:
+    """
+    Runs concurrency closed-loop clients for duration seconds, each sending its next request as soon as the
+    previous one completes, with operations drawn from the scenario's weights.
+    """
+    operations, weights = zip(*scenario.weights.items())
+    latencies: Dict[str, List[float]] = {operation: [] for operation in operations}
+    errors: Counter = Counter()
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int) -> None:
+        rng = random.Random(seed * 100_003 + index)
+        while time.perf_counter() < deadline:
+            operation = rng.choices(operations, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = await _request(client, operation, container, scenario, payload, rng)
+            except httpx.HTTPError as error:
+                status = type(error).__name__
+            if status == 200:
+                latencies[operation].append(time.perf_counter() - start)
+            else:
+                errors[f"{operation}:{status}"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(index) for index in range(concurrency)))
+    seconds = time.perf_counter() - start
+
+    succeeded = [latency for samples in latencies.values() for latency in samples]
+    requests = len(succeeded) + sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "seconds": round(seconds, 3),
+        "requests": requests,
+        "rps": round(len(succeeded) / seconds, 3),
+        "error_rate": round(sum(errors.values()) / requests, 5) if requests else 0.0,
+        "errors": dict(errors),
+        "latency_ms": percentiles(succeeded),
+        "operations": {operation: {"requests": len(samples), "latency_ms": percentiles(samples)}
+                       for operation, samples in latencies.items()},
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, options: LoadOptions,
+                       sampler: Optional[RssSampler]) -> Dict[str, Any]:
+    """
+    Seeds the scenario's blobs, warms up, then runs each concurrency level in turn.
+    """
+    payload = random.Random(options.seed).randbytes(scenario.blob_size)
+    await _seed(client, options.container, scenario, payload)
+    if options.warmup > 0:
+        await run_level(client, options.container, scenario, payload, scenario.concurrency[0], options.warmup, options.seed)
+
+    levels = []
+    if sampler is not None:
+        sampler.take_peak()
+    for concurrency in scenario.concurrency:
+        level = await run_level(client, options.container, scenario, payload, concurrency, scenario.duration, options.seed)
+        level["peak_rss_bytes"] = sampler.take_peak() if sampler is not None else None
+        levels.append(level)
+        rss = f"{level['peak_rss_bytes'] / 1024 ** 2:.0f} MiB" if level["peak_rss_bytes"] else "n/a"
+        logger.info(f"{scenario.name}/c{concurrency}: {level['rps']} req/s, p50 {level['latency_ms'].get('p50')}ms, "
+                    f"p99 {level['latency_ms'].get('p99')}ms, errors {level['error_rate']:.2%}, peak RSS {rss}")
+
+    sustainable = [level["rps"] for level in levels
+                   if level["error_rate"] <= MAX_ERROR_RATE and level["latency_ms"].get("p99", float("inf")) <= scenario.p99_slo_ms]
+    peaks = [level["peak_rss_bytes"] for level in levels if level["peak_rss_bytes"]]
+    return {
+        **{key: value for key, value in dataclasses.asdict(scenario).items() if key not in ("concurrency", "duration")},
+        "duration": scenario.duration,
+        "max_sustainable_rps": max(sustainable, default=0.0),
+        "peak_rss_bytes": max(peaks, default=None),
+        "levels": levels,
+    }
+
+
+async def run_load(scenarios: List[Scenario], options: LoadOptions) -> Dict[str, Any]:
+    """
+    Runs the scenarios, each against a freshly started server unless options.url points at a running one.
+
+    Returns:
+        Dict[str, Any]: The results document, one entry per scenario.
+    """
+    if options.backend == "azurite" and options.url is None:
+        await _create_azurite_container(options)
+    results = []
+    for scenario in scenarios:
+        server = AppServer(options) if options.url is None else None
+        if server is not None:
+            await server.start()
+        sampler = RssSampler(server.process.pid) if server is not None else None
+        sampling = asyncio.create_task(sampler.run()) if sampler is not None else None
+        limits = httpx.Limits(max_connections=max(scenario.concurrency), max_keepalive_connections=max(scenario.concurrency))
+        try:
+            async with httpx.AsyncClient(base_url=options.url or server.url, limits=limits, timeout=60.0) as client:
+                results.append(await run_scenario(client, scenario, options, sampler))
+        finally:
+            if sampling is not None:
+                sampling.cancel()
+            if server is not None:
+                await server.stop()
+        logger.info(f"{scenario.name}: max sustainable {results[-1]['max_sustainable_rps']} req/s")
+    return {
+        **run_metadata("load", RESULTS_VERSION),
+        "backend": options.backend if options.url is None else "external",
+        "workers": options.workers if options.url is None else None,
+        "scenarios": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.15) -> List[str]:
+    """
+    Returns a description of every regression beyond tolerance against the baseline: a lower max sustainable
+    RPS, or a level with a higher p99 latency or peak RSS. Runs on different backends or worker counts are
+    not comparable and yield no regressions.
+
+    p99 increases under 5ms and RSS increases under 16 MiB are ignored as noise.
+    """
+    if (baseline.get("backend"), baseline.get("workers")) != (current.get("backend"), current.get("workers")):
+        logger.warning("The baseline ran on a different backend or number of workers, skipping the comparison")
+        return []
+    previous = {scenario["name"]: scenario for scenario in baseline.get("scenarios", [])}
+    regressions = []
+    for scenario in current.get("scenarios", []):
+        before = previous.get(scenario["name"])
+        if before is None:
+            continue
+        if scenario["max_sustainable_rps"] < before["max_sustainable_rps"] * (1 - tolerance):
+            regressions.append(f"{scenario['name']}: max sustainable {before['max_sustainable_rps']} -> "
+                               f"{scenario['max_sustainable_rps']} req/s")
+        levels = {level["concurrency"]: level for level in before["levels"]}
+        for level in scenario["levels"]:
+            old = levels.get(level["concurrency"])
+            if old is None:
+                continue
+            name = f"{scenario['name']}/c{level['concurrency']}"
+            old_p99, new_p99 = old["latency_ms"].get("p99"), level["latency_ms"].get("p99")
+            if old_p99 is not None and new_p99 is not None and new_p99 - old_p99 > 5 and new_p99 > old_p99 * (1 + tolerance):
+                regressions.append(f"{name}: p99 {old_p99} -> {new_p99}ms")
+            old_rss, new_rss = old.get("peak_rss_bytes"), level.get("peak_rss_bytes")
+            if old_rss and new_rss and new_rss - old_rss > 16 * 1024 ** 2 and new_rss > old_rss * (1 + tolerance):
+                regressions.append(f"{name}: peak RSS {old_rss} -> {new_rss} bytes")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test m365server.main:app against a local storage stand-in.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run; repeat for several (default: all).")
+    parser.add_argument("--backend", choices=BACKENDS, default="memory", help="Storage the server runs against.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (filesystem and azurite only).")
+    parser.add_argument("--azurite-url", default="http://127.0.0.1:10000", help="Blob endpoint of the Azurite emulator.")
+    parser.add_argument("--url", help="Load test a server that is already running instead of starting one.")
+    parser.add_argument("--container", default="loadtest", help="Container the scenarios use.")
+    parser.add_argument("--duration", type=float, help="Seconds per concurrency level, overriding the scenarios.")
+    parser.add_argument("--concurrency", help="Comma-separated concurrency levels, overriding the scenarios.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of unrecorded load before each scenario.")
+    parser.add_argument("--redis", action="store_true", help="Keep the Redis caches enabled in the started server.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the operation mix and payloads.")
+    parser.add_argument("--server-log", help="File receiving the started server's output.")
+    parser.add_argument("--output", help="Write the results to this file instead of a new file in --results-dir.")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Directory collecting results across commits.")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against, or 'latest' for the newest in --results-dir.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression before a scenario fails.")
+    args = parser.parse_args(argv)
+
+    if args.backend == "memory" and args.workers > 1 and args.url is None:
+        parser.error("the memory backend is private to each worker; use --backend filesystem or azurite with --workers")
+    overrides: Dict[str, Any] = {}
+    if args.duration is not None:
+        overrides["duration"] = args.duration
+    if args.concurrency:
+        overrides["concurrency"] = tuple(int(level) for level in args.concurrency.split(","))
+    scenarios = [dataclasses.replace(SCENARIOS[name], **overrides) for name in (args.scenario or SCENARIOS)]
+    options = LoadOptions(backend=args.backend, workers=args.workers, url=args.url, container=args.container,
+                          warmup=args.warmup, seed=args.seed, redis=args.redis, azurite_url=args.azurite_url,
+                          server_log=args.server_log)
+
+    report = asyncio.run(run_load(scenarios, options))
+    output = save_results(report, args.output, args.results_dir)
+
+    if args.compare:
+        baseline = load_results(args.compare, "load", args.results_dir, exclude=output)
+        regressions = compare_results(baseline, report, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
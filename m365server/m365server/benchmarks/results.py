@@ -0,0 +1,86 @@
+"""
+Recording benchmark results so runs can be compared across commits.
+"""
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+RESULTS_DIR = "benchmark-results"
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarizes latencies in seconds as p50, p90, p99, mean and max in milliseconds.
+    """
+    ordered = sorted(latencies)
+    if not ordered:
+        return {}
+
+    def percentile(fraction: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+
+    return {"p50": percentile(0.50), "p90": percentile(0.90), "p99": percentile(0.99),
+            "mean": round(statistics.fmean(ordered) * 1000, 3), "max": round(ordered[-1] * 1000, 3)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(suite: str, version: int) -> Dict[str, Any]:
+    """
+    Returns the fields identifying a run: the suite, the commit and the machine it ran on.
+    """
+    return {
+        "suite": suite,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(report: Dict[str, Any], output: Optional[str] = None, results_dir: str = RESULTS_DIR) -> str:
+    """
+    Writes a report as JSON, by default to <results_dir>/<suite>-<commit>-<timestamp>.json.
+
+    Returns:
+        str: The path written.
+    """
+    if output is None:
+        os.makedirs(results_dir, exist_ok=True)
+        commit = (report.get("git_commit") or "uncommitted")[:12]
+        timestamp = report["created_at"][:19].replace(":", "").replace("-", "")
+        output = os.path.join(results_dir, f"{report['suite']}-{commit}-{timestamp}.json")
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    logger.info(f"Wrote {report['suite']} results to {output}")
+    return output
+
+
+def load_results(path: str, suite: str, results_dir: str = RESULTS_DIR, exclude: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads a report to compare against. path "latest" selects the newest report of the suite in
+    results_dir, other than exclude.
+    """
+    if path == "latest":
+        candidates = [candidate for candidate in glob.glob(os.path.join(results_dir, f"{suite}-*.json"))
+                      if exclude is None or os.path.abspath(candidate) != os.path.abspath(exclude)]
+        if not candidates:
+            raise FileNotFoundError(f"No earlier {suite} results in {results_dir}")
+        path = max(candidates, key=os.path.getmtime)
+    logger.info(f"Comparing against {path}")
+    with open(path) as file:
+        return json.load(file)
@@ -0,0 +1,162 @@
+"""
+Measures how long a fresh interpreter takes to import the server, and checks that importing it is lean.
+
+Each sample imports m365server.main in a new process with network connections refused, so an
+import that reaches for the network is caught rather than slowed down.
+
+    python -m m365server.benchmarks.startup
+    python -m m365server.benchmarks.startup --budget-ms 1500 --compare latest
+
+The run fails (exit status 1) when the median import time exceeds --budget-ms, when the import
+loads a module that should only be loaded on demand, when it attempts a network connection, or,
+with --compare, when it got slower than the baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from m365server.benchmarks.results import RESULTS_DIR, load_results, run_metadata, save_results
+
+RESULTS_VERSION = 1
+
+MODULE = "m365server.main"
+DEFAULT_BUDGET_MS = 2000.0
+# Heavy or optional dependencies that must only be imported by the code paths that use them.
+LAZY_MODULES = ("pandas", "pyarrow.dataset", "azure.identity", "msal", "pyinstrument", "uvicorn")
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHILD = """
+import json, socket, sys, time
+attempts = []
+def refuse(self, address, *args, **kwargs):
+    attempts.append(repr(address))
+    raise OSError("network access while importing")
+socket.socket.connect = refuse
+socket.socket.connect_ex = refuse
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": sorted(sys.modules), "connections": attempts}}))
+"""
+
+
+def _run_child(module: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", CHILD.format(module=module)]
+    environment = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [PACKAGE_ROOT, os.environ.get("PYTHONPATH")]))}
+    result = subprocess.run(command, capture_output=True, text=True, cwd=PACKAGE_ROOT, env=environment)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-4000:]}")
+    return result
+
+
+def measure_import(module: str = MODULE) -> Dict[str, Any]:
+    """
+    Imports module in a fresh interpreter.
+
+    Returns:
+        Dict[str, Any]: The import time in seconds, the process wall time including interpreter startup,
+            the modules loaded and the network connections attempted.
+    """
+    start = time.perf_counter()
+    result = _run_child(module)
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample["process_seconds"] = time.perf_counter() - start
+    return sample
+
+
+def slowest_imports(module: str = MODULE, count: int = 15) -> List[Dict[str, Any]]:
+    """
+    Returns the top-level dependencies of module that take longest to import, from python -X importtime.
+    """
+    timings = []
+    for line in _run_child(module, importtime=True).stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            timings.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+    return sorted(timings, key=lambda timing: timing["cumulative_ms"], reverse=True)[:count]
+
+
+def run_startup(samples: int = 5, module: str = MODULE) -> Dict[str, Any]:
+    """
+    Measures samples fresh imports of module and returns the results document.
+    """
+    measured = [measure_import(module) for _ in range(samples)]
+    loaded = set(measured[0]["modules"])
+    return {
+        **run_metadata("startup", RESULTS_VERSION),
+        "module": module,
+        "samples": samples,
+        "import_ms": {"median": round(statistics.median(sample["seconds"] for sample in measured) * 1000, 1),
+                      "min": round(min(sample["seconds"] for sample in measured) * 1000, 1),
+                      "max": round(max(sample["seconds"] for sample in measured) * 1000, 1)},
+        "process_ms": {"median": round(statistics.median(sample["process_seconds"] for sample in measured) * 1000, 1)},
+        "modules_loaded": len(loaded),
+        "lazy_modules_loaded": [name for name in LAZY_MODULES if name in loaded],
+        "network_connections": sorted({address for sample in measured for address in sample["connections"]}),
+        "slowest_imports": slowest_imports(module),
+    }
+
+
+def check_startup(report: Dict[str, Any], budget_ms: float = DEFAULT_BUDGET_MS) -> List[str]:
+    """
+    Returns a description of every way the import broke its budget or its side-effect rules.
+    """
+    failures = []
+    if report["import_ms"]["median"] > budget_ms:
+        failures.append(f"Importing {report['module']} took {report['import_ms']['median']}ms, over the {budget_ms:g}ms budget")
+    if report["lazy_modules_loaded"]:
+        failures.append(f"Importing {report['module']} loaded {', '.join(report['lazy_modules_loaded'])}")
+    if report["network_connections"]:
+        failures.append(f"Importing {report['module']} connected to {', '.join(report['network_connections'])}")
+    return failures
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.15) -> List[str]:
+    """
+    Returns a description of the regression when the median import time grew by more than tolerance.
+    Growth under 50ms is ignored as noise.
+    """
+    before, after = baseline["import_ms"]["median"], current["import_ms"]["median"]
+    if after - before > 50 and after > before * (1 + tolerance):
+        return [f"Importing {current['module']}: {before} -> {after}ms"]
+    return []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the import time of the server.")
+    parser.add_argument("--module", default=MODULE, help="Module to import.")
+    parser.add_argument("--samples", type=int, default=5, help="Fresh interpreters to measure.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Largest acceptable median import time.")
+    parser.add_argument("--output", help="Write the results to this file instead of a new file in --results-dir.")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Directory collecting results across commits.")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against, or 'latest' for the newest in --results-dir.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression before the run fails.")
+    args = parser.parse_args(argv)
+
+    report = run_startup(args.samples, args.module)
+    logger.info(f"Imported {args.module} in {report['import_ms']['median']}ms (median of {args.samples}), "
+                f"{report['process_ms']['median']}ms including interpreter startup")
+    for timing in report["slowest_imports"][:5]:
+        logger.info(f"  {timing['module']}: {timing['cumulative_ms']}ms")
+    output = save_results(report, args.output, args.results_dir)
+
+    failures = check_startup(report, args.budget_ms)
+    if args.compare:
+        baseline = load_results(args.compare, "startup", args.results_dir, exclude=output)
+        failures.extend(compare_results(baseline, report, args.tolerance))
+    for failure in failures:
+        logger.warning(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Micro-benchmarks of the storage layer on the local backends.
+
+Measures upload, download and listing throughput, latency and memory per operation of
+AzureBlobStorageManager over the in-memory and filesystem backends, across blob sizes and
+concurrency levels. No network is involved, so the numbers are the server's own overhead.
+
+    python -m m365server.benchmarks.storage
+    python -m m365server.benchmarks.storage --sizes 1KiB,1MiB --concurrency 1,8 --compare latest
+
+Results are kept in benchmark-results/ under the commit they were measured at. With --compare, cases that got slower or use more memory per operation than the baseline by
+more than --tolerance are reported and the exit status is 1.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from m365server.azure_interface.aio import AzureBlobStorageManager, create_local_storage_manager
+from m365server.benchmarks.results import RESULTS_DIR, load_results, percentiles, run_metadata, save_results
+
+RESULTS_VERSION = 1
+
+BACKENDS = ("memory", "filesystem")
+DEFAULT_SIZES = (1024, 64 * 1024, 1024 ** 2, 16 * 1024 ** 2, 256 * 1024 ** 2, 1024 ** 3)
+DEFAULT_CONCURRENCY = (1, 8, 32)
+
+UNITS = {"": 1, "B": 1, "KB": 1000, "KIB": 1024, "MB": 1000 ** 2, "MIB": 1024 ** 2, "GB": 1000 ** 3, "GIB": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """
+    Parses sizes such as "4096", "64KiB" or "1GB".
+    """
+    text = text.strip().upper()
+    number = text.rstrip("KMGIB")
+    return int(float(number) * UNITS[text[len(number):]])
+
+
+def format_size(size: int) -> str:
+    for unit, factor in (("GiB", 1024 ** 3), ("MiB", 1024 ** 2), ("KiB", 1024)):
+        if size >= factor and size % factor == 0:
+            return f"{size // factor}{unit}"
+    return f"{size}B"
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    The measurements of one backend, operation, blob size and concurrency level.
+
+    For listings blob_size is 0 and items_per_second counts listed blobs.
+    """
+    backend: str
+    operation: str
+    blob_size: int
+    concurrency: int
+    operations: int
+    seconds: float
+    ops_per_second: float
+    latency_ms: Dict[str, float]
+    peak_bytes_per_operation: int
+    mib_per_second: Optional[float] = None
+    items_per_second: Optional[float] = None
+
+    @property
+    def name(self) -> str:
+        size = f"/{format_size(self.blob_size)}" if self.blob_size else ""
+        return f"{self.backend}/{self.operation}{size}/c{self.concurrency}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, **asdict(self)}
+
+
+@dataclass
+class BenchmarkSettings:
+    sizes: Tuple[int, ...] = DEFAULT_SIZES
+    concurrency: Tuple[int, ...] = DEFAULT_CONCURRENCY
+    target_bytes: int = 256 * 1024 ** 2
+    max_operations: int = 2000
+    max_inflight_bytes: int = 1024 ** 3
+    list_blobs: int = 10_000
+    list_operations: int = 20
+    root: Optional[str] = None
+    backends: Tuple[str, ...] = field(default=BACKENDS)
+
+
+async def _run(operation: Callable[[int], Awaitable[int]], count: int, concurrency: int) -> Tuple[float, List[float], int]:
+    """
+    Runs operation(0..count-1) with at most concurrency in flight, returning the wall time, the
+    latency of each operation and the total of the values the operations returned.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def timed(index: int) -> int:
+        async with semaphore:
+            start = time.perf_counter()
+            units = await operation(index)
+            latencies.append(time.perf_counter() - start)
+            return units
+
+    start = time.perf_counter()
+    units = await asyncio.gather(*(timed(index) for index in range(count)))
+    return time.perf_counter() - start, latencies, sum(units)
+
+
+async def _peak_bytes_per_operation(operation: Callable[[int], Awaitable[int]], concurrency: int) -> int:
+    """
+    Runs one round of concurrency operations under tracemalloc, in a separate pass so tracing does not skew the timings.
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        await _run(operation, concurrency, concurrency)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - baseline) // concurrency
+
+
+async def _measure(backend: str, name: str, blob_size: int, concurrency: int, count: int,
+                   operation: Callable[[int], Awaitable[int]]) -> BenchmarkResult:
+    seconds, latencies, units = await _run(operation, count, concurrency)
+    result = BenchmarkResult(
+        backend=backend, operation=name, blob_size=blob_size, concurrency=concurrency, operations=count,
+        seconds=round(seconds, 6), ops_per_second=round(count / seconds, 3), latency_ms=percentiles(latencies),
+        peak_bytes_per_operation=await _peak_bytes_per_operation(operation, concurrency)
+    )
+    if blob_size:
+        result.mib_per_second = round(units / seconds / 1024 ** 2, 3)
+    else:
+        result.items_per_second = round(units / seconds, 3)
+    logger.info(f"{result.name}: {result.ops_per_second} ops/s, p99 {result.latency_ms['p99']}ms, "
+                f"{result.peak_bytes_per_operation} B/op")
+    return result
+
+
+async def _benchmark_transfers(manager: AzureBlobStorageManager, backend: str, settings: BenchmarkSettings,
+                               size: int) -> List[BenchmarkResult]:
+    results = []
+    data = os.urandom(size)
+    container = "bench-transfer"
+    for concurrency in settings.concurrency:
+        if size * concurrency > settings.max_inflight_bytes:
+            logger.info(f"Skipping {format_size(size)} at concurrency {concurrency}: over the in-flight byte budget")
+            continue
+        count = max(concurrency, min(settings.max_operations, settings.target_bytes // size))
+
+        # Blob names repeat every concurrency operations so the stored data stays at size * concurrency.
+        async def upload(index: int) -> int:
+            await manager.upload_blob(container, f"{size}/{index % concurrency}", BytesIO(data))
+            return size
+
+        async def download(index: int) -> int:
+            received = 0
+            async for chunk in manager.stream_blob(container, f"{size}/{index % concurrency}"):
+                received += len(chunk)
+            return received
+
+        results.append(await _measure(backend, "upload", size, concurrency, count, upload))
+        results.append(await _measure(backend, "download", size, concurrency, count, download))
+    await manager.delete_blobs_by_prefix(container, f"{size}/")
+    return results
+
+
+async def _benchmark_listing(manager: AzureBlobStorageManager, backend: str, settings: BenchmarkSettings) -> List[BenchmarkResult]:
+    container = "bench-list"
+    for index in range(settings.list_blobs):
+        await manager.upload_blob(container, f"part-{index:08d}", BytesIO(b"x"))
+
+    async def list_all(index: int) -> int:
+        return sum([len(page.blobs) async for page in manager.iter_blob_pages(container)])
+
+    results = []
+    for concurrency in settings.concurrency:
+        count = max(concurrency, settings.list_operations)
+        results.append(await _measure(backend, "list", 0, concurrency, count, list_all))
+    await manager.delete_blobs_by_prefix(container, "part-")
+    return results
+
+
+async def benchmark_backend(backend: str, settings: BenchmarkSettings) -> List[BenchmarkResult]:
+    """
+    Runs every case of the suite on one backend.
+
+    Args:
+        backend (str): "memory" or "filesystem".
+        settings (BenchmarkSettings): The sizes, concurrency levels and budgets of the run.
+
+    Returns:
+        List[BenchmarkResult]: One result per case that fits the in-flight byte budget.
+    """
+    root = None
+    if backend == "filesystem":
+        root = tempfile.mkdtemp(prefix="m365server-bench-", dir=settings.root)
+    elif backend != "memory":
+        raise ValueError(f"Unknown backend '{backend}'")
+    manager = create_local_storage_manager(root)
+    try:
+        results = []
+        for size in settings.sizes:
+            results.extend(await _benchmark_transfers(manager, backend, settings, size))
+        if settings.list_blobs:
+            results.extend(await _benchmark_listing(manager, backend, settings))
+        return results
+    finally:
+        await manager.close()
+        if root is not None:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def run_suite(settings: BenchmarkSettings) -> Dict[str, Any]:
+    """
+    Runs the suite on every configured backend and returns the results document written by --output.
+    """
+    results = []
+    for backend in settings.backends:
+        results.extend(asyncio.run(benchmark_backend(backend, settings)))
+    return {
+        **run_metadata("storage", RESULTS_VERSION),
+        "settings": {key: value for key, value in asdict(settings).items() if key != "root"},
+        "results": [result.to_dict() for result in results],
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.15) -> List[str]:
+    """
+    Returns a description of every case that regressed against the baseline by more than tolerance:
+    lower throughput, or more memory per operation.
+
+    Memory growth below 64 KiB per operation is ignored as noise.
+    """
+    previous = {result["name"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        if result["ops_per_second"] < before["ops_per_second"] * (1 - tolerance):
+            regressions.append(f"{result['name']}: {before['ops_per_second']} -> {result['ops_per_second']} ops/s")
+        grown = result["peak_bytes_per_operation"] - before["peak_bytes_per_operation"]
+        if grown > 64 * 1024 and result["peak_bytes_per_operation"] > before["peak_bytes_per_operation"] * (1 + tolerance):
+            regressions.append(f"{result['name']}: {before['peak_bytes_per_operation']} -> "
+                               f"{result['peak_bytes_per_operation']} bytes/op")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the storage layer on the local backends.")
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="Backend to run; repeat for several (default: all).")
+    parser.add_argument("--sizes", default=",".join(format_size(size) for size in DEFAULT_SIZES), help="Comma-separated blob sizes.")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)), help="Comma-separated concurrency levels.")
+    parser.add_argument("--target-bytes", default="256MiB", help="Bytes moved per transfer case, within the operation limits.")
+    parser.add_argument("--max-operations", type=int, default=2000, help="Most operations per case.")
+    parser.add_argument("--max-inflight-bytes", default="1GiB", help="Skip cases whose blob size times concurrency exceeds this.")
+    parser.add_argument("--list-blobs", type=int, default=10_000, help="Blobs in the listing benchmark container; 0 skips it.")
+    parser.add_argument("--root", help="Directory under which the filesystem backend stores blobs (default: the temp directory).")
+    parser.add_argument("--output", help="Write the results to this file instead of a new file in --results-dir.")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Directory collecting results across commits.")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against, or 'latest' for the newest in --results-dir.")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression before a case fails.")
+    args = parser.parse_args(argv)
+
+    settings = BenchmarkSettings(
+        sizes=tuple(parse_size(size) for size in args.sizes.split(",")),
+        concurrency=tuple(int(level) for level in args.concurrency.split(",")),
+        target_bytes=parse_size(args.target_bytes),
+        max_operations=args.max_operations,
+        max_inflight_bytes=parse_size(args.max_inflight_bytes),
+        list_blobs=args.list_blobs,
+        root=args.root,
+        backends=tuple(args.backend or BACKENDS)
+    )
+    report = run_suite(settings)
+    output = save_results(report, args.output, args.results_dir)
+
+    if args.compare:
+        baseline = load_results(args.compare, "storage", args.results_dir, exclude=output)
+        regressions = compare_results(baseline, report, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
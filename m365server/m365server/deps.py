@@ -1,14 +1,159 @@
+import functools
+from typing import Optional
+
 import redis
+import redis.asyncio
+from fastapi import Depends, Request
+from loguru import logger
+
+from m365server.azure_interface.admission import AdmissionController
+from m365server.azure_interface.aio import (AzureBlobStorageManager, ContainerManager, ResiliencePolicy,
+                                           ResilientContainerManager, SingleFlight, create_local_storage_manager)
+import m365server.azure_interface.aio.blob_operations as AsyncBlobOperations
+from m365server.azure_interface.blob_cache import BlobCache
+from m365server.azure_interface.container_stats import ContainerStatsCache
+from m365server.azure_interface.derived_parquet import DerivedParquetStore
+from m365server.azure_interface.disk_cache import DiskBlobCache
+from m365server.azure_interface.parquet_metadata import ParquetMetadataCache, ParquetMetadataReader
+from m365server.azure_interface.configuration import (AzureBlobStorageConfig, get_blob_cache_config,
+                                                      get_container_stats_config, get_default_config, get_disk_cache_config,
+                                                      get_derived_parquet_config, get_parquet_metadata_config,
+                                                      get_resilience_config, get_single_flight_config,
+                                                      get_storage_backend_config)
 
 def create_redis():
     return redis.ConnectionPool(
         host='redis',
         port=6379,
         db=0,
-        decode_responses=True
+        decode_responses=True,
+        socket_connect_timeout=1,
+        socket_timeout=1
+    )
+
+@functools.lru_cache(maxsize=None)
+def get_default_pool() -> redis.ConnectionPool:
+    """
+    Returns the shared connection pool of get_cache, created on first use rather than at import.
+    """
+    return create_redis()
+
+def get_cache(pool: Optional[redis.ConnectionPool] = None):
+    return redis.Redis(connection_pool=pool or get_default_pool())
+
+def create_async_redis() -> redis.asyncio.ConnectionPool:
+    """
+    Creates an asyncio connection pool that returns raw bytes, for caching binary payloads.
+    """
+    return redis.asyncio.ConnectionPool(
+        host='redis',
+        port=6379,
+        db=0,
+        socket_connect_timeout=1,
+        socket_timeout=1
     )
 
-default_pool: redis.ConnectionPool = create_redis()
+def get_async_cache(pool: redis.asyncio.ConnectionPool) -> redis.asyncio.Redis:
+    return redis.asyncio.Redis(connection_pool=pool)
+
+def create_storage_manager(config: AzureBlobStorageConfig = None) -> AzureBlobStorageManager:
+    """
+    Builds the long-lived AzureBlobStorageManager shared by every request in this worker.
+    Must be called from within a running event loop.
+
+    STORAGE_BACKEND=memory or filesystem swaps Azure for a local backend. The memory backend
+    is private to each worker process, so it is only consistent with a single worker.
+
+    Unless RESILIENCE_ENABLED is false, reads and listings are retried, timed out and optionally
+    hedged by a ResiliencePolicy, which replaces the Azure SDK's own retries for those requests.
+    """
+    config = config or get_default_config()
+    backend = get_storage_backend_config()
+    resilience = get_resilience_config()
+    if backend.backend == "azure":
+        storage_manager = AzureBlobStorageManager(config)
+        storage_manager.set_upload_strategy(
+            AsyncBlobOperations.BlobBlockUploadStrategy(config.upload_block_size, config.upload_max_concurrency)
+        )
+        storage_manager.set_delete_strategy(AsyncBlobOperations.BlobDeleteStrategy(max_concurrency=config.delete_max_concurrency))
+        if resilience.enabled:
+            storage_manager.set_download_strategy(AsyncBlobOperations.BlobDownloadStrategy(retry_total=0))
+            storage_manager.set_container_manager(ContainerManager(
+                storage_manager.blob_service_client, cache_ttl=config.container_cache_ttl, retry_total=0
+            ))
+    else:
+        logger.warning(f"Using the local {backend.backend} storage backend instead of Azure")
+        storage_manager = create_local_storage_manager(backend.local_root if backend.backend == "filesystem" else None, config)
+    if resilience.enabled:
+        policy = ResiliencePolicy(
+            max_attempts=resilience.max_attempts,
+            backoff_base_seconds=resilience.backoff_base_seconds,
+            backoff_max_seconds=resilience.backoff_max_seconds,
+            timeouts=resilience.timeouts(),
+            hedge_after_seconds=resilience.hedge_after_seconds if resilience.hedge_enabled else None
+        )
+        storage_manager.set_download_strategy(AsyncBlobOperations.ResilientDownloadStrategy(storage_manager.download_strategy, policy))
+        storage_manager.set_container_manager(ResilientContainerManager(storage_manager.container_manager, policy))
+    single_flight_config = get_single_flight_config()
+    if single_flight_config.enabled:
+        storage_manager.set_single_flight(SingleFlight())
+    stats_config = get_container_stats_config()
+    storage_manager.set_container_stats(ContainerStatsCache(
+        storage_manager.iter_blob_pages,
+        ttl_seconds=stats_config.ttl_seconds,
+        max_concurrency=stats_config.scan_concurrency
+    ))
+    cache_config = get_blob_cache_config()
+    if cache_config.enabled:
+        storage_manager.set_blob_cache(BlobCache(
+            get_async_cache(create_async_redis()),
+            max_entry_bytes=cache_config.max_entry_bytes,
+            max_total_bytes=cache_config.max_total_bytes,
+            ttl_seconds=cache_config.ttl_seconds
+        ))
+    disk_cache_config = get_disk_cache_config()
+    if disk_cache_config.enabled:
+        storage_manager.set_disk_cache(DiskBlobCache(
+            disk_cache_config.directory,
+            max_total_bytes=disk_cache_config.max_total_bytes,
+            min_entry_bytes=disk_cache_config.min_entry_bytes,
+            max_entry_bytes=disk_cache_config.max_entry_bytes
+        ))
+    metadata_config = get_parquet_metadata_config()
+    if metadata_config.cache_enabled:
+        storage_manager.set_parquet_metadata_cache(ParquetMetadataCache(
+            get_async_cache(create_async_redis()),
+            ttl_seconds=metadata_config.cache_ttl_seconds
+        ))
+    derived_config = get_derived_parquet_config()
+    if derived_config.enabled:
+        storage_manager.set_derived_parquet_store(DerivedParquetStore(storage_manager, prefix=derived_config.prefix))
+    return storage_manager
 
-def get_cache(pool: redis.ConnectionPool = default_pool):
-    return redis.Redis(connection_pool=pool)
\ No newline at end of file
+def get_storage_manager(request: Request) -> AzureBlobStorageManager:
+    """
+    FastAPI dependency returning the storage manager created at application startup.
+    """
+    return request.app.state.storage_manager
+
+def get_admission_controller(request: Request) -> Optional[AdmissionController]:
+    """
+    FastAPI dependency returning the worker's admission controller, or None when admission control is disabled.
+    """
+    return getattr(request.app.state, "admission_controller", None)
+
+def get_derived_parquet_store(storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)) -> Optional[DerivedParquetStore]:
+    """
+    FastAPI dependency returning the storage manager's store of derived parquet copies, or None when it is disabled.
+    """
+    return storage_manager.derived_parquet_store
+
+def get_parquet_metadata_reader(storage_manager: AzureBlobStorageManager = Depends(get_storage_manager)) -> ParquetMetadataReader:
+    """
+    FastAPI dependency returning a footer reader backed by the storage manager's parquet metadata cache.
+    """
+    return ParquetMetadataReader(
+        storage_manager,
+        getattr(storage_manager, "parquet_metadata_cache", None),
+        max_concurrency=get_parquet_metadata_config().max_concurrency
+    )
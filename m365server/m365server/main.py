@@ -1,19 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-import redis
 from loguru import logger 
 from dotenv import load_dotenv, find_dotenv
+from m365server.api.admission import AdmissionMiddleware
 from m365server.api.api import api_router
-import uvicorn
+from m365server.api.metrics import MetricsMiddleware, mark_worker_stopped, metrics_endpoint
+from m365server.api.profiling import ProfilingMiddleware
+from m365server.azure_interface.admission import AdmissionController
+from m365server.azure_interface.configuration import get_admission_config, get_metrics_config, get_profiling_config
+from m365server.deps import create_storage_manager
 
 
 load_dotenv(find_dotenv())
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info('Creating storage manager')
+    app.state.storage_manager = create_storage_manager()
+    yield
+    await app.state.storage_manager.close()
+    mark_worker_stopped()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(api_router, prefix="/api/v1")
 
+admission_config = get_admission_config()
+if admission_config.enabled:
+    app.state.admission_controller = AdmissionController(
+        max_inflight_bytes=admission_config.max_inflight_bytes,
+        max_per_container=admission_config.max_per_container,
+        max_wait_seconds=admission_config.max_wait_seconds,
+        max_queue=admission_config.max_queue,
+        retry_after_seconds=admission_config.retry_after_seconds
+    )
+    app.add_middleware(AdmissionMiddleware, controller=app.state.admission_controller,
+                       max_transfer_bytes=admission_config.max_transfer_bytes)
+
+if get_metrics_config().enabled:
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+profiling_config = get_profiling_config()
+if profiling_config.enabled:
+    app.add_middleware(ProfilingMiddleware, config=profiling_config)
+
 # import debugpy
 # debugpy.listen(("0.0.0.0", 5678))
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     logger.info('Starting server')
     uvicorn.run(app, host="0.0.0.0", port=12000, log_level="debug")
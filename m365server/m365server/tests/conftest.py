@@ -0,0 +1,30 @@
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from m365server.api.api import api_router
+from m365server.deps import get_storage_manager
+
+
+@pytest.fixture
+def api_client() -> Callable[..., TestClient]:
+    """
+    Returns a factory building a TestClient for the API routes, served by the given storage manager.
+
+    The factory takes the manager, an optional route prefix, the middleware to add as (class, options)
+    pairs in app.add_middleware order, and attributes to set on app.state.
+    """
+    def build(manager, prefix: str = "", middleware: Iterable[Tuple[type, Dict]] = (),
+              state: Optional[Dict] = None) -> TestClient:
+        app = FastAPI()
+        app.include_router(api_router, prefix=prefix)
+        for middleware_class, options in middleware:
+            app.add_middleware(middleware_class, **options)
+        for name, value in (state or {}).items():
+            setattr(app.state, name, value)
+        app.dependency_overrides[get_storage_manager] = lambda: manager
+        return TestClient(app)
+
+    return build
@@ -0,0 +1,122 @@
+import asyncio
+from io import BytesIO
+from typing import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+
+from m365server.api.admission import AdmissionMiddleware
+from m365server.azure_interface.admission import AdmissionController
+from m365server.azure_interface.aio import create_local_storage_manager
+
+DATA = bytes(range(256)) * 16
+
+
+@pytest.fixture
+def make_client(api_client) -> Callable[[AdmissionController], TestClient]:
+    def build(controller: AdmissionController) -> TestClient:
+        manager = create_local_storage_manager()
+        asyncio.run(manager.upload_blob("lake", "data.bin", BytesIO(DATA)))
+        return api_client(manager, middleware=[(AdmissionMiddleware, {"controller": controller, "max_transfer_bytes": 1024})],
+                          state={"admission_controller": controller})
+
+    return build
+
+
+def test_should_release_reservations_once_the_response_is_sent(make_client):
+    controller = AdmissionController(max_inflight_bytes=2048, max_wait_seconds=0.05)
+    client = make_client(controller)
+
+    download = client.get("/blob_storage/download_blob/lake", params={"blob_name": "data.bin"})
+    upload = client.post("/blob_storage/upload_blob/lake", params={"blob_name": "copy.bin"}, files={"file": ("copy.bin", DATA)})
+
+    assert download.content == DATA and upload.status_code == 200
+    assert client.get("/blob_storage/admission_stats").json() == {
+        "enabled": True, "inflight_bytes": 0, "max_inflight_bytes": 2048, "utilization": 0.0, "active_transfers": 0,
+        "active_by_container": {}, "max_per_container": 32, "queued": 0, "rejected": 0
+    }
+
+
+def test_should_shed_transfers_with_429_when_the_budget_is_exhausted(make_client):
+    controller = AdmissionController(max_inflight_bytes=2048, max_wait_seconds=0.05, retry_after_seconds=1.5)
+    client = make_client(controller)
+    held = asyncio.run(controller.acquire("other", 2048))
+
+    rejected = client.get("/blob_storage/download_blob/lake", params={"blob_name": "data.bin"})
+    not_modified = client.get("/blob_storage/download_blob/lake", params={"blob_name": "data.bin"},
+                              headers={"If-None-Match": rejected.headers.get("etag", "*")})
+    held.release()
+    admitted = client.get("/blob_storage/download_blob/lake", params={"blob_name": "data.bin"})
+
+    assert (rejected.status_code, rejected.headers["retry-after"]) == (429, "2")
+    assert not_modified.status_code == 304
+    assert admitted.status_code == 200 and controller.stats()["rejected"] == 1
+
+
+def test_should_charge_archive_members_for_the_bytes_they_hold(make_client):
+    controller = AdmissionController(max_inflight_bytes=8192, max_wait_seconds=0.05)
+    client = make_client(controller)
+    acquired = []
+    acquire = controller.acquire
+
+    async def recording_acquire(container_name, nbytes, slot=True, bounded=True):
+        acquired.append((nbytes, slot, bounded))
+        return await acquire(container_name, nbytes, slot, bounded)
+
+    controller.acquire = recording_acquire
+    response = client.post("/blob_storage/download_blobs/lake", json={"blob_names": ["data.bin"]})
+
+    assert response.status_code == 200
+    assert acquired == [(0, True, True), (len(DATA), False, False)]
+    assert controller.stats()["inflight_bytes"] == 0 and controller.stats()["active_transfers"] == 0
+
+
+def test_should_shed_uploads_before_reading_their_body():
+    controller = AdmissionController(max_inflight_bytes=2048, max_wait_seconds=0.05)
+    inner_called = []
+    received = []
+    sent = []
+
+    async def inner(scope, receive, send):
+        inner_called.append(scope["path"])
+
+    async def receive():
+        received.append(1)
+        return {"type": "http.request", "body": DATA, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def scenario():
+        middleware = AdmissionMiddleware(inner, controller=controller, max_transfer_bytes=4096)
+        held = await controller.acquire("other", 2048)
+        scope = {"type": "http", "method": "POST", "path": "/blob_storage/upload_blob/lake",
+                 "headers": [(b"content-length", str(len(DATA)).encode())]}
+        await middleware(scope, receive, send)
+        held.release()
+
+    asyncio.run(scenario())
+    assert sent[0]["status"] == 429 and (b"retry-after", b"1") in sent[0]["headers"]
+    assert received == [] and inner_called == []
+    assert controller.stats()["inflight_bytes"] == 0
+
+
+def test_should_admit_uploads_to_the_app_as_mounted_under_api_v1(monkeypatch):
+    monkeypatch.setenv("STORAGE_BACKEND", "memory")
+    from m365server.main import app
+
+    acquired = []
+    with TestClient(app) as client:
+        controller = app.state.admission_controller
+        acquire = controller.acquire
+
+        async def recording_acquire(container_name, nbytes, slot=True, bounded=True):
+            acquired.append((container_name, nbytes))
+            return await acquire(container_name, nbytes, slot, bounded)
+
+        monkeypatch.setattr(controller, "acquire", recording_acquire)
+        response = client.post("/api/v1/blob_storage/upload_blob/lake", params={"blob_name": "copy.bin"},
+                               files={"file": ("copy.bin", DATA)})
+
+    assert response.status_code == 200
+    assert len(acquired) == 1 and acquired[0][0] == "lake" and acquired[0][1] > len(DATA)
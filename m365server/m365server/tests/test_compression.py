@@ -0,0 +1,112 @@
+import gzip
+from types import SimpleNamespace
+from typing import Callable
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import zstandard
+from fastapi.testclient import TestClient
+
+from m365server.api.compression import is_compressible, negotiate_encoding
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+
+CSV = b"".join(f"{i},region-{i % 4},{i * 1.5}\n".encode() for i in range(2000))
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, zstd", "zstd"),
+    ("zstd;q=0.5, gzip", "gzip"),
+    ("*", "zstd"),
+    ("gzip;q=0, identity", None),
+    ("br", None),
+])
+def test_should_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("text/csv", True),
+    ("application/json; charset=utf-8", True),
+    ("text/markdown", True),
+    ("application/octet-stream", False),
+    ("application/pdf", False),
+    ("application/vnd.openxmlformats-officedocument.presentationml.presentation", False),
+    (None, False),
+])
+def test_should_only_compress_text_like_content(content_type, expected):
+    assert is_compressible(content_type) == expected
+
+
+@pytest.fixture
+def make_client(api_client) -> Callable[..., TestClient]:
+    def build(content_type: str, data: bytes = CSV) -> TestClient:
+        async def stream_blob(container_name, blob_name, offset=None, length=None, etag=None):
+            offset = offset or 0
+            end = len(data) if length is None else offset + length
+            for i in range(offset, end, 4096):
+                yield data[i:min(i + 4096, end)]
+
+        async def iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token):
+            yield BlobListingPage(blobs=[BlobEntry(f"reports/{i:05d}.csv", 10, '"0x1"') for i in range(500)])
+
+        manager = Mock()
+        manager.blob_cache = None
+        manager.disk_cache = None
+        manager.get_blob_properties = AsyncMock(return_value=SimpleNamespace(
+            size=len(data), etag='"0x1"', last_modified=None, content_settings=SimpleNamespace(content_type=content_type)
+        ))
+        manager.stream_blob.side_effect = stream_blob
+        manager.iter_blob_pages.side_effect = iter_blob_pages
+        return api_client(manager)
+
+    return build
+
+
+def test_should_stream_gzip_for_csv_downloads(make_client):
+    response = make_client("text/csv").get("/blob_storage/download_blob/reports", params={"blob_name": "q1.csv"},
+                                           headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"0x1"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "content-length" not in response.headers or int(response.headers["content-length"]) < len(CSV)
+    assert response.content == CSV
+
+
+def test_should_compress_with_zstd_when_preferred(make_client):
+    with make_client("text/csv").stream("GET", "/blob_storage/download_blob/reports", params={"blob_name": "q1.csv"},
+                                        headers={"Accept-Encoding": "zstd"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "zstd"
+    assert len(raw) < len(CSV) // 3
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(raw) == CSV
+
+
+def test_should_not_compress_parquet_or_small_or_ranged_downloads(make_client):
+    params = {"blob_name": "blob"}
+    gzip_only = {"Accept-Encoding": "gzip"}
+    parquet = make_client("application/octet-stream").get("/blob_storage/download_blob/reports", params=params, headers=gzip_only)
+    small = make_client("text/csv", b"id\n1\n").get("/blob_storage/download_blob/reports", params=params, headers=gzip_only)
+    ranged = make_client("text/csv").get("/blob_storage/download_blob/reports", params=params,
+                                         headers={**gzip_only, "Range": "bytes=0-99"})
+
+    assert "content-encoding" not in parquet.headers
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in ranged.headers
+    assert ranged.content == CSV[:100]
+
+
+def test_should_compress_json_and_ndjson_listings(make_client):
+    client = make_client("text/csv")
+    listing = client.get("/blob_storage/list_blobs/reports", headers={"Accept-Encoding": "gzip"})
+    with client.stream("GET", "/blob_storage/list_blobs/reports", params={"stream": True},
+                       headers={"Accept-Encoding": "gzip"}) as streamed:
+        raw = b"".join(streamed.iter_raw())
+
+    assert listing.headers["content-encoding"] == "gzip"
+    assert len(listing.json()["blobs"]) == 500
+    assert streamed.headers["content-encoding"] == "gzip"
+    assert len(gzip.decompress(raw).splitlines()) == 500
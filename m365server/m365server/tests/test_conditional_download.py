@@ -0,0 +1,85 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from m365server.api.http_conditional import if_range_matches, is_not_modified, validator_headers
+
+ETAG = '"0x8DC0A1B2C3D4E5F"'
+LAST_MODIFIED = datetime(2024, 3, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+HTTP_DATE = "Fri, 01 Mar 2024 12:30:15 GMT"
+
+
+def test_should_format_validator_headers():
+    assert validator_headers(ETAG, LAST_MODIFIED) == {"ETag": ETAG, "Last-Modified": HTTP_DATE}
+
+
+@pytest.mark.parametrize("if_none_match", [ETAG, f'"other", {ETAG}', f"W/{ETAG}", "*"])
+def test_should_match_if_none_match(if_none_match):
+    assert is_not_modified(if_none_match, None, ETAG, LAST_MODIFIED)
+
+
+def test_should_not_match_changed_etag():
+    assert not is_not_modified('"0x1"', None, ETAG, LAST_MODIFIED)
+
+
+def test_should_ignore_if_modified_since_when_if_none_match_is_present():
+    assert not is_not_modified('"0x1"', HTTP_DATE, ETAG, LAST_MODIFIED)
+
+
+@pytest.mark.parametrize("if_modified_since, expected", [
+    (HTTP_DATE, True),
+    ("Fri, 01 Mar 2024 12:30:14 GMT", False),
+    ("Sat, 02 Mar 2024 00:00:00 GMT", True),
+    ("not a date", False),
+])
+def test_should_compare_if_modified_since_at_second_precision(if_modified_since, expected):
+    assert is_not_modified(None, if_modified_since, ETAG, LAST_MODIFIED) is expected
+
+
+def test_should_only_honour_range_for_a_strong_etag_match():
+    assert if_range_matches(ETAG, ETAG, LAST_MODIFIED)
+    assert not if_range_matches(f"W/{ETAG}", ETAG, LAST_MODIFIED)
+    assert not if_range_matches('"0x1"', ETAG, LAST_MODIFIED)
+    assert if_range_matches(HTTP_DATE, ETAG, LAST_MODIFIED)
+
+
+@pytest.fixture
+def client(api_client) -> TestClient:
+    async def stream_blob(container_name, blob_name, offset=None, length=None, etag=None):
+        data = b"0123456789"
+        yield data[offset or 0:(offset or 0) + (length or len(data))]
+
+    manager = Mock()
+    manager.blob_cache = None
+    manager.disk_cache = None
+    manager.get_blob_properties = AsyncMock(return_value=SimpleNamespace(
+        size=10, etag=ETAG, last_modified=LAST_MODIFIED,
+        content_settings=SimpleNamespace(content_type="text/csv")
+    ))
+    manager.stream_blob.side_effect = stream_blob
+    return api_client(manager)
+
+
+def test_should_return_validators_with_the_body(client):
+    response = client.get("/blob_storage/download_blob/reports", params={"blob_name": "pl.csv"})
+    assert response.status_code == 200
+    assert response.headers["etag"] == ETAG
+    assert response.headers["last-modified"] == HTTP_DATE
+
+
+def test_should_return_304_without_body_when_unchanged(client):
+    response = client.get("/blob_storage/download_blob/reports", params={"blob_name": "pl.csv"},
+                          headers={"If-None-Match": ETAG})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
+
+
+def test_should_serve_full_body_when_if_range_is_stale(client):
+    response = client.get("/blob_storage/download_blob/reports", params={"blob_name": "pl.csv"},
+                          headers={"Range": "bytes=0-1", "If-Range": '"0x1"'})
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
@@ -0,0 +1,53 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from fastapi.testclient import TestClient
+
+from m365server.azure_interface.blob_operations import BlobDeleteResult
+
+
+@pytest.fixture
+def manager() -> Mock:
+    manager = Mock()
+    manager.delete_blob = AsyncMock()
+    manager.delete_blobs = AsyncMock(side_effect=lambda container_name, names: [
+        BlobDeleteResult(name, 202) if name != "missing.csv" else BlobDeleteResult(name, 404, "BlobNotFound")
+        for name in names
+    ])
+    manager.delete_blobs_by_prefix = AsyncMock(return_value=[BlobDeleteResult("spark/part-0000.parquet", 202)])
+    return manager
+
+
+@pytest.fixture
+def client(api_client, manager) -> TestClient:
+    return api_client(manager)
+
+
+def test_should_delete_single_blob(client, manager):
+    response = client.delete("/blob_storage/delete_blob/exports", params={"blob_name": "a.csv"})
+    assert response.status_code == 200
+    manager.delete_blob.assert_awaited_once_with("exports", "a.csv")
+
+
+def test_should_return_404_for_missing_blob(client, manager):
+    manager.delete_blob.side_effect = ResourceNotFoundError("BlobNotFound")
+    response = client.delete("/blob_storage/delete_blob/exports", params={"blob_name": "a.csv"})
+    assert response.status_code == 404
+
+
+def test_should_report_per_blob_results_for_batch_delete(client, manager):
+    response = client.post("/blob_storage/delete_blobs/exports",
+                           json={"blob_names": ["a.csv", "missing.csv", "a.csv"]})
+
+    body = response.json()
+    assert (body["deleted"], body["failed"]) == (1, 1)
+    assert body["results"][1] == {"blob_name": "missing.csv", "status_code": 404, "error": "BlobNotFound", "deleted": False}
+    manager.delete_blobs.assert_awaited_once_with("exports", ["a.csv", "missing.csv"])
+
+
+def test_should_require_a_prefix_for_prefix_delete(client, manager):
+    assert client.delete("/blob_storage/delete_prefix/exports", params={"prefix": ""}).status_code == 422
+    response = client.delete("/blob_storage/delete_prefix/exports", params={"prefix": "spark/"})
+    assert response.json()["deleted"] == 1
+    manager.delete_blobs_by_prefix.assert_awaited_once_with("exports", "spark/")
@@ -0,0 +1,170 @@
+import asyncio
+import io
+import json
+import tarfile
+import zipfile
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from fastapi.testclient import TestClient
+
+from m365server.api.blob_archive import ArchiveMember, iter_blob_archive
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+
+BLOBS = {
+    "reports/a.csv": b"a,b\n1,2\n",
+    "reports/b.csv": b"c,d\n3,4\n",
+    "reports/c.csv": b"e,f\n5,6\n",
+}
+
+
+@pytest.fixture
+def manager() -> Mock:
+    async def get_blob_properties(container_name, blob_name):
+        if blob_name not in BLOBS:
+            raise ResourceNotFoundError("BlobNotFound")
+        return SimpleNamespace(name=blob_name, size=len(BLOBS[blob_name]), etag='"0x1"', last_modified=None)
+
+    async def download_blob(container_name, blob_name, properties=None):
+        return BLOBS[blob_name]
+
+    async def stream_blob(container_name, blob_name, offset=None, length=None, etag=None):
+        data = BLOBS[blob_name]
+        for start in range(0, len(data), 3):
+            yield data[start:start + 3]
+
+    async def iter_blob_pages(container_name, prefix=None, delimiter=None, page_size=None, continuation_token=None):
+        yield BlobListingPage(blobs=[BlobEntry(name, len(data), '"0x1"', "2024-03-01T12:00:00+00:00")
+                                     for name, data in BLOBS.items() if name.startswith(prefix)])
+
+    manager = Mock()
+    manager.get_blob_properties.side_effect = get_blob_properties
+    manager.download_blob.side_effect = download_blob
+    manager.stream_blob.side_effect = stream_blob
+    manager.iter_blob_pages.side_effect = iter_blob_pages
+    return manager
+
+
+@pytest.fixture
+def client(api_client, manager) -> TestClient:
+    return api_client(manager)
+
+
+def test_should_archive_named_blobs_as_zip(client):
+    response = client.post("/blob_storage/download_blobs/exports",
+                           json={"blob_names": ["reports/a.csv", "reports/b.csv"]})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert {name: archive.read(name) for name in archive.namelist()} == {
+        "reports/a.csv": BLOBS["reports/a.csv"],
+        "reports/b.csv": BLOBS["reports/b.csv"],
+    }
+
+
+def test_should_archive_prefix_as_tar_without_property_lookups(client, manager):
+    response = client.post("/blob_storage/download_blobs/exports",
+                           json={"prefix": "reports/", "archive_format": "tar"})
+
+    archive = tarfile.open(fileobj=io.BytesIO(response.content))
+    assert sorted(archive.getnames()) == sorted(BLOBS)
+    assert archive.extractfile("reports/c.csv").read() == BLOBS["reports/c.csv"]
+    manager.get_blob_properties.assert_not_called()
+
+
+@pytest.mark.parametrize("archive_format", ["zip", "tar"])
+def test_should_stream_blobs_above_the_threshold_into_the_archive(client, manager, monkeypatch, archive_format):
+    monkeypatch.setenv("BATCH_DOWNLOAD_STREAM_THRESHOLD_BYTES", "16")
+    BLOBS["reports/big.csv"] = b"id,amount\n" + b"".join(f"{i},{i}.5\n".encode() for i in range(100))
+    try:
+        response = client.post("/blob_storage/download_blobs/exports",
+                               json={"blob_names": ["reports/a.csv", "reports/big.csv"], "archive_format": archive_format})
+    finally:
+        big = BLOBS.pop("reports/big.csv")
+
+    content = io.BytesIO(response.content)
+    if archive_format == "zip":
+        archive = zipfile.ZipFile(content)
+        members = {name: archive.read(name) for name in archive.namelist()}
+    else:
+        archive = tarfile.open(fileobj=content)
+        members = {name: archive.extractfile(name).read() for name in archive.getnames()}
+    assert members == {"reports/a.csv": BLOBS["reports/a.csv"], "reports/big.csv": big}
+    assert [call.args[1] for call in manager.download_blob.call_args_list] == ["reports/a.csv"]
+
+
+def test_should_list_missing_blobs_in_errors_entry(client):
+    response = client.post("/blob_storage/download_blobs/exports",
+                           json={"blob_names": ["reports/a.csv", "reports/missing.csv"]})
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert sorted(archive.namelist()) == ["_batch_errors.json", "reports/a.csv"]
+    assert json.loads(archive.read("_batch_errors.json"))[0]["blob_name"] == "reports/missing.csv"
+
+
+def test_should_require_blob_names_or_prefix(client):
+    assert client.post("/blob_storage/download_blobs/exports", json={}).status_code == 400
+
+
+def test_should_fetch_concurrently_and_write_in_completion_order():
+    """
+    GIVEN blobs whose downloads finish in a different order than requested
+    WHEN they are archived
+    THEN every download should start before any finishes and entries should be written as they finish
+    """
+    # Arrange
+    order = ["slow", "medium", "fast"]
+    finishes_after = {"slow": "medium", "medium": "fast", "fast": None}
+    finished = {name: asyncio.Event() for name in order}
+    all_started = asyncio.Event()
+    started = []
+
+    async def fetch(name):
+        started.append(name)
+        if len(started) == len(order):
+            all_started.set()
+        # Fails rather than hangs if the downloads run one after another.
+        await asyncio.wait_for(all_started.wait(), 1.0)
+        if finishes_after[name] is not None:
+            await finished[finishes_after[name]].wait()
+        finished[name].set()
+        return ArchiveMember(name, name.encode())
+
+    async def collect():
+        return b"".join([part async for part in iter_blob_archive(order, fetch, "zip", max_concurrency=3)])
+
+    # Act
+    content = asyncio.run(collect())
+
+    # Assert
+    assert started == order
+    assert zipfile.ZipFile(io.BytesIO(content)).namelist() == ["fast", "medium", "slow"]
+
+
+def test_should_not_fetch_more_than_max_concurrency_ahead_of_a_stalled_client():
+    """
+    GIVEN a client that stops reading after the first part of the archive
+    WHEN many blobs are archived
+    THEN no more than max_concurrency blobs should be fetched and held
+    """
+    # Arrange
+    fetched = []
+
+    async def fetch(name):
+        fetched.append(name)
+        return ArchiveMember(name, b"x" * 100)
+
+    async def stall():
+        archive = iter_blob_archive([f"blob-{index}" for index in range(200)], fetch, "zip", max_concurrency=4)
+        await anext(archive)
+        await asyncio.sleep(0.05)
+        await archive.aclose()
+
+    # Act
+    asyncio.run(stall())
+
+    # Assert
+    assert len(fetched) == 4
@@ -0,0 +1,44 @@
+import asyncio
+from io import BytesIO
+
+import pytest
+from fastapi.testclient import TestClient
+
+from m365server.azure_interface.aio import create_local_storage_manager
+from m365server.azure_interface.disk_cache import DiskBlobCache
+
+PARQUET = bytes(range(256)) * 64
+
+
+@pytest.fixture
+def client(api_client, tmp_path) -> TestClient:
+    manager = create_local_storage_manager()
+    manager.set_disk_cache(DiskBlobCache(str(tmp_path), min_entry_bytes=1024))
+    asyncio.run(manager.upload_blob("lake", "big.parquet", BytesIO(PARQUET)))
+    asyncio.run(manager.upload_blob("lake", "small.parquet", BytesIO(b"PAR1")))
+
+    return api_client(manager)
+
+
+def test_should_serve_cached_blobs_from_disk(client):
+    first = client.get("/blob_storage/download_blob/lake", params={"blob_name": "big.parquet"})
+    second = client.get("/blob_storage/download_blob/lake", params={"blob_name": "big.parquet"})
+
+    assert first.content == second.content == PARQUET
+    assert second.headers["etag"] == first.headers["etag"]
+    assert second.headers["content-length"] == str(len(PARQUET))
+    assert client.get("/blob_storage/cache_stats").json() == {
+        "enabled": False,
+        "disk": {"enabled": True, "hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1, "bytes": len(PARQUET),
+                 "min_entry_bytes": 1024, "max_entry_bytes": 10 * 1024 ** 3, "max_total_bytes": 10 * 1024 ** 3}
+    }
+
+
+def test_should_stream_ranges_and_small_blobs_without_the_disk_cache(client):
+    ranged = client.get("/blob_storage/download_blob/lake", params={"blob_name": "big.parquet"},
+                        headers={"Range": "bytes=0-3"})
+    small = client.get("/blob_storage/download_blob/lake", params={"blob_name": "small.parquet"})
+
+    assert (ranged.status_code, ranged.content) == (206, PARQUET[:4])
+    assert small.content == b"PAR1"
+    assert client.get("/blob_storage/cache_stats").json()["disk"]["entries"] == 0
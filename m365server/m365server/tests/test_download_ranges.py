@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from m365server.api.http_ranges import RangeNotSatisfiable, parse_range_header
+
+BLOB = bytes(range(256)) * 4
+
+
+def test_should_parse_single_range():
+    assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+
+
+def test_should_parse_open_and_suffix_ranges():
+    assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=-8", 1000) == [(992, 999)]
+
+
+def test_should_clamp_range_end_to_size():
+    assert parse_range_header("bytes=990-2000", 1000) == [(990, 999)]
+
+
+def test_should_parse_multiple_ranges():
+    assert parse_range_header("bytes=0-9, 20-29,-5", 100) == [(0, 9), (20, 29), (95, 99)]
+
+
+def test_should_merge_overlapping_and_adjacent_ranges():
+    assert parse_range_header("bytes=50-59,0-9,10-19,5-12", 100) == [(0, 19), (50, 59)]
+    assert parse_range_header("bytes=50-59,0-9", 100) == [(50, 59), (0, 9)]
+
+
+def test_should_ignore_headers_with_too_many_ranges():
+    many = "bytes=" + ",".join(f"{index * 10}-{index * 10 + 4}" for index in range(17))
+    assert len(parse_range_header(many, 1000, max_ranges=17)) == 17
+    assert parse_range_header(many, 1000, max_ranges=16) is None
+    assert parse_range_header("bytes=" + ",".join(f"{index}-{index}" for index in range(100)), 1000) == [(0, 99)]
+
+
+@pytest.mark.parametrize("header", [None, "", "items=0-1", "bytes=abc", "bytes=10-5", "bytes=-"])
+def test_should_ignore_invalid_ranges(header):
+    assert parse_range_header(header, 1000) is None
+
+
+def test_should_reject_unsatisfiable_ranges():
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header("bytes=1000-", 1000)
+
+
+@pytest.fixture
+def client(api_client) -> TestClient:
+    async def stream_blob(container_name, blob_name, offset=None, length=None, etag=None):
+        offset = offset or 0
+        end = len(BLOB) if length is None else offset + length
+        for i in range(offset, end, 100):
+            yield BLOB[i:min(i + 100, end)]
+
+    manager = Mock()
+    manager.get_blob_properties = AsyncMock(return_value=SimpleNamespace(
+        size=len(BLOB), etag='"0x1"', last_modified=None, content_settings=SimpleNamespace(content_type="application/octet-stream")
+    ))
+    manager.stream_blob.side_effect = stream_blob
+    manager.blob_cache = None
+    manager.disk_cache = None
+    return api_client(manager, prefix="/api/v1")
+
+
+def test_should_stream_full_blob(client):
+    response = client.get("/api/v1/blob_storage/download_blob/reports", params={"blob_name": "data.parquet"})
+    assert response.status_code == 200
+    assert response.content == BLOB
+    assert response.headers["content-length"] == str(len(BLOB))
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_should_return_partial_content_for_single_range(client):
+    response = client.get("/api/v1/blob_storage/download_blob/reports", params={"blob_name": "data.parquet"},
+                          headers={"Range": "bytes=-8"})
+    assert response.status_code == 206
+    assert response.content == BLOB[-8:]
+    assert response.headers["content-range"] == f"bytes {len(BLOB) - 8}-{len(BLOB) - 1}/{len(BLOB)}"
+
+
+def test_should_return_multipart_body_for_multiple_ranges(client):
+    response = client.get("/api/v1/blob_storage/download_blob/reports", params={"blob_name": "data.parquet"},
+                          headers={"Range": "bytes=0-3,200-299"})
+    assert response.status_code == 206
+    assert response.headers["content-type"].startswith("multipart/byteranges; boundary=")
+    assert int(response.headers["content-length"]) == len(response.content)
+    assert BLOB[0:4] in response.content
+    assert BLOB[200:300] in response.content
+    assert b"Content-Range: bytes 200-299/1024" in response.content
+
+
+def test_should_return_416_for_unsatisfiable_range(client):
+    response = client.get("/api/v1/blob_storage/download_blob/reports", params={"blob_name": "data.parquet"},
+                          headers={"Range": "bytes=5000-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(BLOB)}"
+
+
+def test_should_serve_the_full_blob_when_too_many_ranges_are_requested(client):
+    ranges = ",".join(f"{index * 10}-{index * 10 + 4}" for index in range(100))
+    response = client.get("/api/v1/blob_storage/download_blob/reports", params={"blob_name": "data.parquet"},
+                          headers={"Range": f"bytes={ranges}"})
+    assert response.status_code == 200
+    assert response.content == BLOB
@@ -0,0 +1,89 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from fastapi.testclient import TestClient
+
+from m365server.azure_interface.blob_listing import BlobEntry, BlobListingPage
+
+PAGES = [
+    BlobListingPage(
+        blobs=[BlobEntry("spark/part-0000.parquet", 10, '"0x1"', "2024-03-01T12:00:00+00:00")],
+        prefixes=["spark/_temporary/"],
+        continuation_token="token-1"
+    ),
+    BlobListingPage(
+        blobs=[BlobEntry("spark/part-0001.parquet", 20, '"0x2"', "2024-03-01T12:00:01+00:00")],
+        continuation_token=None
+    ),
+]
+
+
+@pytest.fixture
+def manager() -> Mock:
+    async def iter_blob_pages(container_name, prefix, delimiter, page_size, continuation_token):
+        if container_name == "missing":
+            raise ResourceNotFoundError("ContainerNotFound")
+        start = 1 if continuation_token == "token-1" else 0
+        for page in PAGES[start:]:
+            yield page
+
+    manager = Mock()
+    manager.iter_blob_pages.side_effect = iter_blob_pages
+    return manager
+
+
+@pytest.fixture
+def client(api_client, manager) -> TestClient:
+    return api_client(manager)
+
+
+def test_should_list_every_page_by_default(client, manager):
+    response = client.get("/blob_storage/list_blobs/exports", params={"prefix": "spark/", "delimiter": "/"})
+    assert response.json() == {
+        "blobs": ["spark/part-0000.parquet", "spark/part-0001.parquet"],
+        "prefixes": ["spark/_temporary/"],
+        "continuation_token": None,
+    }
+    manager.iter_blob_pages.assert_called_once_with("exports", "spark/", "/", None, None)
+
+
+def test_should_return_a_single_page_with_continuation_token(client):
+    first = client.get("/blob_storage/list_blobs/exports", params={"page_size": 1}).json()
+    second = client.get("/blob_storage/list_blobs/exports",
+                        params={"page_size": 1, "continuation_token": first["continuation_token"]}).json()
+    assert first["blobs"] == ["spark/part-0000.parquet"]
+    assert first["continuation_token"] == "token-1"
+    assert second["blobs"] == ["spark/part-0001.parquet"]
+    assert second["continuation_token"] is None
+
+
+def test_should_return_blob_details(client):
+    response = client.get("/blob_storage/list_blobs/exports", params={"page_size": 1, "details": True})
+    assert response.json()["blobs"] == [{
+        "name": "spark/part-0000.parquet", "size": 10, "etag": '"0x1"', "last_modified": "2024-03-01T12:00:00+00:00"
+    }]
+
+
+def test_should_stream_ndjson_entries(client):
+    response = client.get("/blob_storage/list_blobs/exports", params={"stream": True})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"prefix": "spark/_temporary/"}
+    assert [line["name"] for line in lines[1:]] == ["spark/part-0000.parquet", "spark/part-0001.parquet"]
+
+
+def test_should_return_404_for_missing_container(client):
+    response = client.get("/blob_storage/list_blobs/missing")
+    assert response.status_code == 404
+
+
+def test_should_build_entry_from_blob_properties():
+    properties = SimpleNamespace(name="a.csv", size=3, etag='"0x1"',
+                                 last_modified=datetime(2024, 3, 1, tzinfo=timezone.utc))
+    assert BlobEntry.from_properties(properties).to_dict() == {
+        "name": "a.csv", "size": 3, "etag": '"0x1"', "last_modified": "2024-03-01T00:00:00+00:00"
+    }
@@ -0,0 +1,37 @@
+import asyncio
+
+from m365server.benchmarks.load import LoadOptions, Scenario, compare_results, run_load
+
+
+def test_should_drive_the_app_against_the_memory_backend():
+    scenario = Scenario("smoke", {"download": 0.5, "upload": 0.3, "list": 0.2}, 2048, seed_blobs=5,
+                        concurrency=(1, 2), duration=0.5)
+
+    report = asyncio.run(run_load([scenario], LoadOptions(warmup=0)))
+
+    assert (report["suite"], report["backend"], report["workers"]) == ("load", "memory", 1)
+    result = report["scenarios"][0]
+    assert [level["concurrency"] for level in result["levels"]] == [1, 2]
+    for level in result["levels"]:
+        assert level["requests"] > 0 and level["error_rate"] == 0.0
+        assert set(level["operations"]) == {"download", "upload", "list"}
+    assert result["max_sustainable_rps"] == max(level["rps"] for level in result["levels"])
+    assert result["peak_rss_bytes"] > 0
+
+
+def report(rps, p99, rss, backend="memory"):
+    return {"backend": backend, "workers": 1, "scenarios": [{
+        "name": "mixed", "max_sustainable_rps": rps,
+        "levels": [{"concurrency": 8, "latency_ms": {"p99": p99}, "peak_rss_bytes": rss}]
+    }]}
+
+
+def test_should_flag_throughput_latency_and_memory_regressions():
+    mib = 1024 ** 2
+    assert compare_results(report(100, 50, 200 * mib), report(95, 54, 210 * mib)) == []
+    assert compare_results(report(100, 50, 200 * mib), report(80, 80, 300 * mib)) == [
+        "mixed: max sustainable 100 -> 80 req/s",
+        "mixed/c8: p99 50 -> 80ms",
+        f"mixed/c8: peak RSS {200 * mib} -> {300 * mib} bytes",
+    ]
+    assert compare_results(report(100, 50, 200 * mib), report(10, 50, 200 * mib, backend="filesystem")) == []
@@ -0,0 +1,74 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from m365server.api.metrics import UNMATCHED_ROUTE, MetricsMiddleware, metrics_endpoint
+from m365server.azure_interface.container_stats import ContainerStats
+
+STATS_ROUTE = "/blob_storage/container_stats/{container_name}"
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def manager() -> Mock:
+    manager = Mock()
+    manager.get_container_stats = AsyncMock(side_effect=lambda names, refresh: [
+        ContainerStats(name, blob_count=2, total_bytes=30) for name in names if name != "missing"
+    ])
+    return manager
+
+
+@pytest.fixture
+def client(api_client, manager) -> TestClient:
+    client = api_client(manager, middleware=[(MetricsMiddleware, {})])
+    client.app.add_route("/metrics", metrics_endpoint)
+    return client
+
+
+def test_should_label_requests_with_the_route_template(client):
+    labels = {"method": "GET", "route": STATS_ROUTE}
+    ok_before = sample("m365server_request_duration_seconds_count", status="200", **labels)
+    missing_before = sample("m365server_request_duration_seconds_count", status="404", **labels)
+    sent_before = sample("m365server_http_bytes_total", route=STATS_ROUTE, direction="sent")
+
+    first = client.get("/blob_storage/container_stats/exports")
+    client.get("/blob_storage/container_stats/archive")
+    client.get("/blob_storage/container_stats/missing")
+
+    assert sample("m365server_request_duration_seconds_count", status="200", **labels) == ok_before + 2
+    assert sample("m365server_request_duration_seconds_count", status="404", **labels) == missing_before + 1
+    assert sample("m365server_http_bytes_total", route=STATS_ROUTE, direction="sent") >= sent_before + 2 * len(first.content)
+    assert sample("m365server_requests_in_progress") == 0
+
+
+def test_should_group_unknown_paths_under_one_label(client):
+    before = sample("m365server_request_duration_seconds_count", method="GET", route=UNMATCHED_ROUTE, status="404")
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    assert sample("m365server_request_duration_seconds_count",
+                  method="GET", route=UNMATCHED_ROUTE, status="404") == before + 2
+
+
+def test_should_count_request_body_bytes(client, manager):
+    manager.delete_blobs = AsyncMock(return_value=[])
+    before = sample("m365server_http_bytes_total", route="/blob_storage/delete_blobs/{container_name}", direction="received")
+    response = client.post("/blob_storage/delete_blobs/exports", json={"blob_names": ["a.csv"]})
+    assert response.status_code == 200
+    assert sample("m365server_http_bytes_total", route="/blob_storage/delete_blobs/{container_name}",
+                  direction="received") == before + len(b'{"blob_names":["a.csv"]}')
+
+
+def test_should_expose_metrics_in_prometheus_text_format(client):
+    client.get("/blob_storage/container_stats/exports")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'route="{STATS_ROUTE}"' in response.text
+    assert "m365server_requests_in_progress" in response.text
+    assert "m365server_azure_call_duration_seconds" in response.text
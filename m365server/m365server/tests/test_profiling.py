@@ -0,0 +1,96 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Callable
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from m365server.api.profiling import ProfilingMiddleware
+from m365server.azure_interface.configuration import ProfilingConfig
+from m365server.azure_interface.metrics import azure_call
+from m365server.azure_interface.profiling import SpanRecorder, current_recorder
+
+BLOB = b"x" * 1000
+URL = "/blob_storage/download_blob/reports"
+
+
+@pytest.fixture
+def manager() -> Mock:
+    @azure_call("get_properties")
+    async def get_blob_properties(container_name, blob_name):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(size=len(BLOB), etag='"0x1"', last_modified=None,
+                               content_settings=SimpleNamespace(content_type="application/octet-stream"))
+
+    @azure_call("stream")
+    async def stream_blob(container_name, blob_name, offset=None, length=None, etag=None):
+        for i in range(0, len(BLOB), 100):
+            await asyncio.sleep(0.001)
+            yield BLOB[i:i + 100]
+
+    manager = Mock()
+    manager.get_blob_properties = get_blob_properties
+    manager.stream_blob = stream_blob
+    manager.blob_cache = None
+    manager.disk_cache = None
+    return manager
+
+
+@pytest.fixture
+def make_client(api_client, manager) -> Callable[[ProfilingConfig], TestClient]:
+    return lambda config: api_client(manager, middleware=[(ProfilingMiddleware, {"config": config})])
+
+
+def test_should_not_profile_requests_without_the_header(make_client):
+    response = make_client(ProfilingConfig(enabled=True)).get(URL, params={"blob_name": "a.bin"})
+    assert response.content == BLOB
+    assert "server-timing" not in response.headers
+    assert current_recorder() is None
+
+
+def test_should_return_stage_timings_in_server_timing_header(make_client):
+    response = make_client(ProfilingConfig(enabled=True)).get(
+        URL, params={"blob_name": "a.bin"}, headers={"X-M365-Profile": "1"}
+    )
+
+    assert response.content == BLOB
+    timing = response.headers["server-timing"]
+    assert timing.startswith("azure.get_properties;dur=")
+    assert "total;dur=" in timing
+    assert "x-profile-id" not in response.headers
+
+
+def test_should_write_spans_and_sampling_profile_to_directory(make_client, tmp_path):
+    response = make_client(ProfilingConfig(enabled=True, directory=str(tmp_path))).get(
+        URL, params={"blob_name": "a.bin"}, headers={"X-M365-Profile": "true"}
+    )
+
+    profile_id = response.headers["x-profile-id"]
+    summary = json.loads((tmp_path / f"{profile_id}.json").read_text())
+    assert (summary["status"], summary["path"]) == (200, URL)
+    spans = {entry["name"]: entry for entry in summary["spans"]}
+    assert spans["azure.get_properties"]["duration_ms"] >= 10
+    # The body transfer finishes after the headers are sent, so it only appears in the written profile.
+    assert spans["azure.stream"]["first_item_ms"] <= spans["azure.stream"]["duration_ms"]
+    assert "azure.stream" not in response.headers["server-timing"]
+    assert (tmp_path / f"{profile_id}.html").stat().st_size > 0
+
+
+def test_should_require_configured_token(make_client):
+    client = make_client(ProfilingConfig(enabled=True, token="s3cret"))
+    assert "server-timing" not in client.get(URL, params={"blob_name": "a.bin"},
+                                             headers={"X-M365-Profile": "1"}).headers
+    assert "server-timing" in client.get(URL, params={"blob_name": "a.bin"},
+                                         headers={"X-M365-Profile": "s3cret"}).headers
+
+
+def test_should_aggregate_repeated_spans():
+    recorder = SpanRecorder(origin=0.0)
+    recorder.add("azure.stage_block", 0.0, 0.010)
+    recorder.add("azure.stage_block", 0.005, 0.025)
+    recorder.add("azure.commit_block_list", 0.03, 0.035)
+
+    assert recorder.server_timing() == 'azure.stage_block;dur=30.0;desc="x2", azure.commit_block_list;dur=5.0'
+
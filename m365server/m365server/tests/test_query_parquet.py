@@ -0,0 +1,88 @@
+import io
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from m365server.azure_interface.derived_parquet import DerivedParquetStore
+
+ROWS = 20_000
+
+
+def _parquet_bytes() -> bytes:
+    table = pa.table({
+        "id": pa.array(range(ROWS), type=pa.int64()),
+        "region": pa.array(["EU", "US", "APAC", "LATAM"] * (ROWS // 4)),
+        "amount": pa.array([float(i) for i in range(ROWS)]),
+        "payload": pa.array([f"{i:0>64}" for i in range(ROWS)]),
+    })
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=2_000)
+    return buffer.getvalue()
+
+
+BLOB = _parquet_bytes()
+
+
+@pytest.fixture
+def manager() -> Mock:
+    async def get_blob_properties(container_name, blob_name):
+        return SimpleNamespace(name=blob_name, size=len(BLOB), etag='"0x1"', last_modified=None,
+                               content_settings=SimpleNamespace(content_type="application/octet-stream"))
+
+    def stream_blob(container_name, blob_name, offset=None, length=None, etag=None):
+        manager.ranges.append((offset, length))
+
+        async def chunks():
+            yield BLOB[offset:offset + length]
+        return chunks()
+
+    manager = Mock()
+    manager.ranges = []
+    manager.get_blob_properties.side_effect = get_blob_properties
+    manager.stream_blob.side_effect = stream_blob
+    manager.derived_parquet_store = DerivedParquetStore(manager)
+    return manager
+
+
+@pytest.fixture
+def client(api_client, manager) -> TestClient:
+    return api_client(manager)
+
+
+def test_should_project_and_filter_with_ranged_reads(client, manager):
+    """
+    GIVEN a parquet blob with ten row groups and a wide payload column
+    WHEN two columns are queried with a filter matching the last row group
+    THEN only the matching rows should be returned and a small fraction of the blob should be read
+    """
+    # Act
+    response = client.post("/blob_storage/query_parquet/exports", json={
+        "blob_name": "facts.parquet",
+        "columns": ["id", "amount"],
+        "filters": [["id", ">=", 18_000], ["region", "in", ["EU", "US"]]],
+    })
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == ["id", "amount"]
+    assert table.num_rows == 1_000
+    assert min(table.column("id").to_pylist()) == 18_000
+    assert sum(length for _, length in manager.ranges) < len(BLOB) // 4
+
+
+def test_should_reject_unknown_columns(client):
+    response = client.post("/blob_storage/query_parquet/exports",
+                           json={"blob_name": "facts.parquet", "columns": ["missing"]})
+    assert response.status_code == 400
+
+
+def test_should_reject_unsupported_operators(client):
+    response = client.post("/blob_storage/query_parquet/exports",
+                           json={"blob_name": "facts.parquet", "filters": [["id", "like", 1]]})
+    assert response.status_code == 400
@@ -0,0 +1,25 @@
+from m365server.benchmarks.startup import LAZY_MODULES, check_startup, compare_results, measure_import
+
+
+def test_should_import_the_server_without_heavy_modules_or_network_access():
+    sample = measure_import()
+
+    assert [name for name in LAZY_MODULES if name in sample["modules"]] == []
+    assert sample["connections"] == []
+
+
+def test_should_report_budget_and_side_effect_violations():
+    report = {"module": "m365server.main", "import_ms": {"median": 900.0}, "lazy_modules_loaded": [], "network_connections": []}
+
+    assert check_startup(report, budget_ms=1000) == []
+    report.update(import_ms={"median": 1200.0}, lazy_modules_loaded=["pandas"], network_connections=["('redis', 6379)"])
+    assert len(check_startup(report, budget_ms=1000)) == 3
+
+
+def test_should_flag_import_time_regressions():
+    def report(median):
+        return {"module": "m365server.main", "import_ms": {"median": median}}
+
+    assert compare_results(report(1000), report(1100)) == []
+    assert compare_results(report(1000), report(1200)) == ["Importing m365server.main: 1000 -> 1200ms"]
+    assert compare_results(report(100), report(140)) == []
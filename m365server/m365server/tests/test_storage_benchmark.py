@@ -0,0 +1,35 @@
+from m365server.benchmarks.storage import BenchmarkSettings, compare_results, format_size, parse_size, run_suite
+
+
+def test_should_run_every_case_within_the_inflight_budget(tmp_path):
+    settings = BenchmarkSettings(sizes=(1024, 64 * 1024), concurrency=(1, 4), target_bytes=256 * 1024,
+                                 max_inflight_bytes=128 * 1024, list_blobs=20, list_operations=2, root=str(tmp_path))
+
+    report = run_suite(settings)
+
+    names = [result["name"] for result in report["results"]]
+    assert names[:7] == ["memory/upload/1KiB/c1", "memory/download/1KiB/c1", "memory/upload/1KiB/c4",
+                         "memory/download/1KiB/c4", "memory/upload/64KiB/c1", "memory/download/64KiB/c1",
+                         "memory/list/c1"]
+    assert "memory/upload/64KiB/c4" not in names
+    assert len(names) == 16 and names[8].startswith("filesystem/")
+    upload = report["results"][0]
+    assert upload["operations"] == 256 and upload["mib_per_second"] > 0
+    assert set(upload["latency_ms"]) == {"p50", "p90", "p99", "mean", "max"}
+    assert report["results"][6]["items_per_second"] > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_should_flag_throughput_and_memory_regressions():
+    def report(ops, peak):
+        return {"results": [{"name": "memory/upload/1MiB/c1", "ops_per_second": ops, "peak_bytes_per_operation": peak}]}
+
+    assert compare_results(report(100, 1 << 20), report(90, 1 << 20)) == []
+    assert compare_results(report(100, 1 << 20), report(80, 1 << 20)) == ["memory/upload/1MiB/c1: 100 -> 80 ops/s"]
+    assert len(compare_results(report(100, 1 << 20), report(100, 2 << 20))) == 1
+    assert compare_results(report(100, 1000), report(100, 5000)) == []
+
+
+def test_should_parse_and_format_sizes():
+    assert [parse_size(text) for text in ("4096", "64KiB", "1gb", "1.5MiB")] == [4096, 65536, 10 ** 9, 1572864]
+    assert [format_size(size) for size in (1000, 1024, 1024 ** 3)] == ["1000B", "1KiB", "1GiB"]
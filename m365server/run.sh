@@ -2,7 +2,11 @@
 if [ "$ENVIRONMENT" = "PRODUCTION" ]; then
   echo "Running Production Server"
   echo "Running on port $M365_SERVER_PORT"
-  uvicorn m365server.main:app --host 0.0.0.0 --port $M365_SERVER_PORT 
+  if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    # Metrics files left by a previous run would be added to this run's totals.
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+  fi
+  uvicorn m365server.main:app --host 0.0.0.0 --port $M365_SERVER_PORT --workers ${M365_SERVER_WORKERS:-1}
 
 else
     cd /code 